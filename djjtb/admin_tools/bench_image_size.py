@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark djj.get_image_size (header-only) against PIL Image.open (what the
+dimension helpers used before) on every image in a folder, and check both
+report the same dimensions.
+
+Usage: python3 -m djjtb.admin_tools.bench_image_size /path/to/folder [--subfolders]
+Run it twice — the second pass shows warm-OS-cache numbers, the first
+shows what a cold NAS folder costs.
+"""
+import sys
+import time
+from PIL import Image
+import djjtb.utils as djj
+
+
+def pil_size(path):
+    with Image.open(path) as img:
+        return img.width, img.height
+
+
+def time_reader(label, reader, images):
+    start = time.perf_counter()
+    sizes = {}
+    for path in images:
+        try:
+            sizes[path] = reader(path)
+        except Exception:
+            sizes[path] = None
+    elapsed = time.perf_counter() - start
+    per_image = elapsed / len(images) * 1000
+    print(f"  {label:<14} {elapsed:8.2f}s  ({per_image:.3f} ms/image)")
+    return elapsed, sizes
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if not args:
+        print(__doc__)
+        sys.exit(1)
+
+    images = djj.collect_images_from_folder(args[0], include_subfolders='--subfolders' in sys.argv)
+    if not images:
+        print("\033[91m❌ No images found\033[0m")
+        sys.exit(1)
+
+    print(f"\033[93m{len(images)} image(s) in\033[0m {args[0]}")
+    header_time, header_sizes = time_reader("header-only", djj.get_image_size, images)
+    pil_time, pil_sizes = time_reader("PIL open", pil_size, images)
+
+    mismatches = [p for p in images if header_sizes[p] != pil_sizes[p]]
+    print(f"\033[92m✅ Speedup: {pil_time / max(header_time, 1e-9):.1f}x\033[0m")
+    if mismatches:
+        print(f"\033[91m❌ {len(mismatches)} size mismatch(es):\033[0m")
+        for p in mismatches[:5]:
+            print(f"   {p}: header={header_sizes[p]} pil={pil_sizes[p]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,9 @@ import sys
 import json
 import shutil
 import re
+import sqlite3
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
 VENV_PATH = "/Users/home/Documents/ai_models/joytag/jtvenv"
@@ -51,7 +54,15 @@ except ImportError as e:
 SUPPORTED_EXTS = ('.jpg', '.jpeg', '.png', '.webp', '.bmp', '.tiff')
 DEFAULT_CATEGORY_SETS_FOLDER = Path(__file__).parent / "category_sets"
 HAMMING_THRESHOLD = 5  # phash distance <= this = considered duplicates
+HASH_WORKERS = os.cpu_count() or 1
+# Per-file phash + pixel count, reused while path/size/mtime are unchanged
+PHASH_CACHE_PATH = Path("~/Library/Caches/DJJTB/category_sorter_phash.sqlite").expanduser()
 CLIP_MODEL_NAME = "openai/clip-vit-large-patch14"
+CLIP_BATCH_SIZE = 32       # images per get_image_features forward pass
+CLIP_PREFETCH_WORKERS = 3  # threads decoding/preprocessing upcoming batches
+# Normalized image embeddings per model (float16 rows + SQLite row index), keyed
+# by file content so moved/renamed files from earlier runs still hit
+CLIP_CACHE_DIR = Path("~/Library/Caches/DJJTB/category_sorter_clip").expanduser()
 
 DEVICE = None
 
@@ -157,45 +168,142 @@ def slugify(label):
 
 
 def compute_phash(path):
+    """(64-bit phash as int, pixel count) — one decode serves both."""
     from PIL import Image
     import imagehash
     with Image.open(path) as img:
-        return imagehash.phash(img.convert('RGB'))
+        width, height = img.size
+        return int(str(imagehash.phash(img.convert('RGB'))), 16), width * height
 
 
-def image_pixel_count(path):
-    from PIL import Image
-    with Image.open(path) as img:
-        w, h = img.size
-    return w * h
+def _safe_phash(path):
+    """compute_phash for pool workers — errors come back as values, not raises."""
+    try:
+        return compute_phash(path), None
+    except Exception as e:
+        return None, str(e)
 
 
-def dedupe_images(images, output_path, logger):
-    print("\033[1;93m🔍 Deduping (perceptual hash)...\033[0m")
-    hashes = {}
+def _open_phash_cache():
+    PHASH_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(PHASH_CACHE_PATH), timeout=30)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS phash ("
+        "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, phash TEXT, pixels INTEGER)"
+    )
+    return conn
+
+
+def hash_images(images, logger):
+    """
+    {img_path: (phash_int, pixel_count)} for every hashable image. Cached
+    entries are reused while the file's size + mtime match; only new or
+    changed files are decoded, HASH_WORKERS at a time.
+    """
+    conn = _open_phash_cache()
+    results = {}
+    todo = []
     for img_path in images:
         try:
-            hashes[img_path] = compute_phash(img_path)
-        except Exception as e:
+            st = img_path.stat()
+        except OSError as e:
             print(f"   ⚠️  \033[93mHash failed for\033[0m {img_path.name}: {e}")
             logger.info(f"HASH_ERROR: {img_path.name} ({e})")
-
-    hashed = list(hashes.keys())
+            continue
+        row = conn.execute(
+            "SELECT size, mtime_ns, phash, pixels FROM phash WHERE path = ?",
+            (str(img_path.resolve()),)
+        ).fetchone()
+        if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            results[img_path] = (int(row[2], 16), row[3])
+        else:
+            todo.append((img_path, st))
+
+    print(f"   \033[93m{len(results)} cached, hashing {len(todo)} new image(s)...\033[0m")
+    if todo:
+        with ProcessPoolExecutor(max_workers=HASH_WORKERS) as pool:
+            outcomes = pool.map(_safe_phash, [p for p, _ in todo], chunksize=32)
+            for i, ((img_path, st), (value, error)) in enumerate(zip(todo, outcomes), 1):
+                sys.stdout.write(f"\r   Hashing {i}/{len(todo)}...")
+                sys.stdout.flush()
+                if error:
+                    print(f"\n   ⚠️  \033[93mHash failed for\033[0m {img_path.name}: {error}")
+                    logger.info(f"HASH_ERROR: {img_path.name} ({error})")
+                    continue
+                results[img_path] = value
+                conn.execute(
+                    "INSERT OR REPLACE INTO phash (path, size, mtime_ns, phash, pixels) VALUES (?, ?, ?, ?, ?)",
+                    (str(img_path.resolve()), st.st_size, st.st_mtime_ns, f"{value[0]:016x}", value[1])
+                )
+        conn.commit()
+        sys.stdout.write("\r" + " " * 40 + "\r")
+        sys.stdout.flush()
+    conn.close()
+    return results
+
+
+def hamming_distances(values, target):
+    """Vectorized popcount(values ^ target) over a uint64 array."""
+    import numpy as np
+    xor = np.bitwise_xor(values, np.uint64(target))
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(xor)
+    table = np.array([bin(b).count('1') for b in range(256)], dtype=np.uint8)
+    return table[xor.view(np.uint8).reshape(-1, 8)].sum(axis=1)
+
+
+def group_near_duplicates(hash_values, threshold):
+    """
+    Greedy duplicate grouping over 64-bit phashes, same result as comparing
+    every pair: walk the list in order, each still-unassigned hash claims
+    every later unassigned hash within `threshold` bits.
+
+    Candidates come from a multi-index hash instead of a full scan: the 64
+    bits are split into threshold+1 chunks, so (pigeonhole) any hash within
+    `threshold` matches at least one chunk exactly. Only those bucket
+    members get a vectorized Hamming check.
+    Returns a list of groups, each a sorted list of indices into hash_values.
+    """
+    import numpy as np
+
+    values = np.array(hash_values, dtype=np.uint64)
+    n_chunks = min(threshold + 1, 64)
+    bounds = [round(i * 64 / n_chunks) for i in range(n_chunks + 1)]
+    chunk_specs = [(lo, (1 << (hi - lo)) - 1) for lo, hi in zip(bounds, bounds[1:])]
+
+    tables = []
+    for shift, mask in chunk_specs:
+        keys = (values >> np.uint64(shift)) & np.uint64(mask)
+        table = {}
+        for idx, key in enumerate(keys.tolist()):
+            table.setdefault(key, []).append(idx)
+        tables.append(table)
+
+    assigned = np.zeros(len(values), dtype=bool)
     groups = []
-    assigned = set()
-
-    for i, img_a in enumerate(hashed):
-        if img_a in assigned:
+    for i, value in enumerate(hash_values):
+        if assigned[i]:
             continue
-        group = [img_a]
-        assigned.add(img_a)
-        for img_b in hashed[i + 1:]:
-            if img_b in assigned:
-                continue
-            if hashes[img_a] - hashes[img_b] <= HAMMING_THRESHOLD:
-                group.append(img_b)
-                assigned.add(img_b)
-        groups.append(group)
+        candidates = set()
+        for (shift, mask), table in zip(chunk_specs, tables):
+            candidates.update(table.get((value >> shift) & mask, ()))
+        candidates = np.array(sorted(candidates), dtype=np.int64)
+        candidates = candidates[~assigned[candidates]]
+        close = candidates[hamming_distances(values[candidates], value) <= threshold]
+        assigned[close] = True
+        groups.append(close.tolist())
+    return groups
+
+
+def dedupe_images(images, output_path, logger):
+    print("\033[1;93m🔍 Deduping (perceptual hash)...\033[0m")
+    hashes = hash_images(images, logger)
+
+    hashed = [p for p in images if p in hashes]
+    groups = [
+        [hashed[idx] for idx in group]
+        for group in group_near_duplicates([hashes[p][0] for p in hashed], HAMMING_THRESHOLD)
+    ]
 
     duplicates_dir = output_path / "_duplicates"
     kept = []
@@ -205,19 +313,13 @@ def dedupe_images(images, output_path, logger):
             kept.append(group[0])
             continue
 
-        def sort_key(p):
-            try:
-                return (-image_pixel_count(p), p.name.lower())
-            except Exception:
-                return (0, p.name.lower())
-
-        group_sorted = sorted(group, key=sort_key)
+        group_sorted = sorted(group, key=lambda p: (-hashes[p][1], p.name.lower()))
         keeper = group_sorted[0]
         kept.append(keeper)
 
         duplicates_dir.mkdir(parents=True, exist_ok=True)
         for dup in group_sorted[1:]:
-            dist = hashes[keeper] - hashes[dup]
+            dist = bin(hashes[keeper][0] ^ hashes[dup][0]).count('1')
             dest = duplicates_dir / dup.name
             if dest.exists():
                 stem, ext = dup.stem, dup.suffix
@@ -247,15 +349,146 @@ def build_category_embeddings(model, processor, categories, device):
     return text_features / text_features.norm(dim=-1, keepdim=True)
 
 
+def file_fingerprint(path, chunk=1 << 20):
+    """sha1 of the full file contents — survives the moves/renames this script makes."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(chunk)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ClipEmbeddingCache:
+    """
+    Append-only store of normalized CLIP image embeddings for one model:
+    <model>/embeddings.f16 (raw float16 rows, read back via np.memmap) and
+    <model>/index.sqlite (fingerprint -> row number). Fingerprints are
+    full-content hashes; fingerprint() remembers them per (path, size,
+    mtime_ns) so unchanged files are not read again on later runs.
+    """
+
+    def __init__(self, model_name, dim):
+        import numpy as np
+        self.np = np
+        self.dim = dim
+        self.folder = CLIP_CACHE_DIR / slugify(model_name.replace('/', '_'))
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.data_path = self.folder / "embeddings.f16"
+        self.conn = sqlite3.connect(str(self.folder / "index.sqlite"), timeout=30)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS rows (fingerprint TEXT PRIMARY KEY, row INTEGER)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS paths ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, fingerprint TEXT)"
+        )
+        row_bytes = dim * 2
+        existing = self.data_path.stat().st_size if self.data_path.exists() else 0
+        self.rows = existing // row_bytes
+        if existing % row_bytes:
+            # Torn write from an interrupted run — drop the partial row
+            with open(self.data_path, 'r+b') as f:
+                f.truncate(self.rows * row_bytes)
+        self.conn.execute("DELETE FROM rows WHERE row >= ?", (self.rows,))
+
+    def fingerprint(self, path):
+        """file_fingerprint(path), hashing only when path's size or mtime changed."""
+        key = str(Path(path).resolve())
+        st = os.stat(key)
+        row = self.conn.execute(
+            "SELECT size, mtime_ns, fingerprint FROM paths WHERE path = ?", (key,)
+        ).fetchone()
+        if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            return row[2]
+        fingerprint = file_fingerprint(key)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO paths (path, size, mtime_ns, fingerprint) VALUES (?, ?, ?, ?)",
+            (key, st.st_size, st.st_mtime_ns, fingerprint)
+        )
+        return fingerprint
+
+    def lookup(self, fingerprints):
+        """{fingerprint: float32 embedding} for every fingerprint already stored."""
+        np = self.np
+        found = {}
+        for i in range(0, len(fingerprints), 500):
+            chunk = fingerprints[i:i + 500]
+            found.update(self.conn.execute(
+                f"SELECT fingerprint, row FROM rows WHERE fingerprint IN ({','.join('?' * len(chunk))})",
+                chunk
+            ).fetchall())
+        if not found or not self.rows:
+            return {}
+        data = np.memmap(self.data_path, dtype=np.float16, mode='r', shape=(self.rows, self.dim))
+        return {fp: np.asarray(data[row], dtype=np.float32) for fp, row in found.items()}
+
+    def add(self, fingerprints, embeddings):
+        """Append a batch of (already normalized) embeddings."""
+        np = self.np
+        with open(self.data_path, 'ab') as f:
+            f.write(np.ascontiguousarray(embeddings, dtype=np.float16).tobytes())
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO rows (fingerprint, row) VALUES (?, ?)",
+            [(fp, self.rows + i) for i, fp in enumerate(fingerprints)]
+        )
+        self.conn.commit()
+        self.rows += len(fingerprints)
+
+    def close(self):
+        self.conn.close()
+
+
+def _prepare_clip_batch(processor, paths):
+    """Decode + preprocess one batch (runs on a prefetch thread)."""
+    from PIL import Image
+    ok_paths, pil_images, failures = [], [], []
+    for path in paths:
+        try:
+            with Image.open(path) as img:
+                pil_images.append(img.convert("RGB"))
+            ok_paths.append(path)
+        except Exception as e:
+            failures.append((path, str(e)))
+    pixel_values = processor(images=pil_images, return_tensors="pt")["pixel_values"] if pil_images else None
+    return ok_paths, pixel_values, failures
+
+
+def encode_images_batched(model, processor, paths, device):
+    """
+    Yield (paths, normalized float32 embeddings, failures) per CLIP_BATCH_SIZE
+    batch. Upcoming batches are decoded and preprocessed on
+    CLIP_PREFETCH_WORKERS threads while the model runs the current one.
+    """
+    import torch
+    batches = [paths[i:i + CLIP_BATCH_SIZE] for i in range(0, len(paths), CLIP_BATCH_SIZE)]
+    with ThreadPoolExecutor(max_workers=CLIP_PREFETCH_WORKERS) as pool:
+        pending = [pool.submit(_prepare_clip_batch, processor, b) for b in batches[:CLIP_PREFETCH_WORKERS + 1]]
+        next_batch = len(pending)
+        while pending:
+            ok_paths, pixel_values, failures = pending.pop(0).result()
+            if next_batch < len(batches):
+                pending.append(pool.submit(_prepare_clip_batch, processor, batches[next_batch]))
+                next_batch += 1
+            if pixel_values is None:
+                yield [], None, failures
+                continue
+            with torch.no_grad():
+                image_outputs = model.get_image_features(pixel_values=pixel_values.to(device))
+            image_features = image_outputs.pooler_output if hasattr(image_outputs, 'pooler_output') else image_outputs
+            image_features = image_features / image_features.norm(dim=-1, keepdim=True)
+            yield ok_paths, image_features.float().cpu().numpy(), failures
+
+
 def classify_images(images, categories, output_path, logger):
     if not images:
         print("\033[93m⚠️  No images left to categorize.\033[0m")
         return
 
     print("\033[1;93m🧠 Loading CLIP model...\033[0m")
+    import numpy as np
     import torch
     from transformers import CLIPModel, CLIPProcessor
-    from PIL import Image
 
     model = CLIPModel.from_pretrained(CLIP_MODEL_NAME)
     processor = CLIPProcessor.from_pretrained(CLIP_MODEL_NAME)
@@ -264,45 +497,77 @@ def classify_images(images, categories, output_path, logger):
     print(f"✅ \033[92mCLIP loaded\033[0m ({CLIP_MODEL_NAME.split('/')[-1]}, device: {DEVICE})")
     print()
 
-    text_features = build_category_embeddings(model, processor, categories, DEVICE)
-    logit_scale = model.logit_scale.exp()
+    text_features = build_category_embeddings(model, processor, categories, DEVICE).float().cpu().numpy()
+    logit_scale = float(model.logit_scale.exp().item())
 
-    log_entries = []  # (confidence, message) — sorted ascending before writing to log
-
-    for idx, img_path in enumerate(images, 1):
+    # ── Image embeddings: cache hits first, then batched encode of the rest ──
+    cache = ClipEmbeddingCache(CLIP_MODEL_NAME, text_features.shape[1])
+    fingerprints = {}
+    for img_path in images:
         try:
-            image = Image.open(img_path).convert("RGB")
-            inputs = processor(images=image, return_tensors="pt")
-            inputs = {k: v.to(DEVICE) for k, v in inputs.items()}
-            with torch.no_grad():
-                image_outputs = model.get_image_features(**inputs)
-            image_features = image_outputs.pooler_output if hasattr(image_outputs, 'pooler_output') else image_outputs
-            image_features = image_features / image_features.norm(dim=-1, keepdim=True)
-
-            similarity = (image_features @ text_features.T).squeeze(0)
-            probs = torch.softmax(similarity * logit_scale, dim=-1)
-            best_idx = int(torch.argmax(probs).item())
-            confidence = float(probs[best_idx].item())
-            label = categories[best_idx]
-            slug = slugify(label)
-
-            dest_dir = output_path / slug
-            dest_dir.mkdir(parents=True, exist_ok=True)
-            dest = dest_dir / img_path.name
-            if dest.exists():
-                stem, ext = img_path.stem, img_path.suffix
-                n = 1
-                while dest.exists():
-                    dest = dest_dir / f"{stem}_{n}{ext}"
-                    n += 1
-            shutil.move(str(img_path), str(dest))
-
-            msg = f"{img_path.name} → {label} (confidence: {confidence:.2f})"
-            print(f"\033[93m[{idx}/{len(images)}]\033[0m {msg}")
-            log_entries.append((confidence, msg))
-        except Exception as e:
+            fingerprints[img_path] = cache.fingerprint(img_path)
+        except OSError as e:
             print(f"   ❌ \033[93mFailed:\033[0m {img_path.name} ({e})")
             logger.info(f"CLASSIFY_ERROR: {img_path.name} ({e})")
+    cache.conn.commit()
+    cached = cache.lookup(list(set(fingerprints.values())))
+    embeddings = {p: cached[fp] for p, fp in fingerprints.items() if fp in cached}
+    to_encode = [p for p in fingerprints if p not in embeddings]
+    print(f"\033[93m{len(embeddings)} embedding(s) cached, encoding {len(to_encode)}...\033[0m")
+
+    encoded = 0
+    batches = encode_images_batched(model, processor, to_encode, DEVICE) if to_encode else []
+    for batch_paths, features, failures in batches:
+        for img_path, err in failures:
+            print(f"   ❌ \033[93mFailed:\033[0m {img_path.name} ({err})")
+            logger.info(f"CLASSIFY_ERROR: {img_path.name} ({err})")
+        if not batch_paths:
+            continue
+        cache.add([fingerprints[p] for p in batch_paths], features)
+        embeddings.update(zip(batch_paths, features))
+        encoded += len(batch_paths)
+        sys.stdout.write(f"\r   Encoded {encoded}/{len(to_encode)}...")
+        sys.stdout.flush()
+    if to_encode:
+        sys.stdout.write("\r" + " " * 40 + "\r")
+        sys.stdout.flush()
+    cache.close()
+
+    # ── Zero-shot scoring for the whole set in one matrix multiply ──
+    ordered = [p for p in images if p in embeddings]
+    log_entries = []  # (confidence, message) — sorted ascending before writing to log
+    if ordered:
+        image_matrix = np.stack([embeddings[p] for p in ordered])
+        logits = (image_matrix @ text_features.T) * logit_scale
+        logits -= logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+        best = probs.argmax(axis=1)
+
+        for idx, img_path in enumerate(ordered, 1):
+            try:
+                best_idx = int(best[idx - 1])
+                confidence = float(probs[idx - 1, best_idx])
+                label = categories[best_idx]
+                slug = slugify(label)
+
+                dest_dir = output_path / slug
+                dest_dir.mkdir(parents=True, exist_ok=True)
+                dest = dest_dir / img_path.name
+                if dest.exists():
+                    stem, ext = img_path.stem, img_path.suffix
+                    n = 1
+                    while dest.exists():
+                        dest = dest_dir / f"{stem}_{n}{ext}"
+                        n += 1
+                shutil.move(str(img_path), str(dest))
+
+                msg = f"{img_path.name} → {label} (confidence: {confidence:.2f})"
+                print(f"\033[93m[{idx}/{len(ordered)}]\033[0m {msg}")
+                log_entries.append((confidence, msg))
+            except Exception as e:
+                print(f"   ❌ \033[93mFailed:\033[0m {img_path.name} ({e})")
+                logger.info(f"CLASSIFY_ERROR: {img_path.name} ({e})")
 
     log_entries.sort(key=lambda x: x[0])
     for _, msg in log_entries:
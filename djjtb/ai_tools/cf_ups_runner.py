@@ -53,6 +53,9 @@ TAG_PATH   = "/opt/homebrew/bin/tag"
 # ─── UPS Inline Inference Script ─────────────────────────────────────────────
 # Passed to upsvenv python via -c so no file needed on disk.
 # All params come in via env vars — no shell quoting issues.
+# With UPS_WORKER=1 the script loads the model once and then serves jobs:
+# one JSON object per stdin line holding the per-image UPS_* options (they
+# override the env), one "@@UPS {json}" reply line per job on stdout.
 
 UPS_INFERENCE = r"""
 import os, sys, pathlib
@@ -63,17 +66,7 @@ import cv2
 
 model_path     = os.environ["UPS_MODEL_PATH"]
 model_arch     = os.environ.get("UPS_ARCH", "old")   # 'old' (4x-UltraSharp) or 'new' (RealESRGAN)
-input_path     = os.environ["UPS_INPUT"]
-output_path    = os.environ["UPS_OUTPUT"]
-suffix         = os.environ["UPS_SUFFIX"]
-tile_size      = int(os.environ.get("UPS_TILE", "0"))
-tile_pad       = int(os.environ.get("UPS_TILE_PAD", "10"))
 scale          = int(os.environ.get("UPS_SCALE", "4"))
-resize_edge    = int(os.environ.get("UPS_RESIZE_EDGE", "0"))
-blend_strength = float(os.environ.get("UPS_BLEND", "1.0"))
-post_mode      = os.environ.get("UPS_POST", "none")
-grain_strength = float(os.environ.get("UPS_GRAIN", "0.03"))
-edge_sharpen   = float(os.environ.get("UPS_SHARPEN", "0.5"))
 
 # ── Old-arch RRDBNet (original ESRGAN key naming — 4x-UltraSharp) ────────────
 
@@ -260,34 +253,65 @@ def resize_to_longest_edge(img_bgr, longest_edge):
     ratio = longest_edge/max(h,w)
     return cv2.resize(img_bgr, (int(round(w*ratio)), int(round(h*ratio))), interpolation=cv2.INTER_LANCZOS4)
 
-input_p  = pathlib.Path(input_path)
-output_p = pathlib.Path(output_path)
-output_p.mkdir(parents=True, exist_ok=True)
-out_file = output_p / f"{input_p.stem}{suffix}.png"
-
-img_bgr = cv2.imread(str(input_p), cv2.IMREAD_COLOR)
-if img_bgr is None:
-    print(f"ERROR: Could not read image: {input_p}"); sys.exit(1)
-
-result_bgr = process_image(img_bgr, tile_size, tile_pad, scale, model, device)
-
-if blend_strength < 1.0:
-    h_out, w_out = result_bgr.shape[:2]
-    bicubic = cv2.resize(img_bgr, (w_out, h_out), interpolation=cv2.INTER_CUBIC)
-    result_bgr = cv2.addWeighted(result_bgr, blend_strength, bicubic, 1.0-blend_strength, 0)
-
-if post_mode == 'natural':
-    result_bgr = apply_edge_sharpen(result_bgr, edge_sharpen)
-    result_bgr = apply_grain(result_bgr, grain_strength)
-elif post_mode == 'custom':
-    if edge_sharpen > 0: result_bgr = apply_edge_sharpen(result_bgr, edge_sharpen)
-    if grain_strength > 0: result_bgr = apply_grain(result_bgr, grain_strength)
-
-if resize_edge > 0:
-    result_bgr = resize_to_longest_edge(result_bgr, resize_edge)
-
-cv2.imwrite(str(out_file), result_bgr)
-print(f"SAVED:{out_file}")
+def run_job(opts):
+    input_p        = pathlib.Path(opts["UPS_INPUT"])
+    output_p       = pathlib.Path(opts["UPS_OUTPUT"])
+    suffix         = opts["UPS_SUFFIX"]
+    tile_size      = int(opts.get("UPS_TILE", "0"))
+    tile_pad       = int(opts.get("UPS_TILE_PAD", "10"))
+    resize_edge    = int(opts.get("UPS_RESIZE_EDGE", "0"))
+    blend_strength = float(opts.get("UPS_BLEND", "1.0"))
+    post_mode      = opts.get("UPS_POST", "none")
+    grain_strength = float(opts.get("UPS_GRAIN", "0.03"))
+    edge_sharpen   = float(opts.get("UPS_SHARPEN", "0.5"))
+
+    output_p.mkdir(parents=True, exist_ok=True)
+    out_file = output_p / f"{input_p.stem}{suffix}.png"
+
+    img_bgr = cv2.imread(str(input_p), cv2.IMREAD_COLOR)
+    if img_bgr is None:
+        raise RuntimeError(f"Could not read image: {input_p}")
+
+    result_bgr = process_image(img_bgr, tile_size, tile_pad, scale, model, device)
+
+    if blend_strength < 1.0:
+        h_out, w_out = result_bgr.shape[:2]
+        bicubic = cv2.resize(img_bgr, (w_out, h_out), interpolation=cv2.INTER_CUBIC)
+        result_bgr = cv2.addWeighted(result_bgr, blend_strength, bicubic, 1.0-blend_strength, 0)
+
+    if post_mode == 'natural':
+        result_bgr = apply_edge_sharpen(result_bgr, edge_sharpen)
+        result_bgr = apply_grain(result_bgr, grain_strength)
+    elif post_mode == 'custom':
+        if edge_sharpen > 0: result_bgr = apply_edge_sharpen(result_bgr, edge_sharpen)
+        if grain_strength > 0: result_bgr = apply_grain(result_bgr, grain_strength)
+
+    if resize_edge > 0:
+        result_bgr = resize_to_longest_edge(result_bgr, resize_edge)
+
+    cv2.imwrite(str(out_file), result_bgr)
+    return out_file
+
+if os.environ.get("UPS_WORKER") == "1":
+    import json, time, traceback
+    print("@@UPS " + json.dumps({"ready": True, "device": str(device)}), flush=True)
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        t0 = time.time()
+        try:
+            out_file = run_job({**os.environ, **json.loads(line)})
+            reply = {"ok": True, "saved": str(out_file)}
+        except Exception:
+            reply = {"ok": False, "error": traceback.format_exc(limit=2)}
+        reply["seconds"] = time.time() - t0
+        print("@@UPS " + json.dumps(reply), flush=True)
+else:
+    try:
+        out_file = run_job(os.environ)
+    except RuntimeError as e:
+        print(f"ERROR: {e}"); sys.exit(1)
+    print(f"SAVED:{out_file}")
 """
 
 # ─── CF-side post-processing (finalize without upscaling) ────────────────────
@@ -497,27 +521,40 @@ def run_cf_folder(input_dir, output_dir, weight, suffix, upscale_factor=1):
 
 # ─── UPS Engine ───────────────────────────────────────────────────────────────
 
-def run_ups_single(input_path, output_dir, suffix, model_path, model_arch, model_scale,
-                   tile_size, resize_edge, blend_strength, post_mode, grain_strength,
-                   edge_sharpen, timeout=600):
-    """Run the selected upscaler model on one file via inline inference script."""
-    t0 = time.time()
-    env = os.environ.copy()
-    env.update({
+def _ups_model_env(model_path, model_arch, model_scale):
+    return {
         "UPS_MODEL_PATH":  model_path,
         "UPS_ARCH":        model_arch,
+        "UPS_SCALE":       str(model_scale),
+    }
+
+
+def _ups_job_env(input_path, output_dir, suffix, tile_size, resize_edge, blend_strength,
+                 post_mode, grain_strength, edge_sharpen):
+    return {
         "UPS_INPUT":       str(input_path),
         "UPS_OUTPUT":      str(output_dir),
         "UPS_SUFFIX":      suffix,
         "UPS_TILE":        str(tile_size),
         "UPS_TILE_PAD":    "10",
-        "UPS_SCALE":       str(model_scale),
         "UPS_RESIZE_EDGE": str(resize_edge),
         "UPS_BLEND":       f"{blend_strength:.2f}",
         "UPS_POST":        post_mode,
         "UPS_GRAIN":       f"{grain_strength:.3f}",
         "UPS_SHARPEN":     f"{edge_sharpen:.3f}",
-    })
+    }
+
+
+def run_ups_single(input_path, output_dir, suffix, model_path, model_arch, model_scale,
+                   tile_size, resize_edge, blend_strength, post_mode, grain_strength,
+                   edge_sharpen, timeout=600):
+    """Run the selected upscaler model on one file via inline inference script.
+    Loads the model for this one file; batches go through UpscalerWorker."""
+    t0 = time.time()
+    env = os.environ.copy()
+    env.update(_ups_model_env(model_path, model_arch, model_scale))
+    env.update(_ups_job_env(input_path, output_dir, suffix, tile_size, resize_edge, blend_strength,
+                            post_mode, grain_strength, edge_sharpen))
     try:
         r = subprocess.run([UPS_PYTHON, "-c", UPS_INFERENCE], env=env,
                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
@@ -529,6 +566,33 @@ def run_ups_single(input_path, output_dir, suffix, model_path, model_arch, model
         return False, str(e), time.time() - t0
 
 
+class UpscalerWorker(djj.JsonLineWorker):
+    """
+    One long-lived UPS_PYTHON process running UPS_INFERENCE in worker mode:
+    torch import, model build, weight load and device pick happen once, then
+    every run() sends one job line and waits for its reply. run() has the same
+    signature and return value as run_ups_single minus the model arguments.
+    """
+
+    def __init__(self, model_path, model_arch, model_scale, startup_timeout=300):
+        env = _ups_model_env(model_path, model_arch, model_scale)
+        env["UPS_WORKER"] = "1"
+        super().__init__([UPS_PYTHON, "-c", UPS_INFERENCE], "@@UPS", env=env,
+                         startup_timeout=startup_timeout, name="Upscaler worker")
+
+    def run(self, input_path, output_dir, suffix, tile_size, resize_edge, blend_strength,
+            post_mode, grain_strength, edge_sharpen, timeout=600):
+        t0 = time.time()
+        reply, err = self.request(_ups_job_env(input_path, output_dir, suffix, tile_size, resize_edge,
+                                               blend_strength, post_mode, grain_strength, edge_sharpen),
+                                  timeout)
+        if reply is None:
+            return False, err, time.time() - t0
+        if reply.get("ok"):
+            return True, f"SAVED:{reply['saved']}", reply.get("seconds", time.time() - t0)
+        return False, reply.get("error", ""), reply.get("seconds", time.time() - t0)
+
+
 # ─── Finalize Engine (CF output post-pass) ───────────────────────────────────
 
 def run_finalize(input_path, output_dir, suffix, post_mode, grain_strength,
@@ -982,21 +1046,22 @@ def run_pipeline_mode2(files, src_path,
     print(f"\033[93m  Strength:\033[0m {blend_label}  \033[93mPost:\033[0m {post_label}\n")
 
     success_count = error_count = 0
-    for i, fp in enumerate(files):
-        fname = os.path.basename(fp)
-        print(f"\033[93m[{i+1}/{len(files)}]\033[0m {fname}")
-        # UPS engine handles finalize internally
-        ok, out, elapsed = run_ups_single(fp, final_dir, "_UT", model_path, model_arch, model_scale,
-                                          tile_size, resize_edge, blend, post_mode, grain, sharpen)
-        total = time.time() - overall_start
-        if ok:
-            print(f"  ✅ \033[92mDone\033[0m  {fmt_time(elapsed)}  (total {fmt_time(total)})")
-            success_count += 1
-        else:
-            print(f"  ❌ \033[93mFailed\033[0m  {fmt_time(elapsed)}")
-            print(f"     {out[-200:]}")
-            error_count += 1
-        print()
+    with UpscalerWorker(model_path, model_arch, model_scale) as ups:
+        for i, fp in enumerate(files):
+            fname = os.path.basename(fp)
+            print(f"\033[93m[{i+1}/{len(files)}]\033[0m {fname}")
+            # UPS engine handles finalize internally
+            ok, out, elapsed = ups.run(fp, final_dir, "_UT",
+                                       tile_size, resize_edge, blend, post_mode, grain, sharpen)
+            total = time.time() - overall_start
+            if ok:
+                print(f"  ✅ \033[92mDone\033[0m  {fmt_time(elapsed)}  (total {fmt_time(total)})")
+                success_count += 1
+            else:
+                print(f"  ❌ \033[93mFailed\033[0m  {fmt_time(elapsed)}")
+                print(f"     {out[-200:]}")
+                error_count += 1
+            print()
 
     _print_summary(success_count, error_count, fmt_time(time.time() - overall_start), final_dir)
     if tag_source and success_count:
@@ -1109,20 +1174,21 @@ def run_pipeline_mode3(files, src_path,
     print(f"\033[93m  Model:\033[0m {model_label}  \033[93mStrength:\033[0m {blend_label}\n")
 
     ups_success = ups_fail = 0
-    for i, fp in enumerate(ups_inputs):
-        fname = os.path.basename(fp)
-        print(f"\033[93m[{i+1}/{len(ups_inputs)}]\033[0m {fname}")
-        ok, out, elapsed = run_ups_single(fp, final_dir, "_CU", model_path, model_arch, model_scale,
-                                          tile_size, final_resize, blend, final_post, final_grain, final_sharpen)
-        total = time.time() - overall_start
-        if ok:
-            print(f"  ✅ \033[92mDone\033[0m  {fmt_time(elapsed)}  (total {fmt_time(total)})")
-            ups_success += 1
-        else:
-            print(f"  ❌ Failed  {fmt_time(elapsed)}")
-            print(f"     {out[-200:]}")
-            ups_fail += 1
-        print()
+    with UpscalerWorker(model_path, model_arch, model_scale) as ups:
+        for i, fp in enumerate(ups_inputs):
+            fname = os.path.basename(fp)
+            print(f"\033[93m[{i+1}/{len(ups_inputs)}]\033[0m {fname}")
+            ok, out, elapsed = ups.run(fp, final_dir, "_CU",
+                                       tile_size, final_resize, blend, final_post, final_grain, final_sharpen)
+            total = time.time() - overall_start
+            if ok:
+                print(f"  ✅ \033[92mDone\033[0m  {fmt_time(elapsed)}  (total {fmt_time(total)})")
+                ups_success += 1
+            else:
+                print(f"  ❌ Failed  {fmt_time(elapsed)}")
+                print(f"     {out[-200:]}")
+                ups_fail += 1
+            print()
 
     # Clean up pass-through temp
     shutil.rmtree(cf_passthrough_dir, ignore_errors=True)
@@ -1178,40 +1244,41 @@ def run_pipeline_mode4(files, src_path,
     ups_outputs = []
     ups_fail    = []
 
-    for i, fp in enumerate(files):
-        fname = os.path.basename(fp)
-        print(f"\033[93m[{i+1}/{len(files)}]\033[0m {fname}")
+    with UpscalerWorker(model_path, model_arch, model_scale) as ups:
+        for i, fp in enumerate(files):
+            fname = os.path.basename(fp)
+            print(f"\033[93m[{i+1}/{len(files)}]\033[0m {fname}")
 
-        # Always run UPS into passthrough dir first (no grain)
-        ok, out, elapsed = run_ups_single(fp, ups_passthrough_dir, "_UT", model_path, model_arch, model_scale,
-                                          tile_size, ups_pass_resize, blend, ups_pass_post,
-                                          ups_pass_grain, ups_pass_sharpen)
-        total = time.time() - overall_start
-        if ok:
-            print(f"  ✅ \033[92mUPS done\033[0m  {fmt_time(elapsed)}  (total {fmt_time(total)})")
-            stem = pathlib.Path(fp).stem
-            target_stem = f"{stem}_UT".lower()
-            found = None
-            for p in ups_passthrough_dir.iterdir():
-                if p.is_file() and p.stem.lower() == target_stem:
-                    found = p
-                    break
-            if found:
-                # Save copy with grain to inter_dir if requested
-                if save_intermediate:
-                    run_ups_single(fp, inter_dir, "_UT", model_path, model_arch, model_scale,
-                                   tile_size, ups_save_resize, blend, ups_save_post,
-                                   ups_save_grain, ups_save_sharpen)
-                ups_outputs.append(str(found))
+            # Always run UPS into passthrough dir first (no grain)
+            ok, out, elapsed = ups.run(fp, ups_passthrough_dir, "_UT",
+                                       tile_size, ups_pass_resize, blend, ups_pass_post,
+                                       ups_pass_grain, ups_pass_sharpen)
+            total = time.time() - overall_start
+            if ok:
+                print(f"  ✅ \033[92mUPS done\033[0m  {fmt_time(elapsed)}  (total {fmt_time(total)})")
+                stem = pathlib.Path(fp).stem
+                target_stem = f"{stem}_UT".lower()
+                found = None
+                for p in ups_passthrough_dir.iterdir():
+                    if p.is_file() and p.stem.lower() == target_stem:
+                        found = p
+                        break
+                if found:
+                    # Save copy with grain to inter_dir if requested
+                    if save_intermediate:
+                        ups.run(fp, inter_dir, "_UT",
+                                tile_size, ups_save_resize, blend, ups_save_post,
+                                ups_save_grain, ups_save_sharpen)
+                    ups_outputs.append(str(found))
+                else:
+                    print(f"  ⚠️  UPS passthrough output not found for {stem}, skipping")
+                    ups_fail.append(fp)
             else:
-                print(f"  ⚠️  UPS passthrough output not found for {stem}, skipping")
+                print(f"  ❌ UPS failed  {fmt_time(elapsed)}")
+                if out:
+                    print(f"     {out[-200:]}")
                 ups_fail.append(fp)
-        else:
-            print(f"  ❌ UPS failed  {fmt_time(elapsed)}")
-            if out:
-                print(f"     {out[-200:]}")
-            ups_fail.append(fp)
-        print()
+            print()
 
     if not ups_outputs:
         print("❌ No UPS outputs to pass to CF. Stopping.")
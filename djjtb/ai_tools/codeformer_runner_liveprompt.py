@@ -3,7 +3,6 @@ import sys
 import subprocess
 import pathlib
 import logging
-import shutil
 import time
 import select
 import djjtb.utils as djj
@@ -240,7 +239,7 @@ def categorize_files(file_paths):
     
     return images, videos
 
-def process_folder_images(src_path, output_path, weight, suffix, upscale, save_faces, save_restored_faces):
+def process_folder_images(src_path, output_path, weight, suffix, upscale, save_faces, save_restored_faces, timeout_seconds=1200):
     """Process all images in a folder using folder mode with live output and timing"""
     
     cmd = [
@@ -258,7 +257,7 @@ def process_folder_images(src_path, output_path, weight, suffix, upscale, save_f
     print("   \033[36mFolder Processing - Live Output:\033[0m")
     print("   " + "=" * 60)
     
-    success, output_msg, folder_elapsed = run_process_with_live_output(cmd, CODEFORMER_DIR, 1200)  # 20 min timeout for folders
+    success, output_msg, folder_elapsed = run_process_with_live_output(cmd, CODEFORMER_DIR, timeout_seconds)  # 20 min default for folders
     
     print("   " + "=" * 60)
     
@@ -271,6 +270,21 @@ def process_folder_images(src_path, output_path, weight, suffix, upscale, save_f
     return success, folder_elapsed
 
 
+def process_staged_images(images, weight, suffix, upscale, save_faces, save_restored_faces):
+    """
+    Run CodeFormer once over images from any folders by staging them into a
+    temp folder; results land in each source's own CF folder.
+    Returns ({image: success}, elapsed)
+    """
+    with djj.StagedBatch(images) as stage:
+        _, folder_elapsed = process_folder_images(stage.input_dir, stage.output_dir, weight, suffix, upscale,
+                                                  save_faces, save_restored_faces,
+                                                  timeout_seconds=max(1200, 300 * len(images)))
+        results = stage.distribute(lambda src: pathlib.Path(src).parent / "CF")
+    
+    face_dirs = ('cropped_faces', 'restored_faces')
+    return {img: any(p.parent.name not in face_dirs for p in outputs) for img, outputs in results.items()}, folder_elapsed
+
 def process_individual_file(input_path, output_path, weight, suffix, upscale, timeout_seconds=600):
     """Process a single file (video or image) with live output streaming and timing"""
     
@@ -318,20 +332,37 @@ def process_files_batch_mode(input_paths, weight, suffix, upscale, save_faces, s
     # Categorize files
     images, videos = categorize_files(input_paths)
     
-    for i, input_path in enumerate(input_paths):
+    for input_path in input_paths:
+        output_path = pathlib.Path(input_path).parent / "CF"
+        output_path.mkdir(parents=True, exist_ok=True)
+        output_paths.add(output_path)
+    
+    # Images from any folders share one CodeFormer run (model loads once)
+    if images:
+        print(f"\033[93mProcessing {len(images)} image(s) in one staged batch\033[0m")
+        image_results, batch_elapsed = process_staged_images(images, weight, suffix, upscale, save_faces, save_restored_faces)
+        total_elapsed = time.time() - overall_start_time
+        
+        for img in images:
+            if image_results[img]:
+                print(f"\033[92m✅ Success:\033[0m {os.path.basename(img)}")
+                success_count += 1
+            else:
+                print(f"\033[93m❌ Failed:\033[0m {os.path.basename(img)}")
+                error_count += 1
+        print(f"   \033[36mBatch time:\033[0m {format_elapsed_time(batch_elapsed)}")
+        print(f"   \033[36mTotal time:\033[0m {format_elapsed_time(total_elapsed)}")
+        print()
+    
+    for i, input_path in enumerate(videos):
         file_name = os.path.basename(input_path)
-        file_ext = pathlib.Path(input_path).suffix.lower()
         
-        print(f"\033[93mProcessing [{i+1}/{len(input_paths)}]:\033[0m {file_name}")
+        print(f"\033[93mProcessing video [{i+1}/{len(videos)}]:\033[0m {file_name}")
         
         output_path = pathlib.Path(input_path).parent / "CF"
-        output_path.mkdir(parents=True, exist_ok=True)
-        output_paths.add(output_path)
         
         # Use longer timeout for videos but not excessive - 8 mins instead of 20
-        timeout = 480 if file_ext in VIDEO_EXTS else 300  # 8 mins for video, 5 mins for images
-        
-        success, output_msg, file_elapsed = process_individual_file(input_path, output_path, weight, suffix, upscale, timeout)
+        success, output_msg, file_elapsed = process_individual_file(input_path, output_path, weight, suffix, upscale, 480)
         
         # Calculate total elapsed time
         total_elapsed = time.time() - overall_start_time
@@ -428,113 +459,29 @@ def process_files_smart_mode(input_paths, src_path, weight, suffix, upscale, sav
     error_count = 0
     output_paths = set()
     
-    # Process images in folder mode if they're all from the same directory
+    # Process images in one staged folder-mode run, whichever folders they come from
     if images:
-        # Check if all images are from the same directory as src_path
-        all_same_dir = all(pathlib.Path(img).parent == pathlib.Path(src_path) for img in images)
-        
-        if all_same_dir and src_path:
-            print("\033[1;33m🤖 CodeFormer 🤖 \033[0m\033[93mactivating for images (folder mode)...\033[0m")
-            folder_start_time = time.time()
-            
-            output_path = pathlib.Path(src_path) / "CF"
+        print("\033[1;33m🤖 CodeFormer 🤖 \033[0m\033[93mactivating for images (folder mode)...\033[0m")
+        for img in images:
+            output_path = pathlib.Path(img).parent / "CF"
             output_path.mkdir(parents=True, exist_ok=True)
             output_paths.add(output_path)
-            
-            # Create a temporary folder with only the images for processing
-            temp_img_dir = pathlib.Path(src_path) / "temp_images_for_cf"
-            temp_img_dir.mkdir(exist_ok=True)
-            
-            try:
-                # Copy images to temp directory
-                for img in images:
-                    shutil.copy2(img, temp_img_dir)
-                
-                # Process the temp directory
-                if process_folder_images(temp_img_dir, output_path, weight, suffix, upscale, save_faces, save_restored_faces):
-                    folder_elapsed = time.time() - folder_start_time
-                    total_elapsed = time.time() - overall_start_time
-                    
-                    print(f"\033[92m✅ Folder Mode Success:\033[0m {len(images)} image(s)")
-                    print(f"  \033[36mFolder time:\033[0m {format_elapsed_time(folder_elapsed)}")
-                    print(f"  \033[36mTotal time:\033[0m {format_elapsed_time(total_elapsed)}")
-                    success_count += len(images)
-                else:
-                    folder_elapsed = time.time() - folder_start_time
-                    total_elapsed = time.time() - overall_start_time
-                    
-                    print(f"\033[93m❌ Folder Mode Failed:\033[0m {len(images)} image(s)")
-                    print(f"  \033[36mFolder time:\033[0m {format_elapsed_time(folder_elapsed)}")
-                    print(f"  \033[36mTotal time:\033[0m {format_elapsed_time(total_elapsed)}")
-                    error_count += len(images)
-                
-                # Clean up temp directory
-                shutil.rmtree(temp_img_dir)
-                
-            except Exception as e:
-                folder_elapsed = time.time() - folder_start_time
-                total_elapsed = time.time() - overall_start_time
-                
-                print(f"\033[93m❌ Folder Mode Error:\033[0m {e}")
-                print(f"  \033[36mFolder time:\033[0m {format_elapsed_time(folder_elapsed)}")
-                print(f"  \033[36mTotal time:\033[0m {format_elapsed_time(total_elapsed)}")
-                
-                # Clean up temp directory if it exists
-                if temp_img_dir.exists():
-                    shutil.rmtree(temp_img_dir)
-                # Fall back to individual processing
-                print("\033[93mFalling back to individual image processing...\033[0m")
-                for img in images:
-                    output_path = pathlib.Path(img).parent / "CF"
-                    output_path.mkdir(parents=True, exist_ok=True)
-                    output_paths.add(output_path)
-                    success, _, file_elapsed = process_individual_file(img, output_path, weight, suffix, upscale, 300)
-                    
-                    current_total_elapsed = time.time() - overall_start_time
-                    
-                    if success:
-                        print(f"\033[92m✅ Success:\033[0m {os.path.basename(img)}")
-                        print(f"  \033[36mFile time:\033[0m {format_elapsed_time(file_elapsed)}")
-                        print(f"  \033[36mTotal time:\033[0m {format_elapsed_time(current_total_elapsed)}")
-                        success_count += 1
-                        if not save_faces:
-                            cleanup_cropped_faces(output_path)
-                        if not save_restored_faces:
-                            cleanup_restored_faces(output_path)
-                    else:
-                        print(f"\033[93m❌ Failed:\033[0m {os.path.basename(img)}")
-                        print(f"  \033[36mFile time:\033[0m {format_elapsed_time(file_elapsed)}")
-                        print(f"  \033[36mTotal time:\033[0m {format_elapsed_time(current_total_elapsed)}")
-                        error_count += 1
+        
+        image_results, folder_elapsed = process_staged_images(images, weight, suffix, upscale, save_faces, save_restored_faces)
+        total_elapsed = time.time() - overall_start_time
+        image_success = sum(image_results.values())
+        
+        if image_success == len(images):
+            print(f"\033[92m✅ Folder Mode Success:\033[0m {len(images)} image(s)")
         else:
-            # Process images individually
-            print("\033[1;33m🤖 CodeFormer 🤖 \033[0m\033[93mactivating for images (individual mode)...\033[0m")
-            for i, img in enumerate(images):
-                file_name = os.path.basename(img)
-                print(f"\033[93mProcessing image [{i+1}/{len(images)}]:\033[0m {file_name}")
-                
-                output_path = pathlib.Path(img).parent / "CF"
-                output_path.mkdir(parents=True, exist_ok=True)
-                output_paths.add(output_path)
-                
-                success, output_msg, file_elapsed = process_individual_file(img, output_path, weight, suffix, upscale, 300)
-                total_elapsed = time.time() - overall_start_time
-                
-                if success:
-                    print(f"\033[92m✅ Success:\033[0m {file_name}")
-                    print(f"  \033[36mFile time:\033[0m {format_elapsed_time(file_elapsed)}")
-                    print(f"  \033[36mTotal time:\033[0m {format_elapsed_time(total_elapsed)}")
-                    success_count += 1
-                    if not save_faces:
-                        cleanup_cropped_faces(output_path)
-                    if not save_restored_faces:
-                        cleanup_restored_faces(output_path)
-                else:
-                    print(f"\033[93m❌ Failed:\033[0m {file_name}")
-                    print(f"  \033[36mFile time:\033[0m {format_elapsed_time(file_elapsed)}")
-                    print(f"  \033[36mTotal time:\033[0m {format_elapsed_time(total_elapsed)}")
-                    error_count += 1
-                print()
+            print(f"\033[93m❌ Folder Mode Failed:\033[0m {len(images) - image_success} of {len(images)} image(s)")
+            for img in images:
+                if not image_results[img]:
+                    print(f"   {os.path.basename(img)}")
+        print(f"  \033[36mFolder time:\033[0m {format_elapsed_time(folder_elapsed)}")
+        print(f"  \033[36mTotal time:\033[0m {format_elapsed_time(total_elapsed)}")
+        success_count += image_success
+        error_count += len(images) - image_success
     
     # Process videos individually
     if videos:
@@ -1,8 +1,12 @@
 import os
 import sys
+import copy
+import json
+import queue
 import subprocess
 import pathlib
 import shutil
+import tempfile
 import time
 import djjtb.utils as djj
 
@@ -64,6 +68,16 @@ FACEFUSION_SCRIPT_PATH = "/Users/home/Documents/ai_models/facefusion/facefusion.
 FACEFUSION_VENV_PYTHON = "/Users/home/Documents/ai_models/facefusion/ffvenv/bin/python3"
 FACEFUSION_DIR = "/Users/home/Documents/ai_models/facefusion"
 
+# Per-pair time limit (same for a headless-run and for one job inside a batch run)
+PAIR_TIMEOUT = 600
+# How often the batch runner checks which queued jobs have finished
+JOB_POLL_INTERVAL = 0.25
+# job-run-all's memory strategy. FaceFusion's default 'strict' has every
+# processor's post_process() clear its inference pools after each job, so the
+# swapper/enhancer/restorer/detector/landmarker models would reload per pair.
+# 'tolerant' keeps them resident across the whole batch.
+JOB_VIDEO_MEMORY_STRATEGY = 'tolerant'
+
 def verify_facefusion_exists():
     """Check if FaceFusion installation exists"""
     required_paths = [
@@ -224,10 +238,11 @@ def build_facefusion_args(face_enhancer=None, face_enhancer_blend=FACE_ENHANCER_
 
     return args
 
-def write_cmd_log(output_file, cmd):
+def write_cmd_log(output_file, cmd, elapsed=None, note=None):
     """
     Write a hidden .txt file alongside the output file recording the exact command run.
     File is named .<output_stem>_cmd.txt so it stays hidden on macOS.
+    elapsed (seconds) and note, when given, are added as '#' lines after the command.
     """
     try:
         out_path = pathlib.Path(output_file)
@@ -235,6 +250,10 @@ def write_cmd_log(output_file, cmd):
         with open(log_path, 'w', encoding='utf-8') as f:
             f.write(" ".join(str(c) for c in cmd))
             f.write("\n")
+            if elapsed is not None:
+                f.write(f"# elapsed: {elapsed:.1f}s\n")
+            if note:
+                f.write(f"# {note}\n")
     except Exception:
         pass  # Never block processing over a log write failure
 
@@ -464,8 +483,11 @@ def get_target_ff_dir(target_file, output_mode, output_path):
         return pathlib.Path(target_file).parent / "FF"
     return pathlib.Path(output_path)
 
-def generate_output_filename(source_file, target_file, output_path, add_suffix=True, include_source_name=True):
-    """Generate output filename: targetname_sourcename_FF.ext (source name optional)"""
+def generate_output_filename(source_file, target_file, output_path, add_suffix=True, include_source_name=True,
+                             reserved=None):
+    """Generate output filename: targetname_sourcename_FF.ext (source name optional)
+    reserved: set of output paths already handed out in this batch (not yet on disk);
+    the returned path is added to it."""
     source_name = pathlib.Path(source_file).stem
     target_name = pathlib.Path(target_file).stem
     target_ext = pathlib.Path(target_file).suffix
@@ -482,7 +504,7 @@ def generate_output_filename(source_file, target_file, output_path, add_suffix=T
     # Check if file exists and create unique name if needed
     counter = 1
     original_output_path = output_file_path
-    while output_file_path.exists():
+    while output_file_path.exists() or (reserved is not None and str(output_file_path) in reserved):
         stem = original_output_path.stem
         suffix = original_output_path.suffix
         if add_suffix:
@@ -497,37 +519,195 @@ def generate_output_filename(source_file, target_file, output_path, add_suffix=T
         output_file_path = original_output_path.parent / new_filename
         counter += 1
     
+    if reserved is not None:
+        reserved.add(str(output_file_path))
     return str(output_file_path)
 
-def process_single_headless(source_file, target_file, output_file,
-                            face_enhancer=None, face_enhancer_blend=FACE_ENHANCER_DEFAULT_BLEND,
-                            expression_restorer=False, expression_restorer_factor=EXPRESSION_RESTORER_DEFAULT_FACTOR):
-    """Process single source to single target using headless-run"""
-    cmd = [
+def build_headless_cmd(source_file, target_file, output_file, ff_args):
+    """headless-run command for one source → target pair"""
+    return [
         FACEFUSION_VENV_PYTHON, FACEFUSION_SCRIPT_PATH, "headless-run",
         "-s", str(source_file),
         "-t", str(target_file),
         "-o", str(output_file)
-    ]
+    ] + ff_args
 
-    cmd.extend(build_facefusion_args(face_enhancer, face_enhancer_blend,
-                                     expression_restorer, expression_restorer_factor))
+def run_headless_pair(source_file, target_file, output_file, ff_args):
+    """One headless-run for one pair. Returns (success, output)"""
+    cmd = build_headless_cmd(source_file, target_file, output_file, ff_args)
 
+    start_time = time.time()
     try:
         result = subprocess.run(cmd, cwd=FACEFUSION_DIR,
                               stdout=subprocess.PIPE,
                               stderr=subprocess.STDOUT,
                               text=True,
-                              timeout=600)
+                              timeout=PAIR_TIMEOUT)
 
         if result.returncode == 0:
-            write_cmd_log(output_file, cmd)
+            write_cmd_log(output_file, cmd, time.time() - start_time)
         return result.returncode == 0, result.stdout if result.stdout else "No output"
     except subprocess.TimeoutExpired:
         return False, "Timeout (processing took too long)"
     except Exception as e:
         return False, str(e)
 
+def process_single_headless(source_file, target_file, output_file,
+                            face_enhancer=None, face_enhancer_blend=FACE_ENHANCER_DEFAULT_BLEND,
+                            expression_restorer=False, expression_restorer_factor=EXPRESSION_RESTORER_DEFAULT_FACTOR):
+    """Process single source to single target using headless-run"""
+    return run_headless_pair(source_file, target_file, output_file,
+                             build_facefusion_args(face_enhancer, face_enhancer_blend,
+                                                   expression_restorer, expression_restorer_factor))
+
+# ─── Job-file batch backend ──────────────────────────────────────────────────
+# Every headless-run reloads the detector, swapper, enhancer and restorer
+# models. For a list of pairs we instead queue one FaceFusion job per pair in
+# a temp --jobs-path and run them all with a single job-run-all under
+# JOB_VIDEO_MEMORY_STRATEGY, so the models load once. One job per pair (not one job with many steps) keeps a failed
+# pair from failing — and cleaning up — the pairs around it. Per-pair results
+# and timing come from watching job files land in completed/ or failed/.
+
+def create_job_template(jobs_path, source_file, target_file, output_file, ff_args):
+    """
+    Let FaceFusion itself draft a one-step job so the step args match the
+    installed version exactly. Returns the job dict, or None if this
+    FaceFusion has no job commands.
+    """
+    base = [FACEFUSION_VENV_PYTHON, FACEFUSION_SCRIPT_PATH]
+    jobs_args = ["--jobs-path", str(jobs_path)]
+    try:
+        for cmd in (base + ["job-create", "template"] + jobs_args,
+                    base + ["job-add-step", "template"] + jobs_args +
+                    ["-s", str(source_file), "-t", str(target_file), "-o", str(output_file)] + ff_args):
+            result = subprocess.run(cmd, cwd=FACEFUSION_DIR, stdout=subprocess.PIPE,
+                                    stderr=subprocess.STDOUT, text=True, timeout=120)
+            if result.returncode != 0:
+                return None
+        template_path = pathlib.Path(jobs_path) / "drafted" / "template.json"
+        with open(template_path, encoding='utf-8') as f:
+            template = json.load(f)
+        template_path.unlink()
+    except Exception:
+        return None
+    if len(template.get('steps', [])) != 1:
+        return None
+    return template
+
+def queue_pair_jobs(jobs_path, template, pairs):
+    """Write one queued job per (source, target, output) pair. Returns the job ids in order."""
+    queued_dir = pathlib.Path(jobs_path) / "queued"
+    queued_dir.mkdir(parents=True, exist_ok=True)
+    job_ids = []
+    base_time = time.time()
+    for i, (source_file, target_file, output_file) in enumerate(pairs):
+        job = copy.deepcopy(template)
+        step = job['steps'][0]
+        step['args'].update({
+            'source_paths': [str(source_file)],
+            'target_path': str(target_file),
+            'output_path': str(output_file),
+        })
+        step['status'] = 'queued'
+        job_id = f"djj-{i:05d}"
+        job_path = queued_dir / f"{job_id}.json"
+        with open(job_path, 'w', encoding='utf-8') as f:
+            json.dump(job, f, indent=4)
+        # job-run-all takes queued jobs oldest first
+        os.utime(job_path, (base_time + i, base_time + i))
+        job_ids.append(job_id)
+    return job_ids
+
+def run_pairs(pairs, ff_args, on_start, on_done):
+    """
+    Run (source, target, output) pairs, calling on_start(i) as pair i begins and
+    on_done(i, success, message) as it finishes, in order. Two or more pairs
+    go through one job-run-all; a single pair, or a FaceFusion without job
+    support, uses headless-run per pair.
+    """
+    def run_headless(indices):
+        for i in indices:
+            on_start(i)
+            on_done(i, *run_headless_pair(*pairs[i], ff_args))
+
+    if len(pairs) < 2:
+        run_headless(range(len(pairs)))
+        return
+
+    jobs_path = pathlib.Path(tempfile.mkdtemp(prefix="djj_ff_jobs_"))
+    try:
+        template = create_job_template(jobs_path, *pairs[0], ff_args)
+        if template is None:
+            print("\033[93m⚠️  FaceFusion job commands unavailable — running pairs one by one\033[0m")
+            run_headless(range(len(pairs)))
+            return
+
+        job_ids = queue_pair_jobs(jobs_path, template, pairs)
+        run_cmd = [FACEFUSION_VENV_PYTHON, FACEFUSION_SCRIPT_PATH, "job-run-all", "--jobs-path", str(jobs_path),
+                   "--video-memory-strategy", JOB_VIDEO_MEMORY_STRATEGY]
+        current = 0
+
+        # A crashed or killed run leaves the remaining jobs queued, so a
+        # relaunch simply picks up after the pair that went wrong
+        while current < len(pairs):
+            process = subprocess.Popen(run_cmd, cwd=FACEFUSION_DIR, stdout=subprocess.PIPE,
+                                       stderr=subprocess.STDOUT, text=True, bufsize=1)
+            lines = djj.stream_lines(process)
+            output = []
+            eof = False
+            pair_start = time.time()
+            on_start(current)
+
+            while current < len(pairs):
+                if not eof:
+                    try:
+                        line = lines.get(timeout=JOB_POLL_INTERVAL)
+                        if line is None:
+                            eof = True
+                        else:
+                            output.append(line)
+                    except queue.Empty:
+                        pass
+
+                job_id = job_ids[current]
+                if (jobs_path / "completed" / f"{job_id}.json").exists():
+                    status = 'completed'
+                elif (jobs_path / "failed" / f"{job_id}.json").exists():
+                    status = 'failed'
+                elif eof:
+                    status = 'crashed'  # run ended without finishing this job
+                elif time.time() - pair_start > PAIR_TIMEOUT:
+                    status = 'timeout'
+                else:
+                    continue
+
+                elapsed = time.time() - pair_start
+                source_file, target_file, output_file = pairs[current]
+                if status == 'completed':
+                    write_cmd_log(output_file, build_headless_cmd(source_file, target_file, output_file, ff_args),
+                                  elapsed, f"ran as {job_id} in a {len(pairs)}-pair job-run-all batch "
+                                  f"(--video-memory-strategy {JOB_VIDEO_MEMORY_STRATEGY})")
+                    on_done(current, True, "".join(output) or "No output")
+                elif status == 'timeout':
+                    on_done(current, False, "Timeout (processing took too long)")
+                else:
+                    on_done(current, False, "".join(output) or "No output")
+
+                current += 1
+                output = []
+                pair_start = time.time()
+
+                if status in ('crashed', 'timeout'):
+                    process.kill()
+                    (jobs_path / "queued" / f"{job_id}.json").unlink(missing_ok=True)
+                    break
+                if current < len(pairs):
+                    on_start(current)
+
+            process.wait()
+    finally:
+        shutil.rmtree(jobs_path, ignore_errors=True)
+
 def process_face_swap(mode, source_files, target_files, output_path, output_mode, add_suffix, tag_source,
                       target_action, face_enhancer=None,
                       face_enhancer_blend=FACE_ENHANCER_DEFAULT_BLEND,
@@ -581,72 +761,73 @@ def process_face_swap(mode, source_files, target_files, output_path, output_mode
     error_count = 0
     error_messages = []
 
+    ff_args = build_facefusion_args(face_enhancer, face_enhancer_blend,
+                                    expression_restorer, expression_restorer_factor)
+
     if mode == '2':
         # Single source to single target — headless-run
         source_file = source_files[0]
         target_file = target_files[0]
         output_file = generate_output_filename(source_file, target_file, output_path, add_suffix, include_source_name)
+        pairs = [(source_file, target_file, output_file)]
 
-        print(f"\033[93mProcessing:\033[0m {os.path.basename(source_file)} → {os.path.basename(target_file)}")
+        def on_start(i):
+            print(f"\033[93mProcessing:\033[0m {os.path.basename(source_file)} → {os.path.basename(target_file)}")
 
-        success, error_msg = process_single_headless(
-            source_file, target_file, output_file,
-            face_enhancer, face_enhancer_blend,
-            expression_restorer, expression_restorer_factor
-        )
-
-        if success:
-            print(f"\033[92m✅ Success:\033[0m Face swap completed!")
-            success_count = 1
-        else:
-            print(f"\033[93m❌ Failed:\033[0m {error_msg}")
-            error_count = 1
-            error_messages.append(error_msg)
+        def on_done(i, success, error_msg):
+            nonlocal success_count, error_count
+            if success:
+                print(f"\033[92m✅ Success:\033[0m Face swap completed!")
+                success_count = 1
+            else:
+                print(f"\033[93m❌ Failed:\033[0m {error_msg}")
+                error_count = 1
+                error_messages.append(error_msg)
 
     elif mode == '1':
-        # Single source to multiple targets — headless-run per target (same engine as all other modes)
+        # Single source to multiple targets — one batch for all targets (same engine as all other modes)
         source_file = source_files[0]
-        for i, target_file in enumerate(target_files):
-            target_name = os.path.basename(target_file)
-            print(f"\033[93mProcessing [{i+1}/{len(target_files)}]:\033[0m {target_name}")
+        reserved = set()
+        pairs = []
+        for target_file in target_files:
             dest_dir = get_target_ff_dir(target_file, output_mode, output_path)
             dest_dir.mkdir(parents=True, exist_ok=True)
-            output_file = generate_output_filename(source_file, target_file, dest_dir, add_suffix, include_source_name)
-            success, error_msg = process_single_headless(
-                source_file, target_file, output_file,
-                face_enhancer, face_enhancer_blend,
-                expression_restorer, expression_restorer_factor
-            )
+            output_file = generate_output_filename(source_file, target_file, dest_dir, add_suffix, include_source_name,
+                                                   reserved)
+            pairs.append((source_file, target_file, output_file))
+
+        def on_start(i):
+            print(f"\033[93mProcessing [{i+1}/{len(target_files)}]:\033[0m {os.path.basename(target_files[i])}")
+
+        def on_done(i, success, error_msg):
+            nonlocal success_count, error_count
             if success:
                 print(f"\033[92m✅ Done\033[0m")
                 success_count += 1
             else:
                 print(f"\033[93m❌ Failed:\033[0m {error_msg[:80]}")
                 error_count += 1
-                error_messages.append(f"{target_name}: {error_msg}")
+                error_messages.append(f"{os.path.basename(target_files[i])}: {error_msg}")
 
     elif mode == '3':
-        # Multiple sources to single target — one headless-run per source
+        # Multiple sources to single target — one batch for all sources
         target_file = target_files[0]
-
-        for i, source_file in enumerate(source_files):
-            source_name = os.path.basename(source_file)
-            print(f"\033[93mProcessing [{i+1}/{len(source_files)}]:\033[0m {source_name}")
-
+        target_stem = pathlib.Path(target_file).stem
+        target_ext  = pathlib.Path(target_file).suffix
+        pairs = []
+        for source_file in source_files:
             source_stem = pathlib.Path(source_file).stem
-            target_stem = pathlib.Path(target_file).stem
-            target_ext  = pathlib.Path(target_file).suffix
             base_stem = f"{target_stem}_{source_stem}" if include_source_name else target_stem
             output_filename = (f"{base_stem}_FF{target_ext}" if add_suffix
                                else f"{base_stem}{target_ext}")
-            output_file = str(pathlib.Path(output_path) / output_filename)
+            pairs.append((source_file, target_file, str(pathlib.Path(output_path) / output_filename)))
 
-            success, error_msg = process_single_headless(
-                source_file, target_file, output_file,
-                face_enhancer, face_enhancer_blend,
-                expression_restorer, expression_restorer_factor
-            )
+        def on_start(i):
+            print(f"\033[93mProcessing [{i+1}/{len(source_files)}]:\033[0m {os.path.basename(source_files[i])}")
 
+        def on_done(i, success, error_msg):
+            nonlocal success_count, error_count
+            source_name = os.path.basename(source_files[i])
             if success:
                 print(f"\033[92m✅ Success:\033[0m {source_name}")
                 success_count += 1
@@ -656,18 +837,15 @@ def process_face_swap(mode, source_files, target_files, output_path, output_mode
                 error_count += 1
                 error_messages.append(f"{source_name}: {error_msg}")
 
-    else:  # mode == '4' — multiple sources × multiple targets
+    else:  # mode == '4' — multiple sources × multiple targets, one batch for the whole matrix
         from datetime import datetime
         today_str = datetime.now().strftime("%Y-%m-%d")
 
-        for source_idx, source_file in enumerate(source_files):
+        pairs = []
+        pair_labels = []
+        for source_file in source_files:
             source_name = pathlib.Path(source_file).stem
-
-            print(f"\n\033[1;93m📁 Processing source [{source_idx+1}/{len(source_files)}]:\033[0m {os.path.basename(source_file)}")
-            print(f"\033[93m   Targets:\033[0m {len(target_files)} file(s)")
-            print()
-
-            for target_idx, target_file in enumerate(target_files):
+            for target_file in target_files:
                 target_name = pathlib.Path(target_file).stem
                 target_ext  = pathlib.Path(target_file).suffix
                 target_parent_folder = pathlib.Path(target_file).parent.name
@@ -682,23 +860,30 @@ def process_face_swap(mode, source_files, target_files, output_path, output_mode
                 base_name = f"{target_name}_{source_name}" if include_source_name else target_name
                 output_filename = (f"{base_name}_FF{target_ext}" if add_suffix
                                    else f"{base_name}{target_ext}")
-                output_file = str(source_output_path / output_filename)
-
-                print(f"\033[93m  [{target_idx+1}/{len(target_files)}] Processing:\033[0m {source_name} → {target_name}  \033[90m({today_str}/{source_name}-{target_parent_folder}/)\033[0m")
+                pairs.append((source_file, target_file, str(source_output_path / output_filename)))
+                pair_labels.append((source_name, target_name, target_parent_folder))
+
+        def on_start(i):
+            source_idx, target_idx = divmod(i, len(target_files))
+            source_name, target_name, target_parent_folder = pair_labels[i]
+            if target_idx == 0:
+                print(f"\n\033[1;93m📁 Processing source [{source_idx+1}/{len(source_files)}]:\033[0m {os.path.basename(source_files[source_idx])}")
+                print(f"\033[93m   Targets:\033[0m {len(target_files)} file(s)")
+                print()
+            print(f"\033[93m  [{target_idx+1}/{len(target_files)}] Processing:\033[0m {source_name} → {target_name}  \033[90m({today_str}/{source_name}-{target_parent_folder}/)\033[0m")
 
-                success, error_msg = process_single_headless(
-                    source_file, target_file, output_file,
-                    face_enhancer, face_enhancer_blend,
-                    expression_restorer, expression_restorer_factor
-                )
+        def on_done(i, success, error_msg):
+            nonlocal success_count, error_count
+            source_name, target_name, _ = pair_labels[i]
+            if success:
+                print(f"\033[92m    ✅ Success\033[0m")
+                success_count += 1
+            else:
+                print(f"\033[93m    ❌ Failed:\033[0m {error_msg[:50]}...")
+                error_count += 1
+                error_messages.append(f"{source_name}→{target_name}: {error_msg}")
 
-                if success:
-                    print(f"\033[92m    ✅ Success\033[0m")
-                    success_count += 1
-                else:
-                    print(f"\033[93m    ❌ Failed:\033[0m {error_msg[:50]}...")
-                    error_count += 1
-                    error_messages.append(f"{source_name}→{target_name}: {error_msg}")
+    run_pairs(pairs, ff_args, on_start, on_done)
 
     print()
     print("\033[92m=\033[0m" * 50)
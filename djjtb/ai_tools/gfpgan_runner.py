@@ -247,6 +247,35 @@ def process_individual_file(input_path, output_path, upscale, suffix, current_nu
         output_files_exist = check_output_exists(output_path, input_path, suffix)
         return output_files_exist, str(e) if not output_files_exist else "Success", file_elapsed
 
+def process_image_folder(input_folder, output_path, upscale, suffix, timeout_seconds=None):
+    """Run GFPGAN once over a whole folder of images (model loads once)"""
+    start_time = time.time()
+    
+    cmd = [
+        GFPGAN_VENV_PYTHON, "-m", "inference_gfpgan",
+        "-i", str(input_folder),
+        "-o", str(output_path),
+        "-v", "1.4",
+        "-s", str(upscale),
+        "--suffix", suffix,
+        "--bg_upsampler", "realesrgan"
+    ]
+    
+    try:
+        result = subprocess.run(
+            cmd,
+            cwd=GFPGAN_DIR,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            timeout=timeout_seconds
+        )
+        return result.returncode == 0, result.stdout, time.time() - start_time
+    except subprocess.TimeoutExpired:
+        return False, "Timeout", time.time() - start_time
+    except Exception as e:
+        return False, str(e), time.time() - start_time
+
 def process_folder_mode(input_paths, src_path, output_path, upscale, suffix, save_cropped, save_restored, save_comparison, tag_source):
     """Process all files in folder mode (faster, less verbose)"""
     overall_start_time = time.time()
@@ -270,23 +299,7 @@ def process_folder_mode(input_paths, src_path, output_path, upscale, suffix, sav
     print()
     
     # Process entire folder at once
-    cmd = [
-        GFPGAN_VENV_PYTHON, "-m", "inference_gfpgan",
-        "-i", str(src_path),
-        "-o", str(output_path),
-        "-v", "1.4",
-        "-s", str(upscale),
-        "--suffix", suffix,
-        "--bg_upsampler", "realesrgan"
-    ]
-    
-    result = subprocess.run(
-        cmd,
-        cwd=GFPGAN_DIR,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        text=True
-    )
+    process_image_folder(src_path, output_path, upscale, suffix)
     
     folder_elapsed = time.time() - overall_start_time
     
@@ -335,20 +348,47 @@ def process_multifile_mode(input_paths, upscale, suffix, save_cropped, save_rest
     
     success_count = 0
     output_paths = set()
+    images, videos = categorize_files(input_paths)
     
-    for i, input_path in enumerate(input_paths, start=1):
-        file_name = os.path.basename(input_path)
-        file_ext = pathlib.Path(input_path).suffix.lower()
-        
+    for input_path in input_paths:
         output_path = pathlib.Path(input_path).parent / "GFPGAN"
         output_path.mkdir(parents=True, exist_ok=True)
         output_paths.add(output_path)
+    
+    # Images from any folders go through one staged GFPGAN run (model loads once)
+    if images:
+        print(f"\033[93mProcessing {len(images)} image(s) in one batch...\033[0m")
+        with djj.StagedBatch(images) as stage:
+            _, output_msg, batch_elapsed = process_image_folder(
+                stage.input_dir, stage.output_dir, upscale, suffix, timeout_seconds=300 * len(images)
+            )
+            results = stage.distribute(lambda src: pathlib.Path(src).parent / "GFPGAN")
+        
+        total_elapsed = time.time() - overall_start_time
         
-        # Longer timeout for videos
-        timeout = 480 if file_ext in VIDEO_EXTS else 300
+        # Judge by outputs, not exit code (GFPGAN might error but still create files)
+        failed = 0
+        for input_path in images:
+            file_name = os.path.basename(input_path)
+            if any(p.parent.name == "restored_imgs" for p in results[input_path]):
+                print(f"\033[92m✅ Success:\033[0m {file_name}")
+                success_count += 1
+            else:
+                print(f"\033[93m❌ Failed:\033[0m {file_name}")
+                failed += 1
+        
+        print(f"  \033[36mBatch time:\033[0m {format_elapsed_time(batch_elapsed)}")
+        print(f"  \033[36mTotal time:\033[0m {format_elapsed_time(total_elapsed)}")
+        if failed and output_msg:
+            print(f"   Error: {output_msg[-200:]}")
+        print()
+    
+    for i, input_path in enumerate(videos, start=1):
+        file_name = os.path.basename(input_path)
+        output_path = pathlib.Path(input_path).parent / "GFPGAN"
         
         success, output_msg, file_elapsed = process_individual_file(
-            input_path, output_path, upscale, suffix, i, len(input_paths), timeout
+            input_path, output_path, upscale, suffix, i, len(videos), 480
         )
         
         total_elapsed = time.time() - overall_start_time
@@ -19,51 +19,249 @@ def safe_filename(name):
 def open_folder_mac(folder_path):
     subprocess.run(["open", str(folder_path)], check=False)
 
-def search_tags_in_db(db_path, search_term, confidence_threshold):
-    matches = []
-    try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT i.file_path, t.confidence_score
-            FROM images i
-            JOIN tags t ON i.id = t.image_id
-            WHERE t.tag_name LIKE ?
-            AND t.confidence_score >= ?
-            ORDER BY t.confidence_score DESC
-        ''', (f'%{search_term}%', confidence_threshold))
-        results = cursor.fetchall()
-        matches = [(pathlib.Path(row[0]), row[1]) for row in results]
-        conn.close()
-    except Exception as e:
-        print(f"\n\033[91m❌ DB Error:\033[0m {e}\n")
-    return matches
-
-def search_tags_in_xmp(folder_path, search_term, include_subfolders=True):
-    import xml.etree.ElementTree as ET
-    folder_path = pathlib.Path(folder_path)
-    xmp_files = folder_path.rglob("*.xmp") if include_subfolders else folder_path.glob("*.xmp")
-    matches = []
-    terms = [t.strip().lower() for t in search_term.split(',')]
-
-    for xmp_file in xmp_files:
-        # Skip XMPs for videos
-        if any(xmp_file.name.lower().endswith(ext + ".xmp") for ext in VIDEO_EXTS):
-            continue
+# ─── Tag Search Index ────────────────────────────────────────────────────────
+# One persistent SQLite index of every tag from JoyTag/CLIP DBs and XMP
+# sidecars. Tags are normalized into tag_dict (with an FTS5 trigram table for
+# substring lookups), image_tags maps tag ids to image paths, and sources
+# records each DB / sidecar's size + mtime so refreshes only re-read what changed.
+
+TAG_INDEX_PATH = pathlib.Path("~/Library/Caches/DJJTB/image_finder_index.sqlite").expanduser()
+RDF_LI = "{http://www.w3.org/1999/02/22-rdf-syntax-ns#}li"
+
+
+def normalize_tag(tag):
+    return " ".join(tag.strip().lower().split())
+
 
+def read_xmp_tags(xmp_file):
+    """All rdf:li values in a sidecar (dc:subject, digiKam TagsList, hierarchicalSubject...)"""
+    import xml.etree.ElementTree as ET
+    tags = set()
+    for elem in ET.parse(xmp_file).getroot().iter(RDF_LI):
+        if elem.text and elem.text.strip():
+            tags.add(normalize_tag(elem.text))
+    return tags
+
+
+def resolve_sidecar_image(xmp_file):
+    """Image a sidecar belongs to: photo.jpg.xmp (JoyTag style) or photo.xmp (digiKam style)"""
+    stem = xmp_file.with_suffix("")
+    if stem.suffix.lower() in SUPPORTED_EXTS:
+        return stem if stem.exists() else None
+    for ext in SUPPORTED_EXTS:
+        candidate = stem.with_suffix(ext)
+        if candidate.exists():
+            return candidate
+    return None
+
+
+class TagIndex:
+    def __init__(self, index_path=TAG_INDEX_PATH):
+        pathlib.Path(index_path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(index_path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS tag_dict (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+            CREATE TABLE IF NOT EXISTS sources (
+                id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, kind TEXT NOT NULL,
+                dir TEXT NOT NULL, size INTEGER, mtime_ns INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS image_tags (
+                image_path TEXT NOT NULL, tag_id INTEGER NOT NULL,
+                confidence REAL, source_id INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_image_tags_tag ON image_tags(tag_id, source_id);
+            CREATE INDEX IF NOT EXISTS idx_image_tags_source ON image_tags(source_id);
+            CREATE INDEX IF NOT EXISTS idx_sources_dir ON sources(kind, dir);
+        ''')
         try:
-            tree = ET.parse(xmp_file)
-            root = tree.getroot()
-            text = ET.tostring(root, encoding='utf-8', method='text').decode('utf-8').lower()
-            if any(term in text for term in terms):
-                for ext in SUPPORTED_EXTS:
-                    candidate = xmp_file.with_suffix(ext)
-                    if candidate.exists():
-                        matches.append(candidate)
-                        break
-        except Exception as e:
-            print(f"⚠️ Failed to read {xmp_file.name}: {e}")
-    return matches
+            self.conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS tag_fts USING fts5(name, tokenize='trigram')")
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            # SQLite without FTS5/trigram: LIKE over the (small) tag dictionary instead
+            self.has_fts = False
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    # ── Building ──────────────────────────────────────────────────────────────
+
+    def _tag_ids(self, names):
+        names = list(names)
+        before = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM tag_dict").fetchone()[0]
+        self.conn.executemany("INSERT OR IGNORE INTO tag_dict (name) VALUES (?)", [(n,) for n in names])
+        self._sync_fts(before)
+        ids = {}
+        for i in range(0, len(names), 500):
+            chunk = names[i:i + 500]
+            ids.update(self.conn.execute(
+                f"SELECT name, id FROM tag_dict WHERE name IN ({','.join('?' * len(chunk))})", chunk))
+        return ids
+
+    def _sync_fts(self, after_id):
+        if self.has_fts:
+            self.conn.execute("INSERT INTO tag_fts (rowid, name) SELECT id, name FROM tag_dict WHERE id > ?",
+                              (after_id,))
+
+    def _source(self, path, kind, size, mtime_ns):
+        """Return (source_id, changed) and clear the old rows of a changed source"""
+        row = self.conn.execute("SELECT id, size, mtime_ns FROM sources WHERE path = ?", (path,)).fetchone()
+        if row and (row[1], row[2]) == (size, mtime_ns):
+            return row[0], False
+        if row:
+            self.conn.execute("DELETE FROM image_tags WHERE source_id = ?", (row[0],))
+            self.conn.execute("UPDATE sources SET size = ?, mtime_ns = ? WHERE id = ?", (size, mtime_ns, row[0]))
+            return row[0], True
+        cur = self.conn.execute("INSERT INTO sources (path, kind, dir, size, mtime_ns) VALUES (?, ?, ?, ?, ?)",
+                                (path, kind, os.path.dirname(path), size, mtime_ns))
+        return cur.lastrowid, True
+
+    def _drop_source(self, source_id):
+        self.conn.execute("DELETE FROM image_tags WHERE source_id = ?", (source_id,))
+        self.conn.execute("DELETE FROM sources WHERE id = ?", (source_id,))
+
+    def refresh_db(self, db_path):
+        """(Re)import a JoyTag/CLIP results DB if it changed since the last refresh. Returns source id."""
+        db_path = str(pathlib.Path(db_path).resolve())
+        st = os.stat(db_path)
+        size, mtime_ns = st.st_size, st.st_mtime_ns
+        wal = db_path + "-wal"
+        if os.path.exists(wal):
+            # A WAL-mode DB (joytag_results.db) changes without touching the main file
+            wal_st = os.stat(wal)
+            size, mtime_ns = size + wal_st.st_size, max(mtime_ns, wal_st.st_mtime_ns)
+        source_id, changed = self._source(db_path, "db", size, mtime_ns)
+        if not changed:
+            return source_id
+
+        print(f"\033[93m🔄 Indexing tags from\033[0m {pathlib.Path(db_path).name}...")
+        src = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            names = {normalize_tag(n) for (n,) in src.execute("SELECT DISTINCT tag_name FROM tags") if n}
+            ids = self._tag_ids(names)
+            rows = src.execute('''
+                SELECT i.file_path, t.tag_name, t.confidence_score
+                FROM images i JOIN tags t ON i.id = t.image_id
+            ''')
+            while True:
+                chunk = rows.fetchmany(50000)
+                if not chunk:
+                    break
+                self.conn.executemany(
+                    "INSERT INTO image_tags (image_path, tag_id, confidence, source_id) VALUES (?, ?, ?, ?)",
+                    [(path, ids[normalize_tag(tag)], conf, source_id) for path, tag, conf in chunk if tag])
+        finally:
+            src.close()
+        self.conn.commit()
+        return source_id
+
+    def refresh_xmp(self, folder_path, include_subfolders=True):
+        """Re-read only new or modified sidecars under folder_path, and forget deleted ones."""
+        folder_path = pathlib.Path(folder_path).resolve()
+        xmp_files = folder_path.rglob("*.xmp") if include_subfolders else folder_path.glob("*.xmp")
+        seen = set()
+        changed = 0
+
+        for xmp_file in xmp_files:
+            # Skip XMPs for videos
+            if any(xmp_file.name.lower().endswith(ext + ".xmp") for ext in VIDEO_EXTS):
+                continue
+            path = str(xmp_file)
+            seen.add(path)
+            try:
+                st = xmp_file.stat()
+                source_id, is_changed = self._source(path, "xmp", st.st_size, st.st_mtime_ns)
+                if not is_changed:
+                    continue
+                image = resolve_sidecar_image(xmp_file)
+                tags = read_xmp_tags(xmp_file) if image else set()
+                if tags:
+                    ids = self._tag_ids(tags)
+                    self.conn.executemany(
+                        "INSERT INTO image_tags (image_path, tag_id, confidence, source_id) VALUES (?, ?, NULL, ?)",
+                        [(str(image), ids[t], source_id) for t in tags])
+                changed += 1
+                if changed % 1000 == 0:
+                    self.conn.commit()
+            except Exception as e:
+                print(f"⚠️ Failed to read {xmp_file.name}: {e}")
+
+        for source_id, path in self._xmp_sources(folder_path, include_subfolders):
+            if path not in seen:
+                self._drop_source(source_id)
+        self.conn.commit()
+        if changed:
+            print(f"\033[93m🔄 Indexed {changed} new/changed sidecar(s)\033[0m")
+
+    def _xmp_sources(self, folder_path, include_subfolders):
+        root = str(folder_path)
+        if include_subfolders:
+            # Range scan on the path prefix ('0' sorts right after '/')
+            return self.conn.execute(
+                "SELECT id, path FROM sources WHERE kind = 'xmp' AND path > ? AND path < ?",
+                (root + "/", root + "0")).fetchall()
+        return self.conn.execute(
+            "SELECT id, path FROM sources WHERE kind = 'xmp' AND dir = ?", (root,)).fetchall()
+
+    # ── Querying ──────────────────────────────────────────────────────────────
+
+    def matching_tag_ids(self, term):
+        """Ids of every tag containing term (same substring semantics as LIKE '%term%')"""
+        term = normalize_tag(term)
+        if self.has_fts and len(term) >= 3:
+            rows = self.conn.execute("SELECT rowid FROM tag_fts WHERE tag_fts MATCH ?",
+                                     ('"' + term.replace('"', '""') + '"',))
+        else:
+            escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            rows = self.conn.execute("SELECT id FROM tag_dict WHERE name LIKE ? ESCAPE '\\'",
+                                     (f"%{escaped}%",))
+        return [r[0] for r in rows]
+
+    def search(self, term, db_source_id=None, confidence_threshold=0.0,
+               xmp_folder=None, include_subfolders=True):
+        """
+        Images tagged with term, from the given DB source (at or above the
+        confidence threshold) and/or from sidecars under xmp_folder.
+        """
+        tag_ids = self.matching_tag_ids(term)
+        if not tag_ids:
+            return set()
+        tag_list = ",".join(str(t) for t in tag_ids)
+        matches = set()
+
+        if db_source_id is not None:
+            matches.update(pathlib.Path(r[0]) for r in self.conn.execute(
+                f"SELECT image_path FROM image_tags WHERE tag_id IN ({tag_list}) "
+                f"AND source_id = ? AND confidence >= ?", (db_source_id, confidence_threshold)))
+
+        if xmp_folder is not None:
+            root = str(pathlib.Path(xmp_folder).resolve())
+            if include_subfolders:
+                scope, params = "s.path > ? AND s.path < ?", (root + "/", root + "0")
+            else:
+                scope, params = "s.dir = ?", (root,)
+            matches.update(pathlib.Path(r[0]) for r in self.conn.execute(
+                f"SELECT it.image_path FROM image_tags it JOIN sources s ON s.id = it.source_id "
+                f"WHERE it.tag_id IN ({tag_list}) AND s.kind = 'xmp' AND {scope}", params))
+        return matches
+
+    def search_terms(self, terms, use_and, **kwargs):
+        """Run every term; returns (combined matches, {term: matches}) with AND/OR combining"""
+        term_matches_dict = {}
+        all_matches = None
+        for term in terms:
+            term_matches = {m for m in self.search(term, **kwargs) if m.suffix.lower() in SUPPORTED_EXTS}
+            term_matches_dict[term] = term_matches
+            if all_matches is None:
+                all_matches = set(term_matches)
+            elif use_and:
+                all_matches &= term_matches
+            else:
+                all_matches |= term_matches
+        return all_matches or set(), term_matches_dict
+
 
 def xmp_only_mode(input_path_obj, include_sub):
     print("\n\033[93mXMP-only mode activated. Searching sidecar files only...\033[0m\n")
@@ -82,22 +280,13 @@ def xmp_only_mode(input_path_obj, include_sub):
         )
         use_and = and_or_choice == '1'
 
-    all_matches = None if use_and else set()
-    term_matches_dict = {}
-
-    for term in search_terms:
-        term_matches = {m for m in search_tags_in_xmp(input_path_obj, term, include_sub)
-                        if m.suffix.lower() in SUPPORTED_EXTS}
-        if use_and:
-            if all_matches is None:
-                all_matches = term_matches
-            else:
-                all_matches &= term_matches
-        else:
-            term_matches_dict[term] = term_matches
-            if all_matches is None:
-                all_matches = set()
-            all_matches.update(term_matches)
+    index = TagIndex()
+    try:
+        index.refresh_xmp(input_path_obj, include_sub)
+        all_matches, term_matches_dict = index.search_terms(
+            search_terms, use_and, xmp_folder=input_path_obj, include_subfolders=include_sub)
+    finally:
+        index.close()
 
     if not all_matches:
         print(f"\n\033[91m⚠️ No matching results found.\033[0m\n")
@@ -206,140 +395,141 @@ def main():
             default='2'
         ) == '1'
 
-        while True:
-            search_input = input("\033[93m🔍 Enter tag(s) to search (comma-separated for multiple):\n -> \033[0m").strip()
-            if not search_input:
-                print("\033[93m❌ No tag entered.\033[0m\n")
-                continue
-
-            threshold_input = input("\033[93m🎯 Confidence threshold [0.1–1.0, default 0.5]:\n -> \033[0m").strip()
-            try:
-                confidence_threshold = float(threshold_input) if threshold_input else 0.5
-                confidence_threshold = max(0.1, min(1.0, confidence_threshold))
-            except:
-                confidence_threshold = 0.5
+        # Bring the index up to date once; later searches in this loop are pure lookups
+        index = TagIndex()
+        try:
+            db_source_id = index.refresh_db(db_path)
+            if use_xmp:
+                index.refresh_xmp(input_path_obj, include_sub)
+        except Exception as e:
+            print(f"\n\033[91m❌ DB Error:\033[0m {e}\n")
+            index.close()
+            continue
 
-            search_terms = [t.strip() for t in search_input.split(',') if t.strip()]
+        try:
+            while True:
+                search_input = input("\033[93m🔍 Enter tag(s) to search (comma-separated for multiple):\n -> \033[0m").strip()
+                if not search_input:
+                    print("\033[93m❌ No tag entered.\033[0m\n")
+                    continue
 
-            use_and = False
-            if len(search_terms) > 1:
-                and_or_choice = djj.prompt_choice(
-                    "\033[93mMultiple terms detected. Use AND or OR search?\033[0m\n1. AND (all terms must match)\n2. OR (any term matches)",
-                    ['1', '2'],
-                    default='2'
+                threshold_input = input("\033[93m🎯 Confidence threshold [0.1–1.0, default 0.5]:\n -> \033[0m").strip()
+                try:
+                    confidence_threshold = float(threshold_input) if threshold_input else 0.5
+                    confidence_threshold = max(0.1, min(1.0, confidence_threshold))
+                except:
+                    confidence_threshold = 0.5
+
+                search_terms = [t.strip() for t in search_input.split(',') if t.strip()]
+
+                use_and = False
+                if len(search_terms) > 1:
+                    and_or_choice = djj.prompt_choice(
+                        "\033[93mMultiple terms detected. Use AND or OR search?\033[0m\n1. AND (all terms must match)\n2. OR (any term matches)",
+                        ['1', '2'],
+                        default='2'
+                    )
+                    use_and = and_or_choice == '1'
+
+                all_matches, term_matches_dict = index.search_terms(
+                    search_terms, use_and,
+                    db_source_id=db_source_id,
+                    confidence_threshold=confidence_threshold,
+                    xmp_folder=input_path_obj if use_xmp else None,
+                    include_subfolders=include_sub,
                 )
-                use_and = and_or_choice == '1'
 
-            all_matches = None if use_and else set()
-            term_matches_dict = {}
+                if not all_matches:
+                    print(f"\n\033[91m⚠️ No matching results found.\033[0m\n")
+                    break
 
-            for term in search_terms:
-                matches = search_tags_in_db(db_path, term, confidence_threshold)
-                term_matches = {m[0] for m in matches if m[0].suffix.lower() in SUPPORTED_EXTS}
+                matched_paths = sorted(all_matches)
+                print(f"\n✅ Found \033[92m{len(matched_paths)}\033[0m image(s) matching your search.\n")
 
-                if use_xmp:
-                    xmp_matches = search_tags_in_xmp(input_path_obj, term, include_sub)
-                    term_matches.update(m for m in xmp_matches if m.suffix.lower() in SUPPORTED_EXTS)
+                base_output_dir = input_path_obj / "Output" / "image_finder_results"
+                base_output_dir.mkdir(parents=True, exist_ok=True)
 
-                if use_and:
-                    if all_matches is None:
-                        all_matches = term_matches
-                    else:
-                        all_matches &= term_matches
-                else:
-                    term_matches_dict[term] = term_matches
-                    if all_matches is None:
-                        all_matches = set()
-                    all_matches.update(term_matches)
-
-            if not all_matches:
-                print(f"\n\033[91m⚠️ No matching results found.\033[0m\n")
-                break
-
-            matched_paths = sorted(all_matches)
-            print(f"\n✅ Found \033[92m{len(matched_paths)}\033[0m image(s) matching your search.\n")
-
-            base_output_dir = input_path_obj / "Output" / "image_finder_results"
-            base_output_dir.mkdir(parents=True, exist_ok=True)
-
-            # Output choice: subfolder or CSV
-            output_choice = djj.prompt_choice(
-                "\033[93mOutput results as:\033[0m\n1. Subfolder(s)\n2. CSV",
-                ['1', '2'],
-                default='1'
-            )
-
-            if output_choice == '1':
-                if use_and:
-                    safe_term = safe_filename("_".join(search_terms))
-                    output_dir = base_output_dir / safe_term
-                    if output_dir.exists():
-                        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-                        output_dir = base_output_dir / f"{safe_term}_{timestamp}"
-                    output_dir.mkdir(parents=True, exist_ok=True)
-                    for src in matched_paths:
-                        if include_sub and not src.is_file():
-                            continue
-                        if not include_sub and src.parent != input_path_obj:
-                            continue
-                        dest = output_dir / src.name
-                        try:
-                            shutil.copy2(src, dest)
-                        except Exception as e:
-                            print(f"\033[93m⚠️ Failed to copy\033[0m {src.name}: {e}")
-                    open_folder_mac(output_dir)
-                else:  # OR mode
-                    for term, term_matches in term_matches_dict.items():
-                        if not term_matches:
-                            continue
-                        term_safe = safe_filename(term)
-                        term_dir = base_output_dir / term_safe
-                        term_dir.mkdir(parents=True, exist_ok=True)
-                        for src in term_matches:
+                # Output choice: subfolder or CSV
+                output_choice = djj.prompt_choice(
+                    "\033[93mOutput results as:\033[0m\n1. Subfolder(s)\n2. CSV",
+                    ['1', '2'],
+                    default='1'
+                )
+
+                if output_choice == '1':
+                    if use_and:
+                        safe_term = safe_filename("_".join(search_terms))
+                        output_dir = base_output_dir / safe_term
+                        if output_dir.exists():
+                            timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+                            output_dir = base_output_dir / f"{safe_term}_{timestamp}"
+                        output_dir.mkdir(parents=True, exist_ok=True)
+                        for src in matched_paths:
                             if include_sub and not src.is_file():
                                 continue
                             if not include_sub and src.parent != input_path_obj:
                                 continue
-                            dest = term_dir / src.name
+                            dest = output_dir / src.name
                             try:
                                 shutil.copy2(src, dest)
                             except Exception as e:
                                 print(f"\033[93m⚠️ Failed to copy\033[0m {src.name}: {e}")
-                        open_folder_mac(term_dir)
-            else:  # CSV output
-                csv_file = base_output_dir / f"image_finder_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-                with open(csv_file, 'w', newline='') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(['filename', 'absolute_path'])
-                    for src in matched_paths:
-                        writer.writerow([src.name, str(src.resolve())])
-                print(f"\n✅ CSV saved: {csv_file}")
+                        open_folder_mac(output_dir)
+                    else:  # OR mode
+                        for term, term_matches in term_matches_dict.items():
+                            if not term_matches:
+                                continue
+                            term_safe = safe_filename(term)
+                            term_dir = base_output_dir / term_safe
+                            term_dir.mkdir(parents=True, exist_ok=True)
+                            for src in term_matches:
+                                if include_sub and not src.is_file():
+                                    continue
+                                if not include_sub and src.parent != input_path_obj:
+                                    continue
+                                dest = term_dir / src.name
+                                try:
+                                    shutil.copy2(src, dest)
+                                except Exception as e:
+                                    print(f"\033[93m⚠️ Failed to copy\033[0m {src.name}: {e}")
+                            open_folder_mac(term_dir)
+                else:  # CSV output
+                    csv_file = base_output_dir / f"image_finder_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+                    with open(csv_file, 'w', newline='') as f:
+                        writer = csv.writer(f)
+                        writer.writerow(['filename', 'absolute_path'])
+                        for src in matched_paths:
+                            writer.writerow([src.name, str(src.resolve())])
+                    print(f"\n✅ CSV saved: {csv_file}")
             
-            djj.prompt_open_folder(base_output_dir)
-                        # Inline custom what_next with 4 options
-            print()
-            print("---------------")
-            print()
-            print("\033[93mWhat Next? 🤷🏻‍♂️ \033[0m")
-            print("1. Go Again (search term)")
-            print("2. Return to DJJTB")
-            print("3. Exit")
-            print("4. Restart from folder selection")
-            action = input("> ").strip()
-
-            if action == '1':
-                os.system('clear')
-                continue  # Go again (search term)
-            elif action == '2':
-                djj.return_to_djjtb()
-                return
-            elif action == '3':
-                print("👋 Exiting Image Finder.")
-                return
-            elif action == '4':
-                break  # Restart from folder selection
-            else:
-                print("⚠️ Invalid choice, going back to search term input.\n")
-                continue
+                djj.prompt_open_folder(base_output_dir)
+                            # Inline custom what_next with 4 options
+                print()
+                print("---------------")
+                print()
+                print("\033[93mWhat Next? 🤷🏻‍♂️ \033[0m")
+                print("1. Go Again (search term)")
+                print("2. Return to DJJTB")
+                print("3. Exit")
+                print("4. Restart from folder selection")
+                action = input("> ").strip()
+
+                if action == '1':
+                    os.system('clear')
+                    continue  # Go again (search term)
+                elif action == '2':
+                    djj.return_to_djjtb()
+                    return
+                elif action == '3':
+                    print("👋 Exiting Image Finder.")
+                    return
+                elif action == '4':
+                    break  # Restart from folder selection
+                else:
+                    print("⚠️ Invalid choice, going back to search term input.\n")
+                    continue
+        finally:
+            index.close()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
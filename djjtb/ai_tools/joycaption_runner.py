@@ -19,6 +19,8 @@ Notes:
     - Script runs on CPU with PYTORCH_ENABLE_MPS_FALLBACK=1 as safety net
     - On M4 Max 64GB: expect ~20-45s per image on CPU (fine for batch overnight jobs)
     - float32 on CPU is stable and produces identical output quality to bfloat16 on CUDA
+    - Images are captioned CAPTION_BATCH_SIZE per generate() call; the next batch
+      is loaded and preprocessed on a background thread while the current one runs
 """
 
 import os
@@ -27,6 +29,7 @@ import pathlib
 import subprocess
 import time
 import gc
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional
 
 # ── MPS fallback env var must be set BEFORE torch imports ──────────────────────
@@ -55,6 +58,11 @@ MODEL_ID           = "fancyfeast/llama-joycaption-beta-one-hf-llava"
 
 SUPPORTED_EXTS     = (".jpg", ".jpeg", ".png", ".webp", ".bmp", ".tiff")
 
+# Images per generate() call. Every image uses the same prompt, so a batch is
+# one prefill over N identical-length sequences — the weights stream through
+# once per step for N captions instead of one
+CAPTION_BATCH_SIZE = 4
+
 # ── Caption style prompts (JoyCaption Beta One instruction-style) ──────────────
 # These are the prompts you pass as the user message — JoyCaption uses them
 # to steer output style. Keep them as-is; they're tuned for the model.
@@ -195,6 +203,7 @@ class JoyCaptionModel:
         self.model = None
         self.processor = None
         self.loaded = False
+        self._prompt_cache = {}
 
     def load(self) -> bool:
         print("\033[93m📥 Loading JoyCaption Beta One...\033[0m")
@@ -225,6 +234,13 @@ class JoyCaptionModel:
             )
             self.model.eval()
 
+            # Decoder-only batching pads on the left so every row ends at the
+            # generation point; Llama 3 ships without a pad token
+            tokenizer = self.processor.tokenizer
+            tokenizer.padding_side = "left"
+            if tokenizer.pad_token is None:
+                tokenizer.pad_token = tokenizer.eos_token
+
             print("✅ \033[92mJoyCaption loaded successfully\033[0m")
             print()
             self.loaded = True
@@ -234,28 +250,16 @@ class JoyCaptionModel:
             print(f"\033[93m❌ Failed to load model: {e}\033[0m")
             return False
 
-    def caption(
-        self,
-        image_path: str,
-        style_prompt: str,
-        character_name: Optional[str] = None,
-        max_tokens: int = 300,
-    ) -> Optional[str]:
+    def build_prompt(self, style_prompt: str, character_name: Optional[str] = None) -> str:
         """
-        Generate a caption for a single image.
+        Chat-formatted prompt text for a style / character pair. Rendered once
+        and reused for every image in the run.
 
         character_name: if provided, appended to the system prompt so JoyCaption
         can use the subject's name in training captions (standard LoRA technique).
         """
-        if not self.loaded:
-            return None
-
-        try:
-            import torch
-            from PIL import Image
-
-            image = Image.open(image_path).convert("RGB")
-
+        key = (style_prompt, character_name)
+        if key not in self._prompt_cache:
             # System prompt — JoyCaption Beta One uses this to frame its role.
             # Optionally inject character name for LoRA subject captioning.
             system_prompt = "You are a helpful image captioning assistant."
@@ -271,20 +275,63 @@ class JoyCaptionModel:
                 {"role": "user",    "content": f"<image>\n{style_prompt}"},
             ]
 
-            convo_string = self.processor.apply_chat_template(
+            self._prompt_cache[key] = self.processor.apply_chat_template(
                 convo, tokenize=False, add_generation_prompt=True
             )
+        return self._prompt_cache[key]
+
+    def prepare_batch(
+        self,
+        image_paths: List[str],
+        style_prompt: str,
+        character_name: Optional[str] = None,
+    ) -> dict:
+        """
+        Load and preprocess images into one padded model input. CPU-only work,
+        safe to run on a background thread while generate() runs.
+        Returns {"paths", "failed", "inputs"}; unreadable images go to "failed".
+        """
+        import torch
+        from PIL import Image
+
+        prompt = self.build_prompt(style_prompt, character_name)
+        paths, images, failed = [], [], []
+        for image_path in image_paths:
+            try:
+                with Image.open(image_path) as img:
+                    images.append(img.convert("RGB"))
+                paths.append(image_path)
+            except Exception as e:
+                failed.append((image_path, str(e)))
 
+        inputs = None
+        if images:
             inputs = self.processor(
-                text=[convo_string],
-                images=[image],
+                text=[prompt] * len(images),
+                images=images,
+                padding=True,
                 return_tensors="pt",
             )
-
             # Cast to float32 — avoids any bfloat16 remnants from processor
             if "pixel_values" in inputs and inputs["pixel_values"] is not None:
                 inputs["pixel_values"] = inputs["pixel_values"].to(torch.float32)
 
+        return {"paths": paths, "failed": failed, "inputs": inputs}
+
+    def caption_batch(self, prepared: dict, max_tokens: int = 300):
+        """
+        Run one generate() over a prepared batch.
+        Returns (captions aligned with prepared["paths"] — None where empty or
+        failed, number of tokens generated).
+        """
+        if not self.loaded or prepared["inputs"] is None:
+            return [None] * len(prepared["paths"]), 0
+
+        import torch
+
+        inputs = prepared["inputs"]
+        tokenizer = self.processor.tokenizer
+        try:
             with torch.no_grad():
                 output_ids = self.model.generate(
                     **inputs,
@@ -295,21 +342,49 @@ class JoyCaptionModel:
                     top_k=None,
                     suppress_tokens=None,
                     use_cache=True,
-                )[0]
-
-            # Trim the prompt tokens off the front of the output
-            output_ids = output_ids[inputs["input_ids"].shape[1]:]
-            caption = self.processor.tokenizer.decode(
-                output_ids,
+                    pad_token_id=tokenizer.pad_token_id,
+                )
+        except Exception as e:
+            print(f"\n  \033[93m❌ Caption error: {e}\033[0m")
+            return [None] * len(prepared["paths"]), 0
+
+        # Trim the prompt tokens off the front of the output (left padding
+        # keeps every row's prompt the same width)
+        generated = output_ids[:, inputs["input_ids"].shape[1]:]
+        stop_ids = {tokenizer.pad_token_id, tokenizer.eos_token_id}
+        token_count = sum(1 for tok in generated.flatten().tolist() if tok not in stop_ids)
+
+        captions = []
+        for row in generated:
+            caption = tokenizer.decode(
+                row,
                 skip_special_tokens=True,
                 clean_up_tokenization_spaces=False,
             ).strip()
+            captions.append(caption if caption else None)
+        return captions, token_count
 
-            return caption if caption else None
+    def caption(
+        self,
+        image_path: str,
+        style_prompt: str,
+        character_name: Optional[str] = None,
+        max_tokens: int = 300,
+    ) -> Optional[str]:
+        """Generate a caption for a single image."""
+        if not self.loaded:
+            return None
 
+        try:
+            prepared = self.prepare_batch([image_path], style_prompt, character_name)
         except Exception as e:
             print(f"\n  \033[93m❌ Caption error: {e}\033[0m")
             return None
+        if not prepared["paths"]:
+            print(f"\n  \033[93m❌ Caption error: {prepared['failed'][0][1]}\033[0m")
+            return None
+        captions, _ = self.caption_batch(prepared, max_tokens)
+        return captions[0]
 
     def unload(self):
         if self.model:
@@ -331,6 +406,7 @@ def process_images(
     character_name: Optional[str],
     skip_existing: bool,
     max_tokens: int,
+    batch_size: int = CAPTION_BATCH_SIZE,
 ):
     style = CAPTION_STYLES[style_key]
     style_prompt = style["prompt"]
@@ -339,6 +415,7 @@ def process_images(
     success = 0
     skipped = 0
     failed = 0
+    total_tokens = 0
     batch_start = time.time()
 
     print()
@@ -346,48 +423,82 @@ def process_images(
     print(f"\033[93m   Style: {style['label']}\033[0m")
     if character_name:
         print(f"\033[93m   Character: {character_name}\033[0m")
+    print(f"\033[93m   Batch size: {batch_size}\033[0m")
     print("\033[92m" + "=" * 50 + "\033[0m")
     print()
 
+    # Work out outputs and skips up front so batches only hold real work
+    todo = []
     for idx, img_path in enumerate(images, 1):
         img_path_obj = pathlib.Path(img_path)
-        fname = img_path_obj.name
-        stem  = img_path_obj.stem
 
         # Output goes to Output/JoyCaption/ inside the image's parent folder
         out_dir = img_path_obj.parent / "Output" / "JoyCaption"
         out_dir.mkdir(parents=True, exist_ok=True)
-        out_txt = out_dir / f"{stem}.txt"
-
-        pct = int((idx / total) * 100)
-        elapsed = time.time() - batch_start
-        print(f"\033[93m[{idx}/{total}]\033[0m ({pct}%) {fname}  \033[36m[{format_time(elapsed)}]\033[0m")
+        out_txt = out_dir / f"{img_path_obj.stem}.txt"
 
         # Skip if .txt already exists and user chose to skip
         if skip_existing and out_txt.exists():
-            print(f"  \033[92m⏭️  Skipped (caption exists)\033[0m")
+            print(f"\033[93m[{idx}/{total}]\033[0m {img_path_obj.name}  \033[92m⏭️  Skipped (caption exists)\033[0m")
             skipped += 1
             continue
+        todo.append((idx, img_path, out_txt))
+    if skipped:
+        print()
+
+    batches = [todo[i:i + batch_size] for i in range(0, len(todo), batch_size)]
 
-        img_start = time.time()
-        caption = model.caption(img_path, style_prompt, character_name, max_tokens)
-        img_time = time.time() - img_start
+    def prepare(batch):
+        return model.prepare_batch([img_path for _, img_path, _ in batch], style_prompt, character_name)
 
-        if caption:
+    # Prefetch: the next batch is decoded and preprocessed while this one generates
+    with ThreadPoolExecutor(max_workers=1) as prefetch:
+        next_prepared = prefetch.submit(prepare, batches[0]) if batches else None
+
+        for batch_num, batch in enumerate(batches, 1):
             try:
-                out_txt.write_text(caption, encoding="utf-8")
-                # Show a short preview of the caption
-                preview = caption[:80] + "..." if len(caption) > 80 else caption
-                print(f"  \033[92m✅ {format_time(img_time)}\033[0m  \"{preview}\"")
-                success += 1
+                prepared = next_prepared.result()
             except Exception as e:
-                print(f"  \033[93m❌ Write error: {e}\033[0m")
-                failed += 1
-        else:
-            print(f"  \033[93m❌ Caption failed\033[0m")
-            failed += 1
-
-        print()
+                print(f"  \033[93m❌ Preprocess error: {e}\033[0m")
+                prepared = {"paths": [], "failed": [(p, str(e)) for _, p, _ in batch], "inputs": None}
+            next_prepared = prefetch.submit(prepare, batches[batch_num]) if batch_num < len(batches) else None
+
+            gen_start = time.time()
+            captions, tokens = model.caption_batch(prepared, max_tokens)
+            gen_time = time.time() - gen_start
+            total_tokens += tokens
+
+            results = dict(zip(prepared["paths"], captions))
+            errors = dict(prepared["failed"])
+
+            for idx, img_path, out_txt in batch:
+                pct = int((idx / total) * 100)
+                elapsed = time.time() - batch_start
+                print(f"\033[93m[{idx}/{total}]\033[0m ({pct}%) {pathlib.Path(img_path).name}  \033[36m[{format_time(elapsed)}]\033[0m")
+
+                caption = results.get(img_path)
+                if caption:
+                    try:
+                        out_txt.write_text(caption, encoding="utf-8")
+                        # Show a short preview of the caption
+                        preview = caption[:80] + "..." if len(caption) > 80 else caption
+                        print(f"  \033[92m✅\033[0m  \"{preview}\"")
+                        success += 1
+                    except Exception as e:
+                        print(f"  \033[93m❌ Write error: {e}\033[0m")
+                        failed += 1
+                elif img_path in errors:
+                    print(f"  \033[93m❌ Could not read image: {errors[img_path]}\033[0m")
+                    failed += 1
+                else:
+                    print(f"  \033[93m❌ Caption failed\033[0m")
+                    failed += 1
+
+            n = len(prepared["paths"])
+            if n:
+                print(f"  \033[36m📦 Batch {batch_num}/{len(batches)}: {n} image(s) in {format_time(gen_time)}"
+                      f" — {format_time(gen_time / n)}/image, {tokens / max(gen_time, 1e-9):.1f} tok/s\033[0m")
+            print()
 
     total_time = time.time() - batch_start
     avg_time   = total_time / max(success, 1)
@@ -401,6 +512,7 @@ def process_images(
         print(f"  \033[93mFailed:\033[0m   {failed}")
     print(f"  \033[93mTotal time:\033[0m {format_time(total_time)}")
     print(f"  \033[93mAvg/image:\033[0m  {format_time(avg_time)}")
+    print(f"  \033[93mTokens/sec:\033[0m {total_tokens / max(total_time, 1e-9):.1f}")
     print()
 
     return success, skipped, failed
@@ -520,6 +632,7 @@ def main():
             print(f"  \033[93mCharacter name:\033[0m   {character_name}")
         print(f"  \033[93mMax tokens:\033[0m       {max_tokens}")
         print(f"  \033[93mDevice:\033[0m           CPU (float32)")
+        print(f"  \033[93mBatch size:\033[0m       {CAPTION_BATCH_SIZE}")
         print(f"  \033[93mEst. time:\033[0m        ~{format_time(len(to_process) * 35)} "
               f"(~35s/img estimate, actual varies)")
         print("\033[92m==================================================\033[0m")
@@ -21,6 +21,11 @@ Notes:
       for a big overnight batch (it's a community-quantized port, not an
       official release).
     - OLLAMA_MODEL below must exactly match whichever tag you pulled.
+    - Requests run OLLAMA_NUM_PARALLEL at a time over one pooled session, so
+      set the same OLLAMA_NUM_PARALLEL when starting `ollama serve` or the
+      extra requests just queue server-side. Images are shrunk to the vision
+      tower's input size before upload, and each caption is written as soon
+      as it comes back — an interrupted run resumes with "skip existing".
 """
 
 import os
@@ -29,7 +34,10 @@ import pathlib
 import subprocess
 import time
 import base64
+import io
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
 from typing import List, Optional
 
 # ── Project root path fix (same pattern as joytag_tagger.py) ──────────────────
@@ -48,6 +56,14 @@ os.system('clear')
 # ── Ollama connection ──────────────────────────────────────────────────────────
 OLLAMA_URL         = "http://localhost:11434"   # native Mac process, no Docker here
 OLLAMA_MODEL       = "user-v4/joycaption-beta"  # must match whatever you `ollama pull`ed
+# Requests in flight at once — match the server's OLLAMA_NUM_PARALLEL.
+OLLAMA_NUM_PARALLEL = max(1, int(os.environ.get("OLLAMA_NUM_PARALLEL") or 4))
+REQUEST_TIMEOUT    = 180
+
+# JoyCaption's SigLIP tower sees a 384x384 input, so anything bigger is wasted
+# base64 and decode time. Shrink so the short side is this, never upscale.
+VISION_SIZE        = 384
+VISION_JPEG_QUALITY = 95
 
 SUPPORTED_EXTS     = (".jpg", ".jpeg", ".png", ".webp", ".bmp", ".tiff")
 
@@ -127,6 +143,39 @@ def txt_exists(image_path: str, output_dir: pathlib.Path) -> bool:
     return (output_dir / f"{stem}.txt").exists()
 
 
+def encode_image(image_path: str, vision_size: int = VISION_SIZE) -> str:
+    """
+    Base64 an image for Ollama, downscaled so its short side is vision_size.
+    Falls back to the original bytes if PIL isn't available or can't read it.
+    """
+    try:
+        from PIL import Image
+        with Image.open(image_path) as img:
+            if min(img.size) > vision_size:
+                scale = vision_size / min(img.size)
+                img = img.resize(
+                    (max(1, round(img.width * scale)), max(1, round(img.height * scale))),
+                    Image.LANCZOS,
+                )
+            elif pathlib.Path(image_path).suffix.lower() in (".jpg", ".jpeg"):
+                img = None  # already small and already JPEG — send as-is
+            if img is not None:
+                buf = io.BytesIO()
+                img.convert("RGB").save(buf, format="JPEG", quality=VISION_JPEG_QUALITY)
+                return base64.b64encode(buf.getvalue()).decode("utf-8")
+    except Exception:
+        pass
+    with open(image_path, "rb") as f:
+        return base64.b64encode(f.read()).decode("utf-8")
+
+
+def write_caption(out_txt: pathlib.Path, caption: str):
+    """Write via a temp file so an interrupted run never leaves a half .txt."""
+    tmp = out_txt.with_name(f".{out_txt.name}.tmp")
+    tmp.write_text(caption, encoding="utf-8")
+    os.replace(tmp, out_txt)
+
+
 # ── Environment / Setup ────────────────────────────────────────────────────────
 
 def print_setup_instructions():
@@ -169,20 +218,27 @@ class JoyCaptionModel:
     """
     Thin HTTP wrapper around JoyCaption running through Ollama, instead of raw
     HuggingFace weights on CPU. Same public interface (load/caption/unload) as
-    before, so process_images() and main() below don't need any changes.
+    before. One pooled session sized to in_flight is shared by every worker
+    thread, so concurrent captions reuse keep-alive connections.
     """
 
-    def __init__(self):
+    def __init__(self, base_url: str = OLLAMA_URL, in_flight: int = OLLAMA_NUM_PARALLEL):
+        self.base_url = base_url.rstrip("/")
+        self.in_flight = max(1, in_flight)
         self.loaded = False
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.in_flight)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
 
     def load(self) -> bool:
         print("\033[93m📥 Checking Ollama connection...\033[0m")
         print(f"\033[93m   Model:  {OLLAMA_MODEL}\033[0m")
-        print(f"\033[93m   Ollama: {OLLAMA_URL}\033[0m")
+        print(f"\033[93m   Ollama: {self.base_url}\033[0m")
         print()
 
         try:
-            resp = requests.get(f"{OLLAMA_URL}/api/tags", timeout=10)
+            resp = self.session.get(f"{self.base_url}/api/tags", timeout=10)
             resp.raise_for_status()
             available = [m.get("name", "") for m in resp.json().get("models", [])]
             # /api/tags returns "name:tag" (e.g. "user-v4/joycaption-beta:latest") while
@@ -223,54 +279,66 @@ class JoyCaptionModel:
             return None
 
         try:
-            with open(image_path, "rb") as f:
-                image_b64 = base64.b64encode(f.read()).decode("utf-8")
-
-            # System prompt — JoyCaption Beta One uses this to frame its role.
-            # Optionally inject character name for LoRA subject captioning.
-            system_prompt = "You are a helpful image captioning assistant."
-            if character_name:
-                system_prompt += (
-                    f" The person or character in the image is named {character_name}. "
-                    f"Use their name when referring to them in the caption."
-                )
-
-            payload = {
-                "model": OLLAMA_MODEL,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": style_prompt, "images": [image_b64]},
-                ],
-                "stream": False,
-                "options": {
-                    "num_predict": max_tokens,
-                    "temperature": 0.6,
-                    "top_p": 0.9,
-                },
-            }
-
-            resp = requests.post(f"{OLLAMA_URL}/api/chat", json=payload, timeout=180)
-            resp.raise_for_status()
-            caption = resp.json().get("message", {}).get("content", "").strip()
-
-            return caption if caption else None
-
+            return self.request_caption(image_path, style_prompt, character_name, max_tokens)
         except Exception as e:
             print(f"\n  \033[93m❌ Caption error: {e}\033[0m")
             return None
 
+    def request_caption(
+        self,
+        image_path: str,
+        style_prompt: str,
+        character_name: Optional[str] = None,
+        max_tokens: int = 300,
+    ) -> Optional[str]:
+        """
+        Same as caption() but raises on errors instead of printing them, so
+        worker threads can hand the error back to the thread doing the output.
+        """
+        image_b64 = encode_image(image_path)
+
+        # System prompt — JoyCaption Beta One uses this to frame its role.
+        # Optionally inject character name for LoRA subject captioning.
+        system_prompt = "You are a helpful image captioning assistant."
+        if character_name:
+            system_prompt += (
+                f" The person or character in the image is named {character_name}. "
+                f"Use their name when referring to them in the caption."
+            )
+
+        payload = {
+            "model": OLLAMA_MODEL,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": style_prompt, "images": [image_b64]},
+            ],
+            "stream": False,
+            "options": {
+                "num_predict": max_tokens,
+                "temperature": 0.6,
+                "top_p": 0.9,
+            },
+        }
+
+        resp = self.session.post(f"{self.base_url}/api/chat", json=payload, timeout=REQUEST_TIMEOUT)
+        resp.raise_for_status()
+        caption = resp.json().get("message", {}).get("content", "").strip()
+
+        return caption if caption else None
+
     def unload(self):
         # Ask Ollama to free the model from memory now rather than waiting out
         # its default keep_alive window. Best-effort — a failure here shouldn't
         # fail the batch that already completed.
         try:
-            requests.post(
-                f"{OLLAMA_URL}/api/generate",
+            self.session.post(
+                f"{self.base_url}/api/generate",
                 json={"model": OLLAMA_MODEL, "keep_alive": 0},
                 timeout=10,
             )
         except Exception:
             pass
+        self.session.close()
         self.loaded = False
 
 
@@ -301,45 +369,72 @@ def process_images(
     print("\033[92m" + "=" * 50 + "\033[0m")
     print()
 
-    for idx, img_path in enumerate(images, 1):
+    # Skips are settled up front so only real work goes to the pool.
+    jobs = []
+    for img_path in images:
         img_path_obj = pathlib.Path(img_path)
-        fname = img_path_obj.name
-        stem  = img_path_obj.stem
 
         # Output goes to Output/JoyCaption/ inside the image's parent folder
         out_dir = img_path_obj.parent / "Output" / "JoyCaption"
         out_dir.mkdir(parents=True, exist_ok=True)
-        out_txt = out_dir / f"{stem}.txt"
-
-        pct = int((idx / total) * 100)
-        elapsed = time.time() - batch_start
-        print(f"\033[93m[{idx}/{total}]\033[0m ({pct}%) {fname}  \033[36m[{format_time(elapsed)}]\033[0m")
+        out_txt = out_dir / f"{img_path_obj.stem}.txt"
 
-        # Skip if .txt already exists and user chose to skip
         if skip_existing and out_txt.exists():
-            print(f"  \033[92m⏭️  Skipped (caption exists)\033[0m")
             skipped += 1
             continue
+        jobs.append((img_path, out_txt))
 
+    if skipped:
+        print(f"\033[92m⏭️  Skipped {skipped} image(s) with existing captions\033[0m")
+        print()
+
+    def run_job(img_path):
         img_start = time.time()
-        caption = model.caption(img_path, style_prompt, character_name, max_tokens)
-        img_time = time.time() - img_start
-
-        if caption:
-            try:
-                out_txt.write_text(caption, encoding="utf-8")
-                # Show a short preview of the caption
-                preview = caption[:80] + "..." if len(caption) > 80 else caption
-                print(f"  \033[92m✅ {format_time(img_time)}\033[0m  \"{preview}\"")
-                success += 1
-            except Exception as e:
-                print(f"  \033[93m❌ Write error: {e}\033[0m")
+        try:
+            caption = model.request_caption(img_path, style_prompt, character_name, max_tokens)
+            error = None if caption else "Caption failed"
+        except Exception as e:
+            caption, error = None, f"Caption error: {e}"
+        return caption, error, time.time() - img_start
+
+    # Keep model.in_flight requests open so Ollama's parallel slots stay busy;
+    # each caption is written the moment it lands, in completion order.
+    pool = ThreadPoolExecutor(max_workers=model.in_flight)
+    futures = {pool.submit(run_job, img_path): (img_path, out_txt) for img_path, out_txt in jobs}
+    done = skipped
+    try:
+        for future in as_completed(futures):
+            img_path, out_txt = futures[future]
+            caption, error, img_time = future.result()
+            done += 1
+
+            pct = int((done / total) * 100)
+            elapsed = time.time() - batch_start
+            print(f"\033[93m[{done}/{total}]\033[0m ({pct}%) {pathlib.Path(img_path).name}  "
+                  f"\033[36m[{format_time(elapsed)}]\033[0m")
+
+            if caption:
+                try:
+                    write_caption(out_txt, caption)
+                    # Show a short preview of the caption
+                    preview = caption[:80] + "..." if len(caption) > 80 else caption
+                    print(f"  \033[92m✅ {format_time(img_time)}\033[0m  \"{preview}\"")
+                    success += 1
+                except Exception as e:
+                    print(f"  \033[93m❌ Write error: {e}\033[0m")
+                    failed += 1
+            else:
+                print(f"  \033[93m❌ {error}\033[0m")
                 failed += 1
-        else:
-            print(f"  \033[93m❌ Caption failed\033[0m")
-            failed += 1
 
+            print()
+    except KeyboardInterrupt:
+        print()
+        print(f"\033[93m⚠️  Interrupted — {success} caption(s) saved. "
+              f"Rerun and skip existing to resume.\033[0m")
         print()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
 
     total_time = time.time() - batch_start
     avg_time   = total_time / max(success, 1)
@@ -481,9 +576,7 @@ def main():
         if character_name:
             print(f"  \033[93mCharacter name:\033[0m   {character_name}")
         print(f"  \033[93mMax tokens:\033[0m       {max_tokens}")
-        print(f"  \033[93mDevice:\033[0m           CPU (float32)")
-        print(f"  \033[93mEst. time:\033[0m        ~{format_time(len(to_process) * 35)} "
-              f"(~35s/img estimate, actual varies)")
+        print(f"  \033[93mIn flight:\033[0m        {OLLAMA_NUM_PARALLEL} (OLLAMA_NUM_PARALLEL)")
         print("\033[92m==================================================\033[0m")
         print()
 
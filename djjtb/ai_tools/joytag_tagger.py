@@ -15,6 +15,7 @@ from datetime import datetime
 from typing import List, Dict, Tuple, Optional
 import subprocess
 import gc
+from concurrent.futures import ThreadPoolExecutor
 
 # Fix the import path - go up to project root, then import
 project_root = pathlib.Path(__file__).parent.parent.parent
@@ -42,6 +43,21 @@ SUPPORTED_EXTS = (".jpg", ".jpeg", ".png", ".webp", ".bmp", ".tiff")
 
 BATCH_SIZE = 20
 
+# Commit the results DB after this many images, so an interrupted run keeps its work
+DB_COMMIT_EVERY = 200
+
+# Decode + LANCZOS resize runs on these threads while ONNX works on the current batch
+PREFETCH_WORKERS = 4
+
+# ONNX Runtime session options (0 threads = let onnxruntime pick, one per physical core)
+ORT_INTRA_OP_THREADS = 0
+ORT_INTER_OP_THREADS = 0
+ORT_GRAPH_OPT_LEVEL = "all"  # "disable", "basic", "extended" or "all"
+
+# ImageNet normalization, kept float32 so the ONNX input never becomes double
+IMAGENET_MEAN = (0.485, 0.456, 0.406)
+IMAGENET_STD = (0.229, 0.224, 0.225)
+
 def format_elapsed_time(seconds):
     """Format elapsed time in a readable format."""
     if seconds < 60:
@@ -161,8 +177,12 @@ def setup_logging(output_path, prefix="joytag"):
 class JoyTagProcessor:
     """JoyTag image processor using the fancyfeast/joytag model"""
     
-    def __init__(self):
+    def __init__(self, intra_op_threads=ORT_INTRA_OP_THREADS, inter_op_threads=ORT_INTER_OP_THREADS,
+                 graph_opt_level=ORT_GRAPH_OPT_LEVEL):
         self.model = None
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.graph_opt_level = graph_opt_level
         self.device = "mps" if self._check_mps() else "cpu"
         print(f"🖥️  \033[33mUsing device:\033[0m {self.device}")
         
@@ -207,13 +227,18 @@ class JoyTagProcessor:
             else:
                 providers = ["CPUExecutionProvider"]
 
-            self.model = ort.InferenceSession(onnx_path, providers=providers)
+            self.model = ort.InferenceSession(onnx_path, sess_options=self._session_options(ort),
+                                              providers=providers)
             print(f"\033[33m⚡ Inference provider:\033[0m {providers[0]}")
             self.model_type = "onnx"
             
             # Get input shape from model
-            input_shape = self.model.get_inputs()[0].shape
+            model_input = self.model.get_inputs()[0]
+            input_shape = model_input.shape
+            self.input_name = model_input.name
             self.input_size = input_shape[2] if len(input_shape) > 2 else 448  # Default JoyTag size
+            # A symbolic batch dim ('batch', None) takes any N; a fixed int caps the batch
+            self.max_batch = input_shape[0] if isinstance(input_shape[0], int) and input_shape[0] > 0 else None
             
             print(f"\033[33m📐 Model input size:\033[0m {self.input_size}x{self.input_size}")
             
@@ -227,6 +252,20 @@ class JoyTagProcessor:
             print(f"❌ \033[33mFailed to load JoyTag model:\033[0m {e}")
             return False
     
+    def _session_options(self, ort):
+        """Build SessionOptions from the thread / graph optimization settings"""
+        levels = {
+            "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+            "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+            "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+            "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+        }
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.intra_op_threads
+        options.inter_op_num_threads = self.inter_op_threads
+        options.graph_optimization_level = levels.get(self.graph_opt_level, levels["all"])
+        return options
+    
     def _load_labels(self):
         """Load the tag labels for JoyTag"""
         try:
@@ -273,61 +312,101 @@ class JoyTagProcessor:
             if self.device == "mps":
                 torch.mps.empty_cache()
     
-    def process_image(self, image_path: str, confidence_threshold: float = 0.5) -> List[Dict]:
-        """Process a single image and return tags with confidence scores"""
+    def _preprocess(self, image_path: str):
+        """Decode, resize and normalize one image to a float32 CHW array (runs on a prefetch thread)"""
+        from PIL import Image
+        import numpy as np
+        
+        with Image.open(image_path) as img:
+            image = img.convert("RGB").resize((self.input_size, self.input_size), Image.LANCZOS)
+        
+        img_array = np.asarray(image, dtype=np.float32) / 255.0
+        img_array -= np.array(IMAGENET_MEAN, dtype=np.float32)
+        img_array /= np.array(IMAGENET_STD, dtype=np.float32)
+        return img_array.transpose(2, 0, 1)  # HWC -> CHW
+    
+    def _safe_preprocess(self, image_path: str):
         try:
-            from PIL import Image
-            import numpy as np
-            
-            # Load and preprocess image
-            image = Image.open(image_path).convert("RGB")
-            
-            # Manual preprocessing for JoyTag ONNX model
-            # Resize and normalize like JoyTag expects
-            image = image.resize((self.input_size, self.input_size), Image.LANCZOS)
-            
-            # Convert to numpy array and ensure float32 throughout
-            img_array = np.array(image, dtype=np.float32) / 255.0
-            
-            # Normalize with ImageNet stats (common for vision models)
-            # CRITICAL FIX: Ensure all operations maintain float32 precision
-            mean = np.array([0.485, 0.456, 0.406], dtype=np.float32)
-            std = np.array([0.229, 0.224, 0.225], dtype=np.float32)
-            img_array = (img_array - mean) / std
-            
-            # Add batch dimension and transpose to NCHW format
-            img_array = img_array.transpose(2, 0, 1)  # HWC -> CHW
-            img_array = np.expand_dims(img_array, axis=0)  # Add batch dim
-            
-            # CRITICAL FIX: Ensure final array is float32 before ONNX inference
-            img_array = img_array.astype(np.float32)
-            
-            # Run ONNX inference
-            input_name = self.model.get_inputs()[0].name
-            outputs = self.model.run(None, {input_name: img_array})
-            logits = outputs[0][0]  # Remove batch dimension
-            
-            # Apply sigmoid for multi-label classification
-            probs = 1 / (1 + np.exp(-logits))  # Sigmoid
-            
-            # Extract high-confidence tags
-            tags = []
-            for i, confidence in enumerate(probs):
-                if confidence > confidence_threshold:
-                    tag_name = self.labels[i] if self.labels and i < len(self.labels) else f"tag_{i}"
-                    tags.append({
-                        'tag': tag_name,
-                        'confidence': float(confidence),
-                        'category': self._categorize_tag(tag_name)
-                    })
-            
-            # Sort by confidence
-            tags.sort(key=lambda x: x['confidence'], reverse=True)
-            return tags
-            
+            return self._preprocess(image_path), None
         except Exception as e:
-            print(f"❌ \033[33mFailed to process {os.path.basename(image_path)}:\033[0m {e}")
-            return []
+            return None, e
+    
+    def _tags_from_probs(self, probs, confidence_threshold: float) -> List[List[Dict]]:
+        """Threshold an (N, labels) probability matrix into per-image tag lists, highest confidence first"""
+        import numpy as np
+        
+        rows, cols = np.nonzero(probs > confidence_threshold)
+        confidences = probs[rows, cols]
+        order = np.lexsort((-confidences, rows))
+        
+        results = [[] for _ in range(probs.shape[0])]
+        label_count = len(self.labels) if self.labels else 0
+        for row, col, confidence in zip(rows[order].tolist(), cols[order].tolist(), confidences[order].tolist()):
+            tag_name = self.labels[col] if col < label_count else f"tag_{col}"
+            results[row].append({
+                'tag': tag_name,
+                'confidence': confidence,
+                'category': self._categorize_tag(tag_name)
+            })
+        return results
+    
+    def iter_batches(self, image_paths: List[str], confidence_threshold: float = 0.5,
+                     batch_size: int = BATCH_SIZE):
+        """
+        Yield (batch_paths, batch_tags) with batch_size tensors per ONNX run.
+        Upcoming images are decoded and resized on PREFETCH_WORKERS threads
+        while the current batch is inferred, across batch boundaries. Images
+        that fail to decode or infer get None instead of a tag list.
+        """
+        import numpy as np
+        
+        if self.max_batch:
+            batch_size = min(batch_size, self.max_batch)
+        batch_size = max(1, batch_size)
+        window = batch_size * 2
+        
+        with ThreadPoolExecutor(max_workers=PREFETCH_WORKERS) as pool:
+            pending = [pool.submit(self._safe_preprocess, p) for p in image_paths[:window]]
+            next_index = len(pending)
+            
+            for start in range(0, len(image_paths), batch_size):
+                batch_paths = image_paths[start:start + batch_size]
+                batch_tags = [None for _ in batch_paths]
+                slots, tensors = [], []
+                for slot, img_path in enumerate(batch_paths):
+                    tensor, error = pending.pop(0).result()
+                    if next_index < len(image_paths):
+                        pending.append(pool.submit(self._safe_preprocess, image_paths[next_index]))
+                        next_index += 1
+                    if error is not None:
+                        print(f"❌ \033[33mFailed to process {os.path.basename(img_path)}:\033[0m {error}")
+                        continue
+                    slots.append(slot)
+                    tensors.append(tensor)
+                
+                if tensors:
+                    try:
+                        logits = self.model.run(None, {self.input_name: np.stack(tensors)})[0]
+                        # Sigmoid for multi-label classification
+                        probs = 1.0 / (1.0 + np.exp(-logits.astype(np.float32)))
+                        for slot, tags in zip(slots, self._tags_from_probs(probs, confidence_threshold)):
+                            batch_tags[slot] = tags
+                    except Exception as e:
+                        print(f"❌ \033[33mInference failed for batch at {os.path.basename(batch_paths[0])}:\033[0m {e}")
+                
+                yield batch_paths, batch_tags
+    
+    def process_images(self, image_paths: List[str], confidence_threshold: float = 0.5,
+                       batch_size: int = BATCH_SIZE) -> List[List[Dict]]:
+        """Tag many images with batched inference; one tag list per input path (empty on failure)"""
+        results = []
+        for _, batch_tags in self.iter_batches(image_paths, confidence_threshold, batch_size):
+            results.extend(tags or [] for tags in batch_tags)
+        return results
+    
+    def process_image(self, image_path: str, confidence_threshold: float = 0.5) -> List[Dict]:
+        """Process a single image and return tags with confidence scores"""
+        return self.process_images([image_path], confidence_threshold, batch_size=1)[0]
     
     def _categorize_tag(self, tag: str) -> str:
         """Categorize tags based on Danbooru schema patterns"""
@@ -348,8 +427,10 @@ class JoyTagProcessor:
             return 'general'
 
 def setup_database(db_path):
-    """Create SQLite database for storing JoyTag results"""
+    """Create (or open) the SQLite database for storing JoyTag results"""
     conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
     cursor = conn.cursor()
     
     # Images table
@@ -361,10 +442,18 @@ def setup_database(db_path):
             processed_date TEXT NOT NULL,
             model_used TEXT NOT NULL,
             tag_count INTEGER DEFAULT 0,
-            max_confidence REAL DEFAULT 0.0
+            max_confidence REAL DEFAULT 0.0,
+            file_size INTEGER,
+            file_mtime_ns INTEGER
         )
     ''')
     
+    # Databases from before resume support lack the stat columns; their rows just get re-tagged once
+    columns = {row[1] for row in cursor.execute('PRAGMA table_info(images)')}
+    for column in ('file_size', 'file_mtime_ns'):
+        if column not in columns:
+            cursor.execute(f'ALTER TABLE images ADD COLUMN {column} INTEGER')
+    
     # Tags table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS tags (
@@ -382,64 +471,123 @@ def setup_database(db_path):
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_tag_image ON tags(image_id)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_tag_name ON tags(tag_name)')
     
+    # Clean up tags orphaned by the old INSERT OR REPLACE writes (they pointed at deleted image ids)
+    orphaned = cursor.execute(
+        'DELETE FROM tags WHERE image_id NOT IN (SELECT id FROM images)'
+    ).rowcount
+    if orphaned:
+        print(f"\033[33m🧹 Removed {orphaned} orphaned tag rows\033[0m")
+    
     conn.commit()
     return conn
 
-def process_image_batch(image_paths: List[str], processor: JoyTagProcessor,
-                       confidence_threshold: float, logger) -> List[Dict]:
-    """Process a batch of images and return results"""
-    results = []
-    
+def filter_already_tagged(conn, image_paths: List[str]) -> Tuple[List[str], int]:
+    """Split off images already in the DB with unchanged size + mtime. Returns (to_process, skipped_count)"""
+    known = {
+        path: (size, mtime_ns)
+        for path, size, mtime_ns in conn.execute(
+            'SELECT file_path, file_size, file_mtime_ns FROM images WHERE file_size IS NOT NULL'
+        )
+    }
+    to_process = []
     for img_path in image_paths:
         try:
-            tags = processor.process_image(img_path, confidence_threshold)
-            
-            if tags:
-                results.append({
-                    'image_path': img_path,
-                    'tags': tags,
-                    'tag_count': len(tags),
-                    'max_confidence': max(tag['confidence'] for tag in tags)
-                })
-                
-        except Exception as e:
-            logger.error(f"Failed to process {img_path}: {e}")
+            st = os.stat(img_path)
+        except OSError:
+            to_process.append(img_path)
+            continue
+        if known.get(str(img_path)) != (st.st_size, st.st_mtime_ns):
+            to_process.append(img_path)
+    return to_process, len(image_paths) - len(to_process)
+
+def build_batch_results(image_paths: List[str], batch_tags: List[Optional[List[Dict]]]) -> List[Dict]:
+    """Turn per-image tag lists into result records, dropping images that failed (None)"""
+    results = []
+    
+    for img_path, tags in zip(image_paths, batch_tags):
+        if tags is None:
+            continue
+        results.append({
+            'image_path': img_path,
+            'tags': tags,
+            'tag_count': len(tags),
+            'max_confidence': tags[0]['confidence'] if tags else 0.0  # tags are sorted by confidence
+        })
             
     return results
 
-def save_results_to_db(results: List[Dict], conn, model_name: str, logger):
-    """Save JoyTag results to database"""
-    cursor = conn.cursor()
+def save_results_to_db(results: List[Dict], conn, model_name: str, logger, commit: bool = True):
+    """
+    Save JoyTag results to database. Images are upserted so their id (and
+    therefore their tags' image_id) stays stable; old tags are replaced in
+    bulk. With commit=False the caller decides when to commit (see DB_COMMIT_EVERY).
+    Each call runs inside its own savepoint, so a failed batch only undoes
+    itself, not earlier batches still waiting on that commit.
+    """
+    if not results:
+        return
     
+    cursor = conn.cursor()
+    processed_date = datetime.now().isoformat()
+    image_rows = []
     for result in results:
-        img_path = result['image_path']
-        img_name = pathlib.Path(img_path).name
-        
+        img_path = str(result['image_path'])
         try:
-            # Insert image record
-            cursor.execute('''
-                INSERT OR REPLACE INTO images
-                (file_path, file_name, processed_date, model_used, tag_count, max_confidence)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (img_path, img_name, datetime.now().isoformat(), model_name,
-                  result['tag_count'], result['max_confidence']))
-            
-            image_id = cursor.lastrowid
-            
-            # Delete existing tags for this image
-            cursor.execute('DELETE FROM tags WHERE image_id = ?', (image_id,))
-            
-            # Insert new tags
-            for tag in result['tags']:
-                cursor.execute('''
-                    INSERT INTO tags (image_id, tag_name, category, confidence_score)
-                    VALUES (?, ?, ?, ?)
-                ''', (image_id, tag['tag'], tag['category'], tag['confidence']))
-            
-        except Exception as e:
-            logger.error(f"Database error for {img_path}: {e}")
-    
-    conn.commit()
+            st = os.stat(img_path)
+            size, mtime_ns = st.st_size, st.st_mtime_ns
+        except OSError as e:
+            logger.error(f"Could not stat {img_path}: {e}")
+            size = mtime_ns = None
+        image_rows.append((img_path, pathlib.Path(img_path).name, processed_date, model_name,
+                           result['tag_count'], result['max_confidence'], size, mtime_ns))
+    
+    # Open the outer transaction first: releasing an outermost savepoint
+    # would commit it and defeat the caller's batched commits.
+    if not conn.in_transaction:
+        cursor.execute('BEGIN')
+    cursor.execute('SAVEPOINT save_results')
+    try:
+        cursor.executemany('''
+            INSERT INTO images
+            (file_path, file_name, processed_date, model_used, tag_count, max_confidence, file_size, file_mtime_ns)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(file_path) DO UPDATE SET
+                file_name = excluded.file_name,
+                processed_date = excluded.processed_date,
+                model_used = excluded.model_used,
+                tag_count = excluded.tag_count,
+                max_confidence = excluded.max_confidence,
+                file_size = excluded.file_size,
+                file_mtime_ns = excluded.file_mtime_ns
+        ''', image_rows)
+        
+        paths = [row[0] for row in image_rows]
+        placeholders = ','.join('?' * len(paths))
+        image_ids = dict(cursor.execute(
+            f'SELECT file_path, id FROM images WHERE file_path IN ({placeholders})', paths
+        ).fetchall())
+        
+        # Replace existing tags for these images
+        cursor.executemany('DELETE FROM tags WHERE image_id = ?', [(image_ids[p],) for p in paths])
+        cursor.executemany('''
+            INSERT INTO tags (image_id, tag_name, category, confidence_score)
+            VALUES (?, ?, ?, ?)
+        ''', [
+            (image_ids[str(result['image_path'])], tag['tag'], tag['category'], tag['confidence'])
+            for result in results
+            for tag in result['tags']
+        ])
+    except Exception as e:
+        logger.error(f"Database error for batch starting at {image_rows[0][0]}: {e}")
+        cursor.execute('ROLLBACK TO save_results')
+        cursor.execute('RELEASE save_results')
+        if commit:
+            conn.commit()
+        return
+    
+    cursor.execute('RELEASE save_results')
+    if commit:
+        conn.commit()
 
 def export_xmp_sidecar_files(db_path: str, merge_mode: bool, logger):
     """Export XMP sidecar files for DigiKam"""
@@ -702,6 +850,18 @@ def main():
         # Setup output directory
         output_dir = os.path.join(folder_path, "Output", "JoyTag")
         os.makedirs(output_dir, exist_ok=True)
+        db_path = os.path.join(output_dir, "joytag_results.db")
+        
+        # Resume: skip images already tagged in a previous (possibly interrupted) run
+        resume = False
+        if os.path.exists(db_path):
+            resume = djj.prompt_choice(
+                "\033[93mExisting JoyTag database found. Resume?\033[0m\n1. Yes, skip unchanged tagged images\n2. No, re-tag everything\n",
+                ['1', '2'],
+                default='1'
+            ) == '1'
+            print()
+        
         logger = setup_logging(output_dir, "joytag")
         
         os.system('clear')
@@ -711,49 +871,60 @@ def main():
         processing_start_time = time.time()
         
         print("\n\033[1;33mProcessing images with JoyTag...\033[0m")
-        if xmp_config['skip_existing'] and len(images_to_process) < len(all_images):
-            skipped_count = len(all_images) - len(images_to_process)
-            print(f"\033[92m⏭️  Skipping {skipped_count} images that already have XMP files\033[0m")
-        print("\n" * 2)
+        xmp_skipped = len(all_images) - len(images_to_process)
+        if xmp_config['skip_existing'] and xmp_skipped:
+            print(f"\033[92m⏭️  Skipping {xmp_skipped} images that already have XMP files\033[0m")
         
         # Setup database
-        db_path = os.path.join(output_dir, "joytag_results.db")
         conn = setup_database(db_path)
+        resumed_count = 0
+        if resume:
+            images_to_process, resumed_count = filter_already_tagged(conn, images_to_process)
+            if resumed_count:
+                print(f"\033[92m⏭️  Resuming: {resumed_count} images already tagged\033[0m")
+        print("\n" * 2)
         
-        # Process images in batches
+        # Process images in batches (a model exported with a fixed batch dim caps the size)
+        if processor.max_batch:
+            batch_size = min(batch_size, processor.max_batch)
         total_batches = (len(images_to_process) + batch_size - 1) // batch_size
         processed_count = 0
         total_tags = 0
+        uncommitted = 0
         
-        for batch_idx in range(total_batches):
-            start_idx = batch_idx * batch_size
-            end_idx = min(start_idx + batch_size, len(images_to_process))
-            batch_images = images_to_process[start_idx:end_idx]
-            
-            # Process batch
-            results = process_image_batch(batch_images, processor, confidence_threshold, logger)
-            
-            # Count tags
-            batch_tags = sum(result['tag_count'] for result in results)
-            total_tags += batch_tags
-            
-            # Save to database
-            save_results_to_db(results, conn, "JoyTag", logger)
-            
-            processed_count += len(batch_images)
-            progress = int((processed_count / len(images_to_process)) * 100)
-            
-            # Calculate elapsed time
-            current_elapsed = time.time() - processing_start_time
-            sys.stdout.write(f"\r\033[93mProcessing batch\033[0m {batch_idx + 1}\033[93m/\033[0m{total_batches} ({progress}%) - {processed_count}\033[93m/\033[0m{len(images_to_process)} \033[93mimages...\033[0m \033[36m[Elapsed: {format_elapsed_time(current_elapsed)}]\033[0m")
-            
-            if batch_tags > 0:
-                sys.stdout.write(f" [\033[32m{batch_tags} tags\033[0m]")
-            sys.stdout.flush()
+        try:
+            batches = processor.iter_batches(images_to_process, confidence_threshold, batch_size)
+            for batch_idx, (batch_images, batch_tag_lists) in enumerate(batches):
+                results = build_batch_results(batch_images, batch_tag_lists)
+                
+                # Count tags
+                batch_tags = sum(result['tag_count'] for result in results)
+                total_tags += batch_tags
+                
+                # Save to database, committing every DB_COMMIT_EVERY images
+                save_results_to_db(results, conn, "JoyTag", logger, commit=False)
+                uncommitted += len(batch_images)
+                if uncommitted >= DB_COMMIT_EVERY:
+                    conn.commit()
+                    uncommitted = 0
+                
+                processed_count += len(batch_images)
+                progress = int((processed_count / len(images_to_process)) * 100)
+                
+                # Calculate elapsed time
+                current_elapsed = time.time() - processing_start_time
+                sys.stdout.write(f"\r\033[93mProcessing batch\033[0m {batch_idx + 1}\033[93m/\033[0m{total_batches} ({progress}%) - {processed_count}\033[93m/\033[0m{len(images_to_process)} \033[93mimages...\033[0m \033[36m[Elapsed: {format_elapsed_time(current_elapsed)}]\033[0m")
+                
+                if batch_tags > 0:
+                    sys.stdout.write(f" [\033[32m{batch_tags} tags\033[0m]")
+                sys.stdout.flush()
+        finally:
+            # Keep everything tagged so far, even on Ctrl-C; a resumed run picks up from here
+            conn.commit()
+            conn.close()
 
         sys.stdout.write("\r" + " " * 98 + "\r")
         
-        conn.close()
         processor.unload_model()
         
         # Calculate processing time
@@ -786,8 +957,10 @@ def main():
         print("\033[1;93m 🚀 JoyTag Processing Complete! 💥\033[0m")
         print("\033[92m--------------------\033[0m")
         print(f"\033[93mTotal images found:\033[0m {len(all_images)}")
-        if xmp_config['skip_existing'] and len(images_to_process) < len(all_images):
-            print(f"\033[93mImages skipped (had XMP):\033[0m {len(all_images) - len(images_to_process)}")
+        if xmp_config['skip_existing'] and xmp_skipped:
+            print(f"\033[93mImages skipped (had XMP):\033[0m {xmp_skipped}")
+        if resumed_count:
+            print(f"\033[93mImages skipped (resumed):\033[0m {resumed_count}")
         print(f"\033[93mImages processed:\033[0m {len(images_to_process)}")
         print(f"\033[93mTotal tags found:\033[0m {total_tags}")
         if images_to_process:
@@ -808,8 +981,10 @@ def main():
         
         # Log the session
         log_message = f"JoyTag processing complete: {len(all_images)} total images"
-        if xmp_config['skip_existing'] and len(images_to_process) < len(all_images):
-            log_message += f", {len(all_images) - len(images_to_process)} skipped (had XMP)"
+        if xmp_config['skip_existing'] and xmp_skipped:
+            log_message += f", {xmp_skipped} skipped (had XMP)"
+        if resumed_count:
+            log_message += f", {resumed_count} skipped (resumed)"
         log_message += f", {len(images_to_process)} processed, {total_tags} total tags"
         if images_to_process:
             log_message += f", avg {total_tags/len(images_to_process):.1f} tags/image"
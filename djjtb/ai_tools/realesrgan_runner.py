@@ -300,12 +300,21 @@ def rename_batch_outputs(output_dir, suffix="_UP"):
     if renamed_count > 0:
         print(f"\033[93m📝 Renamed\033[0m {renamed_count} \033[93mfile(s) with suffix\033[0m '{suffix}'")
 
+def batch_output_format(input_path, output_format):
+    """Format for the -f flag: the chosen one, else the input's own (png if the binary can't write it)"""
+    if output_format:
+        return output_format
+    ext = pathlib.Path(input_path).suffix.lower().lstrip('.')
+    if ext == 'jpeg':
+        return 'jpg'
+    return ext if ext in ('jpg', 'png', 'webp') else 'png'
+
 def process_files_batch_mode(input_paths, model, scale_factor, tile_size, output_format, tag_source):
-    """Process multiple files individually with consolidated output"""
+    """Process files from any folders in staged batches with consolidated output"""
     overall_start_time = time.time()
     
     print("\n" * 2)
-    print(f"\n\033[1;33m🔼 Processing\033[0m {len(input_paths)} \033[1;33mfile(s) individually:\033[0m")
+    print(f"\n\033[1;33m🔼 Processing\033[0m {len(input_paths)} \033[1;33mfile(s) (staged batch):\033[0m")
     print("=" * 60)
     print(f"\033[93m🤖 Model:\033[0m {model}")
     print(f"\033[93m📏 Scale:\033[0m {scale_factor}x")
@@ -320,37 +329,45 @@ def process_files_batch_mode(input_paths, model, scale_factor, tile_size, output
     error_count = 0
     output_paths = set()
     
-    for i, input_path in enumerate(input_paths):
-        file_name = os.path.basename(input_path)
-        print(f"\033[93mProcessing [{i+1}/{len(input_paths)}]:\033[0m {file_name}")
-        
-        # Create output directory
-        output_dir = create_output_path(input_path)
-        output_paths.add(output_dir)
+    for input_path in input_paths:
+        output_paths.add(create_output_path(input_path))
+    
+    # One Real-ESRGAN run per output format: the files are staged into a temp
+    # folder so the model loads once per batch instead of once per image
+    format_groups = {}
+    for input_path in input_paths:
+        format_groups.setdefault(batch_output_format(input_path, output_format), []).append(input_path)
+    
+    for batch_format, batch_paths in format_groups.items():
+        print(f"\033[93mBatch:\033[0m {len(batch_paths)} file(s) → {batch_format}")
         
-        success, output_msg, file_elapsed, output_file = process_single_image(
-            input_path, output_dir, model, scale_factor, tile_size, output_format
-        )
+        with djj.StagedBatch(batch_paths) as stage:
+            success, output_msg, batch_elapsed = process_folder_batch(
+                stage.input_dir, stage.output_dir, model, scale_factor, tile_size, batch_format,
+                len(batch_paths), timeout_seconds=300 * len(batch_paths)
+            )
+            results = stage.distribute(create_output_path, suffix="_UP")
         
         total_elapsed = time.time() - overall_start_time
         
-        if success:
-            print(f"\033[92m✅ Success:\033[0m {file_name}")
-            print(f"  \033[36mFile time:\033[0m {format_elapsed_time(file_elapsed)}")
-            print(f"  \033[36mTotal time:\033[0m {format_elapsed_time(total_elapsed)}")
-            if output_file:
-                print(f"  \033[36mOutput:\033[0m {os.path.basename(output_file)}")
-            success_count += 1
-        else:
-            print(f"\033[93m❌ Failed:\033[0m {file_name}")
-            print(f"  \033[36mFile time:\033[0m {format_elapsed_time(file_elapsed)}")
-            print(f"  \033[36mTotal time:\033[0m {format_elapsed_time(total_elapsed)}")
+        for input_path in batch_paths:
+            file_name = os.path.basename(input_path)
+            if results[input_path]:
+                print(f"\033[92m✅ Success:\033[0m {file_name}")
+                print(f"  \033[36mOutput:\033[0m {results[input_path][0].name}")
+                success_count += 1
+            else:
+                print(f"\033[93m❌ Failed:\033[0m {file_name}")
+                error_count += 1
+        
+        print(f"  \033[36mBatch time:\033[0m {format_elapsed_time(batch_elapsed)}")
+        print(f"  \033[36mTotal time:\033[0m {format_elapsed_time(total_elapsed)}")
+        if not success:
             if "timeout" in output_msg.lower():
                 print(f"   \033[93mTimeout:\033[0m Processing took too long")
             else:
                 error_preview = output_msg[-200:] if output_msg else "No output"
                 print(f"   Error: {error_preview}")
-            error_count += 1
         
         print()
     
@@ -358,7 +375,7 @@ def process_files_batch_mode(input_paths, model, scale_factor, tile_size, output
     final_total_elapsed = time.time() - overall_start_time
     
     print("=" * 60)
-    print(f"\033[1;33m🏁 Individual Processing Complete!\033[0m")
+    print(f"\033[1;33m🏁 Batch Processing Complete!\033[0m")
     print(f"✅ \033[92mSuccessful:\033[0m {success_count} \033[93mfile(s)\033[0m")
     print(f"❌ \033[93mFailed:\033[0m {error_count} \033[93mfile(s)\033[0m")
     print(f"⏱️  \033[36mTotal processing time:\033[0m {format_elapsed_time(final_total_elapsed)}")
@@ -424,7 +441,7 @@ def process_files(input_paths, input_mode, src_path, model, scale_factor, tile_s
         # Folder mode - use batch processing for efficiency
         process_files_folder_mode(input_paths, src_path, model, scale_factor, tile_size, output_format, tag_source)
     else:
-        # Multi-file mode - process individually
+        # Multi-file mode - staged batch processing
         process_files_batch_mode(input_paths, model, scale_factor, tile_size, output_format, tag_source)
 
 def main():
@@ -262,11 +262,11 @@ def rename_batch_outputs(output_dir, suffix="_UP"):
         print(f"\033[93m📝 Renamed\033[0m {renamed_count} \033[93mfile(s) with suffix\033[0m '{suffix}'")
 
 def process_files_batch_mode(input_paths, tag_source):
-    """Process multiple files individually with consolidated output"""
+    """Process files from any folders in one staged batch with consolidated output"""
     overall_start_time = time.time()
     
     print("\n" * 2)
-    print(f"\n\033[1;33m🔼 Processing\033[0m {len(input_paths)} \033[1;33mfile(s) individually:\033[0m")
+    print(f"\n\033[1;33m🔼 Processing\033[0m {len(input_paths)} \033[1;33mfile(s) (staged batch):\033[0m")
     print("=" * 50)
     print()
     print("\033[1;33m🚀 RealSR \033[0m\033[93mactivating...\033[0m")
@@ -276,45 +276,44 @@ def process_files_batch_mode(input_paths, tag_source):
     error_count = 0
     output_paths = set()
     
-    for i, input_path in enumerate(input_paths):
-        file_name = os.path.basename(input_path)
-        print(f"\033[93mProcessing [{i+1}/{len(input_paths)}]:\033[0m {file_name}")
-        
-        # Create output directory
-        output_dir = create_output_path(input_path)
-        output_paths.add(output_dir)
-        
-        success, output_msg, file_elapsed, output_file = process_single_image(
-            input_path, output_dir
+    for input_path in input_paths:
+        output_paths.add(create_output_path(input_path))
+    
+    # Stage every file into one temp folder so RealSR loads its model once
+    with djj.StagedBatch(input_paths) as stage:
+        success, output_msg, batch_elapsed = process_folder_batch(
+            stage.input_dir, stage.output_dir, len(input_paths), timeout_seconds=300 * len(input_paths)
         )
-        
-        total_elapsed = time.time() - overall_start_time
-        
-        if success:
+        results = stage.distribute(create_output_path, suffix="_UP")
+    
+    total_elapsed = time.time() - overall_start_time
+    
+    for input_path in input_paths:
+        file_name = os.path.basename(input_path)
+        if results[input_path]:
             print(f"\033[92m✅ Success:\033[0m {file_name}")
-            print(f"  \033[36mFile time:\033[0m {format_elapsed_time(file_elapsed)}")
-            print(f"  \033[36mTotal time:\033[0m {format_elapsed_time(total_elapsed)}")
-            if output_file:
-                print(f"  \033[36mOutput:\033[0m {os.path.basename(output_file)}")
+            print(f"  \033[36mOutput:\033[0m {results[input_path][0].name}")
             success_count += 1
         else:
             print(f"\033[93m❌ Failed:\033[0m {file_name}")
-            print(f"  \033[36mFile time:\033[0m {format_elapsed_time(file_elapsed)}")
-            print(f"  \033[36mTotal time:\033[0m {format_elapsed_time(total_elapsed)}")
-            if "timeout" in output_msg.lower():
-                print(f"   \033[93mTimeout:\033[0m Processing took too long")
-            else:
-                error_preview = output_msg[-200:] if output_msg else "No output"
-                print(f"   Error: {error_preview}")
             error_count += 1
-        
-        print()
+    
+    print(f"  \033[36mBatch time:\033[0m {format_elapsed_time(batch_elapsed)}")
+    print(f"  \033[36mTotal time:\033[0m {format_elapsed_time(total_elapsed)}")
+    if not success:
+        if "timeout" in output_msg.lower():
+            print(f"   \033[93mTimeout:\033[0m Processing took too long")
+        else:
+            error_preview = output_msg[-200:] if output_msg else "No output"
+            print(f"   Error: {error_preview}")
+    
+    print()
     
     # Final summary
     final_total_elapsed = time.time() - overall_start_time
     
     print("=" * 50)
-    print(f"\033[1;33m🏁 Individual Processing Complete!\033[0m")
+    print(f"\033[1;33m🏁 Batch Processing Complete!\033[0m")
     print(f"✅ \033[92mSuccessful:\033[0m {success_count} \033[93mfile(s)\033[0m")
     print(f"❌ \033[93mFailed:\033[0m {error_count} \033[93mfile(s)\033[0m")
     print(f"⏱️  \033[36mTotal processing time:\033[0m {format_elapsed_time(final_total_elapsed)}")
@@ -376,7 +375,7 @@ def process_files(input_paths, input_mode, src_path, tag_source):
         # Folder mode - use batch processing for efficiency
         process_files_folder_mode(input_paths, src_path, tag_source)
     else:
-        # Multi-file mode - process individually
+        # Multi-file mode - staged batch processing
         process_files_batch_mode(input_paths, tag_source)
 
 def main():
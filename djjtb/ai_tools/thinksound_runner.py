@@ -20,6 +20,7 @@ import sys
 import subprocess
 import pathlib
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import djjtb.utils as djj
 
 os.system('clear')
@@ -32,6 +33,144 @@ VENV_PYTHON     = THINKSOUND_DIR / "tsvenv/bin/python3"
 
 VALID_VIDEO_EXTS = (".mp4", ".mov", ".webm", ".mkv", ".avi")
 
+GENERATE_TIMEOUT = 1800  # 30 min max per video
+
+# ─── Resident Model Worker Script ─────────────────────────────────────────────
+# Runs inside tsvenv via -c. At start it builds ThinkSound once, the way the
+# repo's own app.py does: network from thinksound.json, diffusion + VAE state
+# dicts loaded into it (then freed), moved to the device, plus the MetaCLIP /
+# T5 / Synchformer feature extractor. Each JSON job on stdin then only runs
+# feature extraction, sampling and VAE decode on that resident model, and is
+# answered with one "@@TS {json}" line on stdout. If the resident build fails
+# (a ThinkSound layout this doesn't match), the ready line says so with the
+# reason, and jobs fall back to thinksound.inference.generate(), which
+# reloads the checkpoints for every clip.
+
+THINKSOUND_MODEL_CKPT = "thinksound_light.ckpt"   # in CKPTS_DIR, next to vae.ckpt
+
+THINKSOUND_WORKER = r"""
+import os, sys, gc, json, time, subprocess, traceback
+TS_DIR, CKPTS = os.environ["TS_DIR"], os.environ["TS_CKPTS"]
+sys.path.insert(0, TS_DIR)
+import numpy as np
+import torch
+
+DEVICE = 'cpu'   # MPS fallback — change to 'mps' if ThinkSound adds support
+SAMPLE_RATE = 44100
+CLIP_FPS, SYNC_FPS, FRAME_SIZE = 8, 25, 224
+
+def build_pipeline():
+    from ThinkSound.models import create_model_from_config
+    from ThinkSound.models.utils import load_ckpt_state_dict
+    from data_utils.v2a_utils.feature_utils_224 import FeaturesUtils
+    configs = os.path.join(TS_DIR, "ThinkSound", "configs", "model_configs")
+    with open(os.path.join(configs, "thinksound.json")) as f:
+        config = json.load(f)
+    model = create_model_from_config(config)
+    state = load_ckpt_state_dict(os.path.join(CKPTS, os.environ["TS_MODEL_CKPT"]), prefix="diffusion.")
+    model.load_state_dict(state)
+    vae_state = load_ckpt_state_dict(os.path.join(CKPTS, "vae.ckpt"), prefix="autoencoder.")
+    model.pretransform.load_state_dict(vae_state)
+    model = model.to(DEVICE).eval()
+    del state, vae_state
+    gc.collect()
+    features = FeaturesUtils(
+        vae_ckpt=None,
+        vae_config=os.path.join(configs, "stable_audio_2_0_vae.json"),
+        enable_conditions=True,
+        synchformer_ckpt=os.path.join(CKPTS, "synchformer_state_dict.pth"),
+    ).eval().to(DEVICE)
+    objective = config["model"]["diffusion"].get("diffusion_objective", "v")
+    return model, features, objective
+
+def read_frames(video_path, fps, vf):
+    # T x C x H x W float frames in [0, 1], decoded and resized by ffmpeg
+    raw = subprocess.run(
+        ["ffmpeg", "-v", "error", "-i", video_path, "-vf", f"fps={fps},{vf}",
+         "-f", "rawvideo", "-pix_fmt", "rgb24", "-"],
+        capture_output=True, check=True
+    ).stdout
+    frames = np.frombuffer(raw, np.uint8).reshape(-1, FRAME_SIZE, FRAME_SIZE, 3)
+    return torch.from_numpy(frames.copy()).permute(0, 3, 1, 2).float().div(255)
+
+@torch.inference_mode()
+def run_job(pipe, job):
+    from ThinkSound.inference.sampling import sample, sample_discrete_euler
+    import torchaudio
+    model, features, objective = pipe
+    size = FRAME_SIZE
+    # Sync frames: short side to 224 + centre crop, normalized to [-1, 1];
+    # CLIP frames: padded to square, then 224x224
+    sync = read_frames(job["video_path"], SYNC_FPS,
+                       f"scale={size}:{size}:force_original_aspect_ratio=increase:flags=bicubic,crop={size}:{size}")
+    duration = len(sync) / SYNC_FPS
+    clip = read_frames(job["video_path"], CLIP_FPS,
+                       f"scale={size}:{size}:force_original_aspect_ratio=decrease:flags=bicubic,"
+                       f"pad={size}:{size}:(ow-iw)/2:(oh-ih)/2")[:int(CLIP_FPS * duration)]
+    sync = (sync - 0.5) / 0.5
+
+    caption = [job["prompt"]]
+    global_text, text = features.encode_text(caption)
+    meta = {
+        "metaclip_global_text_features": global_text.squeeze(0),
+        "metaclip_text_features": text.squeeze(0),
+        "t5_features": features.encode_t5_text(caption).squeeze(0),
+        "metaclip_features": features.encode_video_with_clip(clip.unsqueeze(0).to(DEVICE)).squeeze(0),
+        "sync_features": features.encode_video_with_sync(sync.unsqueeze(0).to(DEVICE)).squeeze(0),
+        "video_exist": torch.tensor(True),
+    }
+    latent_length = round(SAMPLE_RATE / 64 / 32 * duration)
+    model.model.model.update_seq_lengths(latent_length, len(clip), len(sync))
+    cond_inputs = model.get_conditioning_inputs(model.conditioner([meta], DEVICE))
+
+    torch.manual_seed(job["seed"])
+    noise = torch.randn([1, model.io_channels, latent_length], device=DEVICE)
+    if objective == "rectified_flow":
+        fakes = sample_discrete_euler(model.model, noise, job["steps"], **cond_inputs,
+                                      cfg_scale=job["cfg_scale"], batch_cfg=True)
+    else:
+        fakes = sample(model.model, noise, job["steps"], 0, **cond_inputs,
+                       cfg_scale=job["cfg_scale"], batch_cfg=True)
+    audio = model.pretransform.decode(fakes).float()
+    audio = audio.div(audio.abs().max().clamp(min=1e-8)).clamp(-1, 1).mul(32767).to(torch.int16).cpu()
+    torchaudio.save(job["output_path"], audio[0], SAMPLE_RATE)
+
+try:
+    pipe = build_pipeline()
+    ready = {"ready": True, "resident": True}
+except Exception:
+    pipe = None
+    ready = {"ready": True, "resident": False,
+             "reason": traceback.format_exc().strip().splitlines()[-1]}
+    from thinksound.inference import generate
+
+print("@@TS " + json.dumps(ready), flush=True)
+for line in sys.stdin:
+    if not line.strip():
+        continue
+    job = json.loads(line)
+    t0 = time.time()
+    try:
+        if pipe is not None:
+            run_job(pipe, job)
+        else:
+            generate(
+                video_path=job["video_path"],
+                output_path=job["output_path"],
+                prompt=job["prompt"],
+                num_steps=job["steps"],
+                cfg_scale=job["cfg_scale"],
+                seed=job["seed"],
+                ckpt_dir=CKPTS,
+                device=DEVICE,
+            )
+        reply = {"ok": True}
+    except Exception:
+        reply = {"ok": False, "error": traceback.format_exc()[-400:]}
+    reply["seconds"] = time.time() - t0
+    print("@@TS " + json.dumps(reply), flush=True)
+"""
+
 # ─── Helpers ──────────────────────────────────────────────────────────────────
 
 def verify_installation():
@@ -72,12 +211,57 @@ def collect_videos_from_subfolders(parent):
     return videos
 
 
-def run_thinksound(video_path, output_audio_path, prompt, steps, cfg_scale, seed):
+class ThinkSoundWorker(djj.JsonLineWorker):
+    """
+    One long-lived tsvenv process running THINKSOUND_WORKER: the model and
+    feature extractor are built and loaded once at start, then each
+    generate() call is one job line sampled on that resident model.
+    """
+
+    def __init__(self, startup_timeout=600):
+        super().__init__([str(VENV_PYTHON), "-c", THINKSOUND_WORKER], "@@TS",
+                         env={"TS_DIR": str(THINKSOUND_DIR), "TS_CKPTS": str(CKPTS_DIR),
+                              "TS_MODEL_CKPT": THINKSOUND_MODEL_CKPT},
+                         cwd=str(THINKSOUND_DIR), startup_timeout=startup_timeout,
+                         log_chars=400, name="ThinkSound worker")
+
+    def start(self):
+        ok, err = super().start()
+        if ok and not self.ready.get("resident"):
+            print("\033[93m⚠️  ThinkSound model could not be kept loaded — "
+                  "checkpoints will reload for every clip:\033[0m")
+            print(f"   {self.ready.get('reason', '').strip()}")
+        return ok, err
+
+    def generate(self, video_path, output_audio_path, prompt, steps, cfg_scale, seed,
+                 timeout=GENERATE_TIMEOUT):
+        """Returns (success, error_text)"""
+        job = {
+            "video_path": str(video_path),
+            "output_path": str(output_audio_path),
+            "prompt": prompt,
+            "steps": steps,
+            "cfg_scale": cfg_scale,
+            "seed": seed,
+        }
+        reply, err = self.request(job, timeout, timeout_error="Timeout (generation took too long)")
+        if reply is None:
+            return False, err
+        if reply.get("ok"):
+            return True, None
+        return False, reply.get("error") or "no error output"
+
+
+def run_thinksound(video_path, output_audio_path, prompt, steps, cfg_scale, seed, worker=None):
     """
     Call ThinkSound inference via its installed Python package.
     ThinkSound exposes: thinksound.inference.generate(video_path, prompt, ...)
-    Falls back to subprocess call against infer.py if API import fails.
+    With a ThinkSoundWorker the call goes to its resident model; without one
+    a fresh tsvenv interpreter is spawned for this video alone.
     """
+    if worker is not None:
+        return worker.generate(video_path, output_audio_path, prompt, steps, cfg_scale, seed)
+
     video_path = str(video_path)
     output_audio_path = str(output_audio_path)
 
@@ -106,7 +290,7 @@ def run_thinksound(video_path, output_audio_path, prompt, steps, cfg_scale, seed
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
         text=True,
-        timeout=1800  # 30 min max per video
+        timeout=GENERATE_TIMEOUT
     )
 
     if result.returncode != 0:
@@ -142,9 +326,8 @@ def merge_audio_to_video(video_path, audio_path, output_path):
     return result.returncode == 0
 
 
-def process_video(video_path, output_dir, prompt, steps, cfg_scale, seed,
-                  save_audio, merge_video):
-    """Process a single video — generate audio, optionally merge, optionally save audio."""
+def generate_video_audio(video_path, output_dir, prompt, steps, cfg_scale, seed, worker=None):
+    """Generate the audio for one video. Returns (success, audio_path, merged_path)."""
     video_path = Path(video_path)
     stem = video_path.stem
     output_dir = Path(output_dir)
@@ -160,33 +343,53 @@ def process_video(video_path, output_dir, prompt, steps, cfg_scale, seed,
 
     # Generate audio
     print(f"  🔊 Generating audio...")
-    success, err = run_thinksound(video_path, audio_path, prompt, steps, cfg_scale, seed)
+    success, err = run_thinksound(video_path, audio_path, prompt, steps, cfg_scale, seed, worker)
 
     if not success:
         print(f"  \033[93m❌ Generation failed:\033[0m\n     {err}")
-        return False
+        return False, audio_path, merged_path
 
     if not audio_path.exists() or audio_path.stat().st_size == 0:
         print(f"  \033[93m❌ Output audio missing or empty.\033[0m")
-        return False
+        return False, audio_path, merged_path
 
     print(f"  \033[92m✅ Audio generated:\033[0m {audio_path.name}")
+    return True, audio_path, merged_path
+
+
+def finish_video(video_path, audio_path, merged_path, save_audio, merge_video):
+    """Merge and clean up after generation. Returns the status lines to print
+    (it may run on a background thread while the next clip generates)."""
+    lines = []
 
     # Merge back onto video
     if merge_video:
-        print(f"  🔗 Merging audio onto video...")
         ok = merge_audio_to_video(video_path, audio_path, merged_path)
         if ok:
-            print(f"  \033[92m✅ Merged video:\033[0m {merged_path.name}")
+            lines.append(f"  \033[92m✅ Merged video:\033[0m {merged_path.name}")
         else:
-            print(f"  \033[93m⚠️  Merge failed — audio WAV still saved.\033[0m")
+            lines.append(f"  \033[93m⚠️  Merge failed — audio WAV still saved.\033[0m")
+            return lines
 
     # Clean up audio WAV if not keeping it
     if not save_audio and audio_path.exists():
         audio_path.unlink()
-        print(f"  🗑️  Audio WAV removed (merge-only mode)")
+        lines.append(f"  🗑️  Audio WAV removed (merge-only mode)")
 
-    return True
+    return lines
+
+
+def process_video(video_path, output_dir, prompt, steps, cfg_scale, seed,
+                  save_audio, merge_video, worker=None):
+    """Process a single video — generate audio, optionally merge, optionally save audio."""
+    ok, audio_path, merged_path = generate_video_audio(video_path, output_dir, prompt, steps,
+                                                       cfg_scale, seed, worker)
+    if ok:
+        if merge_video:
+            print(f"  🔗 Merging audio onto video...")
+        for line in finish_video(video_path, audio_path, merged_path, save_audio, merge_video):
+            print(line)
+    return ok
 
 
 # ─── Main ─────────────────────────────────────────────────────────────────────
@@ -325,33 +528,53 @@ def main():
         fail_count = 0
         total = len(videos)
 
-        for idx, video_path in enumerate(videos, 1):
-            pct = int((idx / total) * 100)
-            print(f"\033[93m🔊 [{idx}/{total}] ({pct}%)\033[0m {Path(video_path).name}")
-
-            # Determine output dir per video
-            if out_mode == '2':
-                out_dir = Path(video_path).parent / "ThinkSound"
-            else:
-                out_dir = output_root
-
-            ok = process_video(
-                video_path=video_path,
-                output_dir=out_dir,
-                prompt=prompt,
-                steps=steps,
-                cfg_scale=cfg_scale,
-                seed=seed,
-                save_audio=save_audio,
-                merge_video=merge_video
-            )
-
-            if ok:
-                success_count += 1
-            else:
-                fail_count += 1
+        def print_finished(pending):
+            name, future = pending
+            print(f"  🔗 {name}:")
+            for line in future.result():
+                print(line)
             print()
 
+        # One resident ThinkSound model for the whole queue; each clip's merge
+        # runs on the side while the next clip is generating
+        with ThinkSoundWorker() as worker, ThreadPoolExecutor(max_workers=1) as merge_pool:
+            pending = None
+
+            for idx, video_path in enumerate(videos, 1):
+                pct = int((idx / total) * 100)
+                print(f"\033[93m🔊 [{idx}/{total}] ({pct}%)\033[0m {Path(video_path).name}")
+
+                # Determine output dir per video
+                if out_mode == '2':
+                    out_dir = Path(video_path).parent / "ThinkSound"
+                else:
+                    out_dir = output_root
+
+                ok, audio_path, merged_path = generate_video_audio(
+                    video_path=video_path,
+                    output_dir=out_dir,
+                    prompt=prompt,
+                    steps=steps,
+                    cfg_scale=cfg_scale,
+                    seed=seed,
+                    worker=worker
+                )
+                print()
+
+                if pending:
+                    print_finished(pending)
+                    pending = None
+
+                if ok:
+                    success_count += 1
+                    pending = (Path(video_path).name, merge_pool.submit(
+                        finish_video, video_path, audio_path, merged_path, save_audio, merge_video))
+                else:
+                    fail_count += 1
+
+            if pending:
+                print_finished(pending)
+
         # ── Summary ───────────────────────────────────────────────────────────
         print()
         print("\033[93mSummary\033[0m")
@@ -441,7 +664,10 @@ if __name__ == "__main__":
 #   - If thinksound.inference.generate() API differs from what's in the package
 #     after you install, open an issue here or check:
 #     https://github.com/FunAudioLLM/ThinkSound
-#     The inline Python call in run_thinksound() is easy to adjust.
+#     The generate() calls in THINKSOUND_WORKER and run_thinksound() are
+#     easy to adjust. The worker's resident path (build_pipeline/run_job)
+#     follows the repo's app.py; if it fails to build, the ready warning
+#     shows why and generation falls back to generate() per clip.
 #
 #   - For faster results, PrismAudio (same repo, branch prismaudio) is the
 #     newer successor — swap the git clone branch and env if you want to try it.
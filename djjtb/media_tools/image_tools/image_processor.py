@@ -5,6 +5,9 @@ import pathlib
 import tempfile
 import shutil
 import random
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from PIL import Image, ImageChops
 import numpy as np
 from scipy.ndimage import label, find_objects
@@ -35,68 +38,182 @@ def _default_save_kwargs(pillow_format, image):
     return image, save_kwargs
 
 
+# Worker count for _run_batch's process pool. 1 runs the old in-process
+# serial loop; anything higher fans images out across spawned workers.
+BATCH_WORKERS = os.cpu_count() or 1
+
+# Images queued per worker at once — keeps the pool busy without decoding
+# the whole folder ahead of the saves.
+BATCH_IN_FLIGHT_PER_WORKER = 2
+
+# Current batch's callables + naming, read by _process_batch_image. Workers are
+# spawned, not forked — forking after numpy/Accelerate has started threads can
+# hang on macOS — so everything in here must pickle: module-level functions,
+# bound to their options with functools.partial. Each worker receives it once
+# through the pool initializer rather than per task.
+_BATCH_JOB = None
+
+
+def _init_batch_worker(job):
+    global _BATCH_JOB
+    _BATCH_JOB = job
+
+
+def _batch_output_path(img_path):
+    """parent/Output/<subfolder_name>/<stem>_<suffix><ext> for the current batch."""
+    _, file_ext = _BATCH_JOB['save_format_fn'](img_path)
+    img_path_obj = pathlib.Path(img_path)
+    img_output_dir = img_path_obj.parent / "Output" / _BATCH_JOB['subfolder_name']
+    return img_output_dir / f"{img_path_obj.stem}_{_BATCH_JOB['suffix']}{file_ext}"
+
+
+def _process_batch_image(img_path):
+    """
+    Open, transform and save one image for the current batch.
+    Returns (status, name, output_dir, error) — status is 'successful',
+    'skipped' or 'failed'. Runs in-process or inside a pool worker.
+    """
+    img_path_obj = pathlib.Path(img_path)
+    try:
+        with Image.open(img_path) as img:
+            processed = _BATCH_JOB['transform_fn'](img, img_path)
+
+            pillow_format, _ = _BATCH_JOB['save_format_fn'](img_path)
+            output_path = _batch_output_path(img_path)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+
+            if output_path.exists():
+                return 'skipped', img_path_obj.name, str(output_path.parent), None
+
+            processed, save_kwargs = _BATCH_JOB['save_kwargs_fn'](pillow_format, processed)
+            processed.save(str(output_path), format=pillow_format, **save_kwargs)
+            return 'successful', img_path_obj.name, str(output_path.parent), None
+
+    except Exception as e:
+        return 'failed', img_path_obj.name, None, str(e)
+
+
+def _iter_batch_results(images, workers):
+    """
+    Yield (img_path, result) for every image as results come back — in
+    input order when serial, completion order when pooled. At most
+    workers * BATCH_IN_FLIGHT_PER_WORKER images are queued at once.
+    """
+    if workers <= 1 or len(images) < 2:
+        for img_path in images:
+            yield img_path, _process_batch_image(img_path)
+        return
+
+    # Two inputs mapping to the same output name (photo.jpg + photo.png under
+    # Convert) would race in parallel. Hold the later ones back and run them
+    # after the pool drains, so they hit the skip-if-exists check like the
+    # serial loop.
+    claimed = set()
+    deferred = []
+    queue = iter(images)
+
+    def submit_next(pool, pending, count):
+        while count > 0:
+            img_path = next(queue, None)
+            if img_path is None:
+                return
+            try:
+                output_path = _batch_output_path(img_path)
+            except Exception:
+                output_path = None
+            if output_path is not None:
+                if output_path in claimed:
+                    deferred.append(img_path)
+                    continue
+                claimed.add(output_path)
+            pending[pool.submit(_process_batch_image, img_path)] = img_path
+            count -= 1
+
+    max_in_flight = workers * BATCH_IN_FLIGHT_PER_WORKER
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=_init_batch_worker, initargs=(_BATCH_JOB,)) as pool:
+        pending = {}
+        submit_next(pool, pending, max_in_flight)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                img_path = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:  # worker died (e.g. BrokenProcessPool)
+                    result = ('failed', pathlib.Path(img_path).name, None, str(e))
+                yield img_path, result
+            submit_next(pool, pending, len(done))
+
+    for img_path in deferred:
+        yield img_path, _process_batch_image(img_path)
+
+
 def _run_batch(images, subfolder_name, suffix, header_msg, transform_fn,
-               save_format_fn=None, save_kwargs_fn=None, logger=None, error_verb="process"):
+               save_format_fn=None, save_kwargs_fn=None, logger=None, error_verb="process",
+               workers=None):
     """
     Shared per-image batch loop for Pad/Crop/Resize/Crop+Resize/Convert.
 
     transform_fn(img, img_path) -> processed PIL Image ready to save; raise
     to record a per-image failure (caught below like any other error).
+    All three callables must pickle (module-level, or a functools.partial of
+    one) since pool workers are spawned.
     save_format_fn(img_path) -> (pillow_format, file_ext); defaults to
     djj.get_save_format (source format preserved).
     save_kwargs_fn(pillow_format, image) -> (image, save_kwargs); defaults
     to the standard JPEG/WEBP quality=95 rule.
+    workers: process-pool size, defaults to BATCH_WORKERS; 1 = serial.
     Output: each image's parent/Output/<subfolder_name>/<stem>_<suffix><ext>.
     """
+    global _BATCH_JOB
+
     if save_format_fn is None:
         save_format_fn = djj.get_save_format
     if save_kwargs_fn is None:
         save_kwargs_fn = _default_save_kwargs
+    if workers is None:
+        workers = BATCH_WORKERS
+    workers = max(1, min(workers, len(images)))
 
     print()
     print(f"{len(images)} \033[93mimages found\033[0m")
     print()
     print(header_msg)
+    if workers > 1:
+        print(f"\033[96m🔄 {workers} parallel workers\033[0m")
 
     successful = []
     failed = []
     skipped = []
     output_dirs_used = set()
 
-    for i, img_path in enumerate(images, 1):
-        try:
-            with Image.open(img_path) as img:
-                processed = transform_fn(img, img_path)
-
-                pillow_format, file_ext = save_format_fn(img_path)
-                img_path_obj = pathlib.Path(img_path)
-                img_output_dir = img_path_obj.parent / "Output" / subfolder_name
-                img_output_dir.mkdir(parents=True, exist_ok=True)
-                output_filename = f"{img_path_obj.stem}_{suffix}{file_ext}"
-                output_path = img_output_dir / output_filename
-
-                if output_path.exists():
-                    skipped.append(img_path_obj.name)
-                    output_dirs_used.add(str(img_output_dir))
-                    sys.stdout.write(f"\rProcessing {i}/{len(images)} ({i/len(images)*100:.1f}%)...")
-                    sys.stdout.flush()
-                    continue
-
-                processed, save_kwargs = save_kwargs_fn(pillow_format, processed)
+    _BATCH_JOB = {
+        'transform_fn': transform_fn,
+        'save_format_fn': save_format_fn,
+        'save_kwargs_fn': save_kwargs_fn,
+        'subfolder_name': subfolder_name,
+        'suffix': suffix,
+    }
 
-                processed.save(str(output_path), format=pillow_format, **save_kwargs)
-                successful.append(img_path_obj.name)
-                output_dirs_used.add(str(img_output_dir))
-
-            sys.stdout.write(f"\rProcessing {i}/{len(images)} ({i/len(images)*100:.1f}%)...")
-            sys.stdout.flush()
+    try:
+        for i, (img_path, (status, name, img_output_dir, error)) in enumerate(
+                _iter_batch_results(images, workers), 1):
+            marker = ""
+            if status == 'failed':
+                failed.append((name, error))
+                if logger:
+                    logger.error(f"Failed to {error_verb} {img_path}: {error}")
+                marker = " ❌"
+            else:
+                (successful if status == 'successful' else skipped).append(name)
+                output_dirs_used.add(img_output_dir)
 
-        except Exception as e:
-            failed.append((pathlib.Path(img_path).name, str(e)))
-            if logger:
-                logger.error(f"Failed to {error_verb} {img_path}: {e}")
-            sys.stdout.write(f"\rProcessing {i}/{len(images)} ({i/len(images)*100:.1f}%)... ❌")
+            sys.stdout.write(f"\rProcessing {i}/{len(images)} ({i/len(images)*100:.1f}%)...{marker}")
             sys.stdout.flush()
+    finally:
+        _BATCH_JOB = None
 
     sys.stdout.write("\r" + " " * 60 + "\r")
     sys.stdout.flush()
@@ -106,6 +223,44 @@ def _run_batch(images, subfolder_name, suffix, header_msg, transform_fn,
 
 # ─── Pad ──────────────────────────────────────────────────────────────────────
 
+def _pad_transform(shape, pad_percent, padding_color, custom_width, custom_height,
+                   padding_position, bg_type, bg_mode, bg_blur, bg_opacity, img, img_path):
+    img = img.convert('RGBA')
+    width, height = img.size
+
+    if shape == 'square':
+        target_size = max(width, height)
+        new_width = new_height = target_size
+        position = 'center'
+    elif shape == 'landscape':
+        new_width = int(height * 16 / 9)
+        new_height = height
+        position = padding_position
+    elif shape == 'portrait':
+        new_width = int(height * 9 / 16)
+        new_height = height
+        position = padding_position
+    elif shape == 'percent':
+        pad_x = int(width * pad_percent / 100)
+        pad_y = int(height * pad_percent / 100)
+        new_width = width + pad_x * 2
+        new_height = height + pad_y * 2
+        position = 'center'  # Percent mode always centers
+    else:  # custom
+        new_width = custom_width
+        new_height = custom_height
+        position = padding_position
+
+    if bg_type == 'image':
+        new_image = djj.create_blurred_background(img, new_width, new_height, bg_mode, bg_blur, bg_opacity)
+    else:
+        new_image = Image.new('RGBA', (new_width, new_height), padding_color)
+
+    offset = djj.calculate_padding_offset(width, height, new_width, new_height, position)
+    new_image.paste(img, offset, img)
+    return new_image
+
+
 def pad_images(images, output_dir, shape, pad_percent, color, custom_width, custom_height,
                custom_color, padding_position, bg_type, bg_mode, bg_blur, bg_opacity):
     """
@@ -119,45 +274,11 @@ def pad_images(images, output_dir, shape, pad_percent, color, custom_width, cust
     color_map = {'white': (255, 255, 255, 255), 'black': (0, 0, 0, 255), 'grey': (128, 128, 128, 255)}
     padding_color = custom_color if color == 'custom' else color_map.get(color, (255, 255, 255, 255))
 
-    def transform(img, img_path):
-        img = img.convert('RGBA')
-        width, height = img.size
-
-        if shape == 'square':
-            target_size = max(width, height)
-            new_width = new_height = target_size
-            position = 'center'
-        elif shape == 'landscape':
-            new_width = int(height * 16 / 9)
-            new_height = height
-            position = padding_position
-        elif shape == 'portrait':
-            new_width = int(height * 9 / 16)
-            new_height = height
-            position = padding_position
-        elif shape == 'percent':
-            pad_x = int(width * pad_percent / 100)
-            pad_y = int(height * pad_percent / 100)
-            new_width = width + pad_x * 2
-            new_height = height + pad_y * 2
-            position = 'center'  # Percent mode always centers
-        else:  # custom
-            new_width = custom_width
-            new_height = custom_height
-            position = padding_position
-
-        if bg_type == 'image':
-            new_image = djj.create_blurred_background(img, new_width, new_height, bg_mode, bg_blur, bg_opacity)
-        else:
-            new_image = Image.new('RGBA', (new_width, new_height), padding_color)
-
-        offset = djj.calculate_padding_offset(width, height, new_width, new_height, position)
-        new_image.paste(img, offset, img)
-        return new_image
-
     return _run_batch(
         images, "Padded", "padded", "\033[93mPadding images...\033[0m",
-        transform, logger=logger, error_verb="process"
+        functools.partial(_pad_transform, shape, pad_percent, padding_color, custom_width,
+                          custom_height, padding_position, bg_type, bg_mode, bg_blur, bg_opacity),
+        logger=logger, error_verb="process"
     )
 
 
@@ -244,6 +365,28 @@ def get_crop_amount():
         return djj.get_int_input("\033[93mCustom trim amount in pixels\033[0m", min_val=1)
 
 
+def _trim_edges(img, edges, trim_px):
+    """Crop trim_px off each edge in `edges`; raises if nothing would be left."""
+    width, height = img.size
+
+    left_trim   = trim_px if 'left' in edges else 0
+    right_trim  = trim_px if 'right' in edges else 0
+    top_trim    = trim_px if 'top' in edges else 0
+    bottom_trim = trim_px if 'bottom' in edges else 0
+
+    new_width = width - left_trim - right_trim
+    new_height = height - top_trim - bottom_trim
+    if new_width <= 0 or new_height <= 0:
+        raise ValueError(f"Trim too large for {width}x{height} image")
+
+    box = (left_trim, top_trim, width - right_trim, height - bottom_trim)
+    return img.crop(box)
+
+
+def _crop_transform(edges, trim_px, img, img_path):
+    return _trim_edges(img, edges, trim_px)
+
+
 def crop_images(images, edges, trim_px):
     """
     Trim `trim_px` pixels off each edge in `edges` for every image.
@@ -253,26 +396,10 @@ def crop_images(images, edges, trim_px):
     """
     edge_label = " + ".join(e.capitalize() for e in sorted(edges))
 
-    def transform(img, img_path):
-        width, height = img.size
-
-        left_trim   = trim_px if 'left' in edges else 0
-        right_trim  = trim_px if 'right' in edges else 0
-        top_trim    = trim_px if 'top' in edges else 0
-        bottom_trim = trim_px if 'bottom' in edges else 0
-
-        new_width = width - left_trim - right_trim
-        new_height = height - top_trim - bottom_trim
-        if new_width <= 0 or new_height <= 0:
-            raise ValueError(f"Trim too large for {width}x{height} image")
-
-        box = (left_trim, top_trim, width - right_trim, height - bottom_trim)
-        return img.crop(box)
-
     return _run_batch(
         images, "Cropped", "cropped",
         f"\033[93mCropping images —\033[0m {edge_label} \033[93m@ {trim_px}px...\033[0m",
-        transform
+        functools.partial(_crop_transform, edges, trim_px)
     )
 
 
@@ -317,14 +444,21 @@ def get_resize_target():
     return dimension_type, desired_width, desired_height, manual_mode
 
 
+def _resize_transform(edges, trim_px, dimension_type, desired_width, desired_height,
+                      manual_mode, img, img_path):
+    """Resize, after trimming `edges` first when given (Crop+Resize)."""
+    if edges:
+        img = _trim_edges(img, edges, trim_px)
+    return djj.resize_pil_image(img, dimension_type, desired_width, desired_height, manual_mode)
+
+
 def resize_only_images(images, dimension_type, desired_width, desired_height, manual_mode='1'):
     """
     Resize with no cropping step. Preserves source format.
     Output: each image's parent/Output/Resized/
     """
-    def transform(img, img_path):
-        return djj.resize_pil_image(img, dimension_type, desired_width, desired_height, manual_mode)
-
+    transform = functools.partial(_resize_transform, None, 0, dimension_type,
+                                  desired_width, desired_height, manual_mode)
     return _run_batch(images, "Resized", "r", "\033[93mResizing images...\033[0m", transform)
 
 
@@ -335,27 +469,11 @@ def crop_and_resize_images(images, edges, trim_px, dimension_type, desired_width
     """
     edge_label = " + ".join(label for key, label in CROP_EDGE_OPTIONS if key in edges)
 
-    def transform(img, img_path):
-        width, height = img.size
-
-        left_trim   = trim_px if 'left' in edges else 0
-        right_trim  = trim_px if 'right' in edges else 0
-        top_trim    = trim_px if 'top' in edges else 0
-        bottom_trim = trim_px if 'bottom' in edges else 0
-
-        new_width = width - left_trim - right_trim
-        new_height = height - top_trim - bottom_trim
-        if new_width <= 0 or new_height <= 0:
-            raise ValueError(f"Trim too large for {width}x{height} image")
-
-        box = (left_trim, top_trim, width - right_trim, height - bottom_trim)
-        cropped = img.crop(box)
-        return djj.resize_pil_image(cropped, dimension_type, desired_width, desired_height, manual_mode)
-
     return _run_batch(
         images, "Cropped_Resized", "cr",
         f"\033[93mCropping ({edge_label} @ {trim_px}px) then resizing...\033[0m",
-        transform
+        functools.partial(_resize_transform, edges, trim_px, dimension_type,
+                          desired_width, desired_height, manual_mode)
     )
 
 
@@ -686,6 +804,37 @@ def run_rotate_flip(images, base_path):
 
 # ─── Convert Format ───────────────────────────────────────────────────────────
 
+def _convert_transform(pillow_format, img, img_path):
+    if pillow_format == 'JPEG':
+        if img.mode in ('RGBA', 'LA', 'P'):
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            if img.mode == 'P':
+                img = img.convert('RGBA')
+            background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
+            img = background
+        elif img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+    elif pillow_format in ('PNG', 'WEBP'):
+        if img.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+            img = img.convert('RGBA')
+    return img
+
+
+def _convert_save_kwargs(keep_metadata, quality, _pillow_format, image):
+    save_kwargs = {}
+    if keep_metadata and _pillow_format in ('JPEG', 'PNG', 'WEBP'):
+        exif = image.info.get('exif')
+        if exif:
+            save_kwargs['exif'] = exif
+    if _pillow_format in ('JPEG', 'WEBP'):
+        save_kwargs['quality'] = quality
+    return image, save_kwargs
+
+
+def _fixed_save_format(pillow_format, file_ext, img_path):
+    return pillow_format, file_ext
+
+
 def convert_images(images, output_dir, output_format, keep_metadata, quality=95):
     """
     Convert images to the specified format.
@@ -696,35 +845,12 @@ def convert_images(images, output_dir, output_format, keep_metadata, quality=95)
 
     pillow_format, file_ext = OUTPUT_FORMAT_MAP[output_format]
 
-    def transform(img, img_path):
-        if pillow_format == 'JPEG':
-            if img.mode in ('RGBA', 'LA', 'P'):
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-                img = background
-            elif img.mode not in ('RGB', 'L'):
-                img = img.convert('RGB')
-        elif pillow_format in ('PNG', 'WEBP'):
-            if img.mode not in ('RGB', 'RGBA', 'L', 'LA'):
-                img = img.convert('RGBA')
-        return img
-
-    def save_kwargs_fn(_pillow_format, image):
-        save_kwargs = {}
-        if keep_metadata and _pillow_format in ('JPEG', 'PNG', 'WEBP'):
-            exif = image.info.get('exif')
-            if exif:
-                save_kwargs['exif'] = exif
-        if _pillow_format in ('JPEG', 'WEBP'):
-            save_kwargs['quality'] = quality
-        return image, save_kwargs
-
     return _run_batch(
         images, "Converted", "c", "\033[93mConverting images...\033[0m",
-        transform, save_format_fn=lambda p: (pillow_format, file_ext),
-        save_kwargs_fn=save_kwargs_fn, logger=logger, error_verb="convert"
+        functools.partial(_convert_transform, pillow_format),
+        save_format_fn=functools.partial(_fixed_save_format, pillow_format, file_ext),
+        save_kwargs_fn=functools.partial(_convert_save_kwargs, keep_metadata, quality),
+        logger=logger, error_verb="convert"
     )
 
 
@@ -3,6 +3,9 @@ import random
 import subprocess
 import sys
 import pathlib
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import djjtb.utils as djj
 from PIL import Image, ImageFilter
 from datetime import datetime
@@ -10,6 +13,10 @@ os.system('clear')
 # Increase Pillow's decompression bomb limit
 Image.MAX_IMAGE_PIXELS = 200000000  # Set to 200 million pixels
 
+SLIDE_WORKERS = max(1, min(4, os.cpu_count() or 1))  # threads compositing upcoming slides
+OUTPUT_FPS = 30
+TRANSITION_DURATION = 1.0  # seconds of dissolve between slides
+
 # --- Shared Functions ---
 def collect_images_from_txt():
     """Collect images from txt file (files and folders)."""
@@ -46,12 +53,114 @@ def get_first_image_dimensions(images):
     """Get dimensions of the first valid image in the list."""
     for img_path in images:
         try:
-            with Image.open(img_path) as img:
-                return img.width, img.height
+            return djj.get_image_size(img_path)
         except Exception:
             continue
     return None
 
+# --- Slide Compositing ---
+def compose_slide(img_path, canvas_width, canvas_height, background_type='blurred', background_color=(0, 0, 0),
+                  background_opacity=0.25, background_blur_radius=8):
+    """Return the RGBA canvas for one slide: background (blurred copy or solid color) plus the centered image."""
+    canvas = Image.new('RGBA', (canvas_width, canvas_height), (0, 0, 0, 0))
+    with Image.open(img_path) as src:
+        img = src.convert('RGBA')
+
+    if background_type == 'blurred':
+        bg_img = img.resize((canvas_width, canvas_height), Image.Resampling.LANCZOS)
+        bg_img = bg_img.filter(ImageFilter.GaussianBlur(radius=background_blur_radius))
+        alpha = Image.new('L', bg_img.size, int(255 * background_opacity))
+        bg_img.putalpha(alpha)
+        canvas.paste(bg_img, (0, 0), bg_img)
+    else:
+        color_bg = Image.new('RGBA', (canvas_width, canvas_height), (*background_color, int(255 * background_opacity)))
+        canvas.paste(color_bg, (0, 0), color_bg)
+
+    # Scale foreground to fit the canvas, then center it
+    img_ratio = img.width / img.height
+    target_width = canvas_width
+    target_height = int(target_width / img_ratio)
+    if target_height > canvas_height:
+        target_height = canvas_height
+        target_width = int(target_height * img_ratio)
+
+    img = img.resize((target_width, target_height), Image.Resampling.LANCZOS)
+    paste_x = (canvas_width - target_width) // 2
+    paste_y = (canvas_height - target_height) // 2
+    canvas.paste(img, (paste_x, paste_y), img)
+    return canvas
+
+def _compose_slide_bytes(img_path, canvas_width, canvas_height, bg_options):
+    try:
+        return compose_slide(img_path, canvas_width, canvas_height, **bg_options).tobytes(), None
+    except Exception as e:
+        return None, e
+
+def iter_slide_frames(images, canvas_width, canvas_height, bg_options, workers=SLIDE_WORKERS):
+    """
+    Yield (img_path, rgba_bytes, error) in input order while a small thread pool
+    composites the slides ahead of the consumer. At most workers * 2 slides are
+    held in memory; a failed slide comes back with rgba_bytes None.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        queued = iter(images)
+        for img_path in queued:
+            pending.append((img_path, pool.submit(_compose_slide_bytes, img_path, canvas_width, canvas_height, bg_options)))
+            if len(pending) >= workers * 2:
+                break
+        while pending:
+            img_path, future = pending.popleft()
+            next_path = next(queued, None)
+            if next_path is not None:
+                pending.append((next_path, pool.submit(_compose_slide_bytes, next_path, canvas_width, canvas_height, bg_options)))
+            frame, error = future.result()
+            yield img_path, frame, error
+
+def dissolve_timing_filter(slide_duration, transition_duration, fps=OUTPUT_FPS):
+    """
+    Filter chain that turns the piped slide frames into a dissolve slideshow.
+
+    Each slide is written three times: A (fully visible), Z (A + half a frame)
+    and H (end of its hold). setpts places them from the frame number alone, and
+    framerate repeats identical neighbours and cross-fades H -> next A, so only
+    3 raw frames per slide cross the pipe. The last slide is written twice more
+    as a terminator at the end of the show; framerate pads one frame interval
+    past its final input, and the half-frame Z step keeps that to exactly
+    total_duration * fps output frames.
+    """
+    step = slide_duration - transition_duration
+    enter = f"floor(N/3)*{step}+{transition_duration}-1/{fps}"
+    half = 0.5 / fps
+    expr = (f"if(eq(mod(N,3),2),(floor(N/3)+1)*{step},"
+            f"if(lt(N,3),0,{enter})+if(eq(mod(N,3),1),{half},0))/TB")
+    return (f"settb=AVTB,setpts='{expr}',format=yuv420p,"
+            f"framerate=fps={fps}:interp_start=0:interp_end=255:scene=100")
+
+def stream_frames_to_ffmpeg(cmd, frames):
+    """
+    Run ffmpeg with raw frames written to its stdin. `frames` yields bytes
+    objects. Returns (returncode, stderr); stderr is drained on a thread so a
+    chatty ffmpeg can't stall the writes.
+    """
+    process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    stderr_chunks = []
+    drain = threading.Thread(target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True)
+    drain.start()
+    try:
+        for frame in frames:
+            process.stdin.write(frame)
+    except BrokenPipeError:
+        pass  # ffmpeg exited early; its stderr says why
+    finally:
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+    returncode = process.wait()
+    drain.join()
+    return returncode, b"".join(stderr_chunks).decode(errors='replace')
+
 # --- Slideshow Functions ---
 def prepare_slides(images, folder_path, orientation, duration_per_slide, use_transitions=False, background_type='blurred', background_color=(0, 0, 0), background_opacity=0.25, background_blur_radius=8, custom_dims=None):
     """Prepare images for slideshow by adding backgrounds and create a video."""
@@ -92,8 +201,8 @@ def prepare_slides(images, folder_path, orientation, duration_per_slide, use_tra
     print()
     
     # Calculate total duration
+    transition_duration = min(TRANSITION_DURATION, duration_per_slide / 2)
     if use_transitions:
-        transition_duration = 1.0  # 1 second dissolve
         total_duration = len(images) * duration_per_slide - (len(images) - 1) * transition_duration
     else:
         total_duration = len(images) * duration_per_slide
@@ -115,227 +224,111 @@ def prepare_slides(images, folder_path, orientation, duration_per_slide, use_tra
         output_file = f"{os.path.splitext(base_output_file)[0]}_{timestamp}_{counter}.mp4"
         counter += 1
     
+    bg_options = {
+        'background_type': background_type,
+        'background_color': background_color,
+        'background_opacity': background_opacity,
+        'background_blur_radius': background_blur_radius,
+    }
+    raw_input_args = [
+        "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{canvas_width}x{canvas_height}",
+    ]
+    successful = 0
+
     if use_transitions:
-        # Use EXACT pairing script logic - process all images with proper duration math
+        # Composited slides go straight into ffmpeg's stdin as raw RGBA; the
+        # dissolve timing is done by the filter chain, nothing touches disk.
         print("\033[93mCreating slideshow with transitions...\033[0m")
         print("-------------")
-        
-        transition_duration = 1.0
-        # Preprocess each image to apply background (blur or solid)
-        print("\033[93mPreprocessing images with background...\033[0m")
-        temp_dir = os.path.join(output_dir, "temp_slides_transitions")
-        os.makedirs(temp_dir, exist_ok=True)
-
-        processed_images = []
-        for i, img_path in enumerate(images, 1):
-            try:
-                canvas = Image.new('RGBA', (canvas_width, canvas_height), (0, 0, 0, 0))
-                img = Image.open(img_path)
-                if img.mode != 'RGBA':
-                    img = img.convert('RGBA')
-
-                if background_type == 'blurred':
-                    bg_img = img.copy()
-                    bg_img = bg_img.resize((canvas_width, canvas_height), Image.Resampling.LANCZOS)
-                    bg_img = bg_img.filter(ImageFilter.GaussianBlur(radius=background_blur_radius))
-                    alpha = Image.new('L', bg_img.size, int(255 * background_opacity))
-                    bg_img.putalpha(alpha)
-                    canvas.paste(bg_img, (0, 0), bg_img)
-                else:
-                    color_bg = Image.new('RGBA', (canvas_width, canvas_height), (*background_color, int(255 * background_opacity)))
-                    canvas.paste(color_bg, (0, 0), color_bg)
-
-                img_ratio = img.width / img.height
-                target_width = canvas_width
-                target_height = int(target_width / img_ratio)
-                if target_height > canvas_height:
-                    target_height = canvas_height
-                    target_width = int(target_height * img_ratio)
-
-                img = img.resize((target_width, target_height), Image.Resampling.LANCZOS)
-                paste_x = (canvas_width - target_width) // 2
-                paste_y = (canvas_height - target_height) // 2
-                canvas.paste(img, (paste_x, paste_y), img)
-
-                output_filename = os.path.join(temp_dir, f"frame_{i:04d}.png")
-                canvas.save(output_filename, 'PNG')
-                processed_images.append(output_filename)
+
+        def frames():
+            nonlocal successful
+            last_frame = None
+            for i, (img_path, frame, error) in enumerate(iter_slide_frames(images, canvas_width, canvas_height, bg_options), 1):
+                if frame is None:
+                    logger.error(f"Transition-mode preprocessing failed on {os.path.basename(img_path)}: {error}")
+                    continue
+                successful += 1
+                last_frame = frame
                 sys.stdout.write(f"\r\033[93mProcessed \033[0m{i}/{len(images)}")
                 sys.stdout.flush()
-            except Exception as e:
-                logger.error(f"Transition-mode preprocessing failed on {os.path.basename(img_path)}: {e}")
-                continue
-        
-        print()
-        images = processed_images
-        
-        # Build ffmpeg command exactly like pairing script but for multiple images
-        cmd = ["ffmpeg", "-y"]
-        
-        # Add all images as inputs with proper duration
-        for img_path in images:  # these are now the processed ones
-            cmd.extend(["-loop", "1", "-t", str(duration_per_slide), "-i", img_path])
-        
-        # Build filter complex with proper overlap timing (from pairing script)
-        filter_parts = []
-        overlay_chain = []
-        
-        for i in range(len(images)):
-            # Scale and format each input
-            scale_filter = f"[{i}:v]scale={canvas_width}:{canvas_height}:force_original_aspect_ratio=decrease,pad={canvas_width}:{canvas_height}:(ow-iw)/2:(oh-ih)/2,format=yuva420p"
-            
-            if i == 0:
-                # First image: fade out at the end, no offset
-                fade_filter = f"{scale_filter},fade=t=out:st={duration_per_slide-transition_duration}:d={transition_duration}:alpha=1,setpts=PTS-STARTPTS[va{i}]"
-                filter_parts.append(fade_filter)
-                overlay_chain.append(f"va{i}")
-            else:
-                # Subsequent images: fade in, offset by (duration - transition) for each previous image
-                offset_time = i * (duration_per_slide - transition_duration)
-                fade_filter = f"{scale_filter},fade=t=in:st=0:d={transition_duration}:alpha=1,setpts=PTS-STARTPTS+{offset_time}/TB[va{i}]"
-                filter_parts.append(fade_filter)
-                overlay_chain.append(f"va{i}")
-        
-        # Chain overlays exactly like pairing script
-        if len(images) == 1:
-            final_output = overlay_chain[0]
-        else:
-            current_base = overlay_chain[0]
-            for i in range(1, len(overlay_chain)):
-                if i == 1:
-                    overlay_filter = f"[{current_base}][{overlay_chain[i]}]overlay[ov{i}]"
-                    current_base = f"ov{i}"
-                else:
-                    overlay_filter = f"[{current_base}][{overlay_chain[i]}]overlay[ov{i}]"
-                    current_base = f"ov{i}"
-                filter_parts.append(overlay_filter)
-            final_output = current_base
-        
-        # Add final trim with exact duration calculation (from pairing script logic)
-        final_duration = len(images) * duration_per_slide - (len(images) - 1) * transition_duration
-        filter_parts.append(f"[{final_output}]trim=duration={final_duration}")
-        
-        filter_complex = ";".join(filter_parts)
-        
-        cmd.extend([
-            "-filter_complex", filter_complex,
+                yield frame  # A: fully visible
+                yield frame  # Z
+                yield frame  # H: end of hold, dissolve starts here
+            if last_frame is not None:
+                yield last_frame  # terminator A/Z at the end of the show
+                yield last_frame
+
+        cmd = [
+            "ffmpeg", "-y", "-loglevel", "error",
+            *raw_input_args, "-i", "pipe:0",
+            "-vf", dissolve_timing_filter(duration_per_slide, transition_duration),
             "-c:v", "h264_videotoolbox",
             "-b:v", "8M",
             "-pix_fmt", "yuv420p",
-            "-r", "30",
-            "-t", str(final_duration),
+            "-r", str(OUTPUT_FPS),
             "-fps_mode", "cfr",
             output_file
-        ])
-        
-        try:
-            subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-            for temp_file in os.listdir(temp_dir):
-                os.remove(os.path.join(temp_dir, temp_file))
-            os.rmdir(temp_dir)
-            
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Error creating slideshow with transitions: {e.stderr}")
+        ]
+        returncode, stderr = stream_frames_to_ffmpeg(cmd, frames())
+        print()
+
+        if successful == 0 or returncode != 0:
+            if os.path.exists(output_file):
+                os.remove(output_file)
+        if successful == 0:
+            print("\033[93mNo images were processed successfully.\033[0m", file=sys.stderr)
+            return None, 0
+        if returncode != 0:
+            logger.error(f"Error creating slideshow with transitions: {stderr}")
             print("\033[93mError creating slideshow. Check image_slideshow_maker_log.txt for details.\033[0m", file=sys.stderr)
-            return None, len(images)
-        # Clean up temporary processed images
-        return output_file, len(images)
-        
+            return None, successful
+        return output_file, successful
+
     else:
-        # Original method without transitions - prepare processed images first
-        temp_dir = os.path.join(output_dir, "temp_slides")
-        os.makedirs(temp_dir, exist_ok=True)
-        
-        # Process each image
-        successful = 0
-        for i, img_path in enumerate(images, 1):
-            try:
-                # Create transparent canvas
-                canvas = Image.new('RGBA', (canvas_width, canvas_height), (0, 0, 0, 0))
-                
-                # Load image
-                img = Image.open(img_path)
-                if img.mode != 'RGBA':
-                    img = img.convert('RGBA')
-                
-                # Create background based on type
-                if background_type == 'blurred':
-                    # Create blurred background from the image itself
-                    bg_img = img.copy()
-                    bg_img = bg_img.resize((canvas_width, canvas_height), Image.Resampling.LANCZOS)
-                    bg_img = bg_img.filter(ImageFilter.GaussianBlur(radius=background_blur_radius))
-                    alpha = Image.new('L', bg_img.size, int(255 * background_opacity))
-                    bg_img.putalpha(alpha)
-                    canvas.paste(bg_img, (0, 0), bg_img)
-                else:
-                    # Create solid color background
-                    color_bg = Image.new('RGBA', (canvas_width, canvas_height), (*background_color, int(255 * background_opacity)))
-                    canvas.paste(color_bg, (0, 0), color_bg)
-                
-                # Calculate scaling for foreground to fit canvas
-                img_ratio = img.width / img.height
-                target_width = canvas_width
-                target_height = int(target_width / img_ratio)
-                
-                # If target_height exceeds canvas_height, scale to height
-                if target_height > canvas_height:
-                    target_height = canvas_height
-                    target_width = int(target_height * img_ratio)
-                
-                # Resize foreground image
-                img = img.resize((target_width, target_height), Image.Resampling.LANCZOS)
-                
-                # Center foreground on canvas
-                paste_x = (canvas_width - target_width) // 2
-                paste_y = (canvas_height - target_height) // 2
-                canvas.paste(img, (paste_x, paste_y), img)
-                
-                # Save processed image
-                output_filename = os.path.join(temp_dir, f"slide_{i:04d}.png")
-                canvas.save(output_filename, 'PNG')
+        # One raw frame per slide, each shown for duration_per_slide
+        def frames():
+            nonlocal successful
+            for i, (img_path, frame, error) in enumerate(iter_slide_frames(images, canvas_width, canvas_height, bg_options), 1):
+                if frame is None:
+                    logger.error(f"Error processing {os.path.basename(img_path)}: {error}")
+                    sys.stdout.write(f"\r\033[93mPreparing slide \033[0m{i}/{len(images)}... \033[93m(failed)\033[0m")
+                    sys.stdout.flush()
+                    continue
                 successful += 1
                 sys.stdout.write(f"\r\033[93mPreparing slides \033[0m{i}/{len(images)}...")
                 sys.stdout.flush()
-            except Exception as e:
-                logger.error(f"Error processing {os.path.basename(img_path)}: {e}")
-                sys.stdout.write(f"\r\033[93mPreparing slide \033[0m{i}/{len(images)}... \033[93m(failed)\033[0m")
-                sys.stdout.flush()
-                continue
-        
-        print()
+                yield frame
+
         print("\n\033[93mCreating Slideshow...\033[0m")
         print("-------------")
-        # Clear processing line
-        sys.stdout.write("\r" + " " * 50 + "\r")
-        sys.stdout.flush()
-        
-        if successful == 0:
-            print("\033[93mNo images were processed successfully.\033[0m", file=sys.stderr)
-            return None, 0
-        
-        # Create video using ffmpeg - FIXED TIMING
+
         ffmpeg_cmd = [
-            'ffmpeg', '-y',
+            'ffmpeg', '-y', '-loglevel', 'error',
             '-framerate', f'1/{duration_per_slide}',
-            '-i', os.path.join(temp_dir, 'slide_%04d.png'),
+            *raw_input_args, '-i', 'pipe:0',
             '-c:v', 'h264_videotoolbox',
             '-b:v', '8M',
             '-pix_fmt', 'yuv420p',
             output_file
         ]
-        
-        try:
-            subprocess.run(ffmpeg_cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Error creating video: {e.stderr}")
+        returncode, stderr = stream_frames_to_ffmpeg(ffmpeg_cmd, frames())
+        print()
+        # Clear processing line
+        sys.stdout.write("\r" + " " * 50 + "\r")
+        sys.stdout.flush()
+
+        if successful == 0 or returncode != 0:
+            if os.path.exists(output_file):
+                os.remove(output_file)
+        if successful == 0:
+            print("\033[93mNo images were processed successfully.\033[0m", file=sys.stderr)
+            return None, 0
+        if returncode != 0:
+            logger.error(f"Error creating video: {stderr}")
             print("\033[93mError creating video. Check image_slideshow_maker_log.txt for details.\033[0m", file=sys.stderr)
             return None, successful
-        
-        # Clean up temporary files
-        for temp_file in os.listdir(temp_dir):
-            os.remove(os.path.join(temp_dir, temp_file))
-        os.rmdir(temp_dir)
-        
+
         return output_file, successful
 
 # --- Main Execution ---
@@ -1,105 +1,105 @@
 import os
 import sys
+import struct
 import pathlib
-import tempfile
-import shutil
+import threading
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 import djjtb.utils as djj
 from PIL import Image
 
 os.system('clear')
 
-def extract_webp_frames(webp_path, output_folder):
-    """
-    Extract all frames from an animated WebP to PNG files.
+WEBP_WORKERS = max(1, min(4, (os.cpu_count() or 2) // 2))  # files converted at once
+PLACEHOLDER_DURATION_MS = 100  # what PIL/browsers report when a frame has no real timing
 
-    FPS is computed from the average of every frame's duration (not just
-    the first frame) — some WebPs vary per-frame timing. If every frame
-    reports exactly the 100ms PIL default, that's treated as "no real
-    metadata" rather than trusted as an actual 10fps — many WebPs re-saved
-    by browsers lose their real timing and PIL silently falls back to that
-    placeholder, which previously produced wrong-speed output.
+QUALITY_SETTINGS = {
+    'high': {'crf': '18', 'preset': 'slow'},
+    'medium': {'crf': '23', 'preset': 'medium'},
+    'low': {'crf': '28', 'preset': 'fast'}
+}
 
-    Returns (frame_paths, fps_or_None, status) where status is one of
-    'ok', 'not_animated', 'error'.
+def read_webp_durations(webp_path):
     """
-    try:
-        img = Image.open(webp_path)
-
-        if not getattr(img, 'is_animated', False):
-            return None, None, 'not_animated'
+    Per-frame durations (ms) of an animated WebP, read from the ANMF chunk
+    headers only — no frame is decoded. Returns [] for still images.
+    Durations of 10ms or less are shown as 100ms by browsers, so they are
+    normalized the same way here.
+    """
+    durations = []
+    with open(webp_path, 'rb') as f:
+        head = f.read(12)
+        if head[:4] != b'RIFF' or head[8:12] != b'WEBP':
+            return []
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                break
+            fourcc = chunk[:4]
+            (size,) = struct.unpack('<I', chunk[4:8])
+            if fourcc == b'ANMF':
+                frame_header = f.read(16)
+                duration = int.from_bytes(frame_header[12:15], 'little')
+                durations.append(duration if duration > 10 else PLACEHOLDER_DURATION_MS)
+                f.seek(size - 16 + (size & 1), os.SEEK_CUR)
+            else:
+                f.seek(size + (size & 1), os.SEEK_CUR)
+    return durations
+
+def detect_webp_fps(durations):
+    """
+    Average FPS over every frame's duration (some WebPs vary per-frame
+    timing). If every frame reports exactly the 100ms PIL default, that's
+    treated as "no real metadata" rather than trusted as an actual 10fps —
+    many WebPs re-saved by browsers lose their real timing. Returns None then.
+    """
+    if durations and any(d != PLACEHOLDER_DURATION_MS for d in durations):
+        return 1000.0 * len(durations) / sum(durations)
+    return None
 
-        frame_count = getattr(img, 'n_frames', 1)
-        durations = []
-        try:
-            for i in range(frame_count):
-                img.seek(i)
-                duration = img.info.get('duration', None)
-                if duration:
-                    durations.append(duration)
-        except Exception:
-            pass
-
-        if durations and any(d != 100 for d in durations):
-            avg_duration = sum(durations) / len(durations)
-            fps = 1000.0 / avg_duration
+def frame_timestamp_expr(durations):
+    """
+    setpts expression (in 1/1000 time base) giving frame N its real start time,
+    plus one extra frame at the end of the last one. Runs of equal durations
+    collapse into one term, so typical files need only a few.
+    """
+    runs = []  # [first_frame, frame_count, duration_ms, start_ms]
+    start_ms = 0
+    for n, duration in enumerate(durations + [0]):
+        if runs and runs[-1][2] == duration:
+            runs[-1][1] += 1
         else:
-            fps = None  # No real metadata — caller falls back to manual/default
-
-        img.seek(0)
-
-        # Determine if frames are full-canvas or partial-region updates,
-        # so partial-update frames get composited onto the previous frame
-        # instead of leaving the untouched region blank.
-        mode = 'full'
-        try:
-            while True:
-                if img.tile:
-                    tile = img.tile[0]
-                    update_region = tile[1]
-                    update_region_dimensions = update_region[2:]
-                    if update_region_dimensions != img.size:
-                        mode = 'partial'
-                        break
-                img.seek(img.tell() + 1)
-        except EOFError:
-            pass
-
-        img.seek(0)
-
-        frame_paths = []
-        i = 0
-        last_frame = img.convert('RGBA')
-
-        try:
-            while True:
-                new_frame = Image.new('RGBA', img.size)
-
-                if mode == 'partial':
-                    new_frame.paste(last_frame)
-
-                new_frame.paste(img, (0, 0), img.convert('RGBA'))
-
-                frame_path = os.path.join(output_folder, f'frame_{i:05d}.png')
-                new_frame.save(frame_path, 'PNG')
-                frame_paths.append(frame_path)
-
-                i += 1
-                last_frame = new_frame
-                img.seek(img.tell() + 1)
-        except EOFError:
-            pass
-
-        img.close()
-        return frame_paths, fps, 'ok'
-
-    except Exception as e:
-        print(f"\033[93m⚠️  Error extracting frames from {os.path.basename(webp_path)}: {e}\033[0m")
-        return None, None, 'error'
-
-def convert_webp_to_mp4(webp_path, output_path, quality_preset='high', use_detected_fps=True, manual_fps=None):
+            runs.append([n, 1, duration, start_ms])
+        start_ms += duration
+    return "+".join(
+        f"between(N,{first},{first + count - 1})*({start}+(N-{first})*{duration})"
+        for first, count, duration, start in runs
+    )
+
+def iter_webp_frames(img):
     """
-    Convert an animated WebP to MP4 using frame extraction and FFmpeg.
+    Yield every frame of an open animated WebP as full-canvas RGBA bytes,
+    decoding each frame once. Partial-region update frames (older decoders
+    hand those back instead of composited canvases) are pasted onto the
+    previous frame so the untouched region isn't left blank.
+    """
+    last_frame = None
+    for index in range(img.n_frames):
+        img.seek(index)
+        partial = bool(img.tile) and tuple(img.tile[0][1][2:]) != img.size
+        frame = img.convert('RGBA')
+        if partial and last_frame is not None:
+            composited = last_frame.copy()
+            composited.paste(frame, (0, 0), frame)
+            frame = composited
+        last_frame = frame
+        yield frame.tobytes()
+
+def convert_webp_to_mp4(webp_path, output_path, quality_preset='high', use_detected_fps=True, manual_fps=None, log=print):
+    """
+    Convert an animated WebP to MP4 by streaming its composited frames to
+    FFmpeg's stdin as raw RGBA. With detected timing, each frame keeps its own
+    duration (variable frame rate); otherwise frames play at a constant fps.
 
     Args:
         webp_path: Path to input WebP file
@@ -107,88 +107,109 @@ def convert_webp_to_mp4(webp_path, output_path, quality_preset='high', use_detec
         quality_preset: 'high', 'medium', or 'low'
         use_detected_fps: Whether to use detected FPS (True) or manual FPS (False)
         manual_fps: Manual FPS value if use_detected_fps is False
+        log: Called with each progress line (batch mode buffers them)
 
     Returns:
         tuple: (success, fps_used, metadata_found, status)
         status is one of 'ok', 'not_animated', 'error'
     """
-    temp_dir = tempfile.mkdtemp(prefix='webp2mp4_')
-
     try:
-        print(f"   Extracting frames from {os.path.basename(webp_path)}...")
-        frame_paths, detected_fps, status = extract_webp_frames(webp_path, temp_dir)
+        img = Image.open(webp_path)
+    except Exception as e:
+        log(f"\033[93m⚠️  Error opening {os.path.basename(webp_path)}: {e}\033[0m")
+        return False, None, False, 'error'
 
-        if status == 'not_animated':
-            print(f"   \033[93m⏭️  Not animated — skipping\033[0m")
+    try:
+        if not getattr(img, 'is_animated', False):
+            log(f"   \033[93m⏭️  Not animated — skipping\033[0m")
             return False, None, False, 'not_animated'
 
-        if not frame_paths:
-            return False, None, False, 'error'
-
+        durations = read_webp_durations(webp_path)
+        if len(durations) != img.n_frames:
+            durations = []  # unreadable chunk layout — treat as no metadata
+        detected_fps = detect_webp_fps(durations)
         metadata_found = detected_fps is not None
+        use_timestamps = use_detected_fps and metadata_found
 
-        if use_detected_fps and detected_fps:
+        if use_timestamps:
             fps = detected_fps
-            print(f"   \033[92m✓ Detected FPS: {detected_fps:.2f}\033[0m")
-        elif use_detected_fps and not detected_fps:
+            log(f"   \033[92m✓ Detected FPS: {detected_fps:.2f}\033[0m")
+        elif use_detected_fps:
             fps = manual_fps if manual_fps else 30
-            print(f"   \033[93m⚠️  No FPS metadata - using {fps:.2f} FPS\033[0m")
+            log(f"   \033[93m⚠️  No FPS metadata - using {fps:.2f} FPS\033[0m")
         else:
             fps = manual_fps if manual_fps else 30
 
-        print(f"   Creating MP4 with {len(frame_paths)} frames at {fps:.2f} FPS...")
-
-        quality_settings = {
-            'high': {'crf': '18', 'preset': 'slow'},
-            'medium': {'crf': '23', 'preset': 'medium'},
-            'low': {'crf': '28', 'preset': 'fast'}
-        }
-        settings = quality_settings.get(quality_preset, quality_settings['high'])
+        if use_timestamps and len(set(durations)) > 1:
+            log(f"   Streaming {img.n_frames} frames with per-frame timing (avg {fps:.2f} FPS)...")
+        else:
+            log(f"   Streaming {img.n_frames} frames at {fps:.2f} FPS...")
 
-        frame_pattern = os.path.join(temp_dir, 'frame_%05d.png')
+        settings = QUALITY_SETTINGS.get(quality_preset, QUALITY_SETTINGS['high'])
+        width, height = img.size
 
         # libx264 + yuv420p requires even width/height — pad odd-dimension
         # sources instead of letting ffmpeg hard-fail on them.
-        with Image.open(frame_paths[0]) as first_frame:
-            pad_filter = djj.get_pad_filter(*first_frame.size)
+        filters = []
+        if use_timestamps:
+            filters.append(f"settb=1/1000,setpts='{frame_timestamp_expr(durations)}'")
+        pad_filter = djj.get_pad_filter(width, height)
+        if pad_filter != 'null':
+            filters.append(pad_filter)
 
         cmd = [
-            'ffmpeg',
-            '-y',
+            'ffmpeg', '-y', '-loglevel', 'error',
+            '-f', 'rawvideo', '-pix_fmt', 'rgba', '-s', f'{width}x{height}',
             '-framerate', str(fps),
-            '-i', frame_pattern,
+            '-i', 'pipe:0',
+        ]
+        if filters:
+            cmd += ['-vf', ','.join(filters)]
+        cmd += [
             '-c:v', 'libx264',
             '-crf', settings['crf'],
             '-preset', settings['preset'],
             '-pix_fmt', 'yuv420p',
-            '-movflags', '+faststart',
         ]
-        if pad_filter != 'null':
-            cmd += ['-vf', pad_filter]
-        cmd.append(output_path)
-
-        result = subprocess.run(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-
-        if result.returncode == 0:
+        if use_timestamps:
+            # Keep the source timestamps as-is. The extra end frame only marks
+            # the last frame's duration; B-frames are off because the mp4
+            # edit list miscounts sparse VFR timestamps with reordering.
+            cmd += ['-fps_mode', 'passthrough', '-bf', '0']
+        cmd += ['-movflags', '+faststart', output_path]
+
+        process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        stderr_chunks = []
+        drain = threading.Thread(target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True)
+        drain.start()
+        try:
+            frame = None
+            for frame in iter_webp_frames(img):
+                process.stdin.write(frame)
+            if use_timestamps and frame is not None:
+                process.stdin.write(frame)  # end marker for the last frame's duration
+        except BrokenPipeError:
+            pass  # ffmpeg exited early; its stderr says why
+        finally:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+        returncode = process.wait()
+        drain.join()
+
+        if returncode == 0:
             return True, fps, metadata_found, 'ok'
-        else:
-            print(f"\033[93m⚠️  FFmpeg error: {result.stderr[-200:]}\033[0m")
-            return False, None, metadata_found, 'error'
+        stderr = b"".join(stderr_chunks).decode(errors='replace')
+        log(f"\033[93m⚠️  FFmpeg error: {stderr[-200:]}\033[0m")
+        return False, None, metadata_found, 'error'
 
     except Exception as e:
-        print(f"\033[93m⚠️  Conversion error: {e}\033[0m")
+        log(f"\033[93m⚠️  Conversion error: {e}\033[0m")
         return False, None, False, 'error'
 
     finally:
-        try:
-            shutil.rmtree(temp_dir)
-        except Exception:
-            pass
+        img.close()
 
 def collect_webp_files(input_path, include_subfolders=False):
     """Collect WebP files from a directory."""
@@ -226,11 +247,18 @@ def collect_webp_from_txt():
 
     return sorted(set(webp_files), key=str.lower)
 
-def batch_convert_webps(webp_files, output_folder, source_folder, quality_preset, use_detected_fps, manual_fps=None):
+def _convert_buffered(webp_path, output_path, quality_preset, use_detected_fps, manual_fps):
+    lines = []
+    result = convert_webp_to_mp4(webp_path, output_path, quality_preset, use_detected_fps, manual_fps, log=lines.append)
+    return result, lines
+
+def batch_convert_webps(webp_files, output_folder, source_folder, quality_preset, use_detected_fps, manual_fps=None,
+                        workers=WEBP_WORKERS):
     """
-    Convert multiple WebP files to MP4. Mirrors each file's subfolder
-    (relative to source_folder) under output_folder, so same-named files
-    from different subfolders don't collide/overwrite each other.
+    Convert multiple WebP files to MP4, `workers` files at a time. Mirrors
+    each file's subfolder (relative to source_folder) under output_folder, so
+    same-named files from different subfolders don't collide/overwrite each
+    other. Each file's output is printed in input order once it finishes.
 
     Returns:
         tuple: (success_count, skipped_count, failed_count, fps_info)
@@ -246,36 +274,39 @@ def batch_convert_webps(webp_files, output_folder, source_folder, quality_preset
     print("\033[1;33m🔄 Converting WebPs to MP4...\033[0m")
     print("=" * 60)
 
-    for i, webp_path in enumerate(webp_files):
-        filename = os.path.basename(webp_path)
-        output_filename = os.path.splitext(filename)[0] + '.mp4'
-
+    jobs = []
+    for webp_path in webp_files:
+        output_filename = os.path.splitext(os.path.basename(webp_path))[0] + '.mp4'
         rel_dir = os.path.relpath(os.path.dirname(webp_path), source_folder)
         dest_dir = output_folder if rel_dir == '.' else os.path.join(output_folder, rel_dir)
         os.makedirs(dest_dir, exist_ok=True)
-        output_path = os.path.join(dest_dir, output_filename)
+        jobs.append((webp_path, os.path.join(dest_dir, output_filename)))
 
-        print(f"\033[93m[{i+1}/{len(webp_files)}]\033[0m {filename}")
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [
+            pool.submit(_convert_buffered, webp_path, output_path, quality_preset, use_detected_fps, manual_fps)
+            for webp_path, output_path in jobs
+        ]
 
-        success, fps_used, metadata_found, status = convert_webp_to_mp4(
-            webp_path,
-            output_path,
-            quality_preset,
-            use_detected_fps,
-            manual_fps
-        )
+        for i, ((webp_path, output_path), future) in enumerate(zip(jobs, futures)):
+            filename = os.path.basename(webp_path)
+            print(f"\033[93m[{i+1}/{len(webp_files)}]\033[0m {filename}")
 
-        if success:
-            print(f"\033[92m   ✅ Success - {output_filename}\033[0m")
-            success_count += 1
-            fps_info.append((filename, fps_used, metadata_found))
-        elif status == 'not_animated':
-            skipped_count += 1
-        else:
-            print(f"\033[91m   ❌ Failed - {filename}\033[0m")
-            failed_count += 1
+            (success, fps_used, metadata_found, status), lines = future.result()
+            for line in lines:
+                print(line)
 
-        print()
+            if success:
+                print(f"\033[92m   ✅ Success - {os.path.basename(output_path)}\033[0m")
+                success_count += 1
+                fps_info.append((filename, fps_used, metadata_found))
+            elif status == 'not_animated':
+                skipped_count += 1
+            else:
+                print(f"\033[91m   ❌ Failed - {filename}\033[0m")
+                failed_count += 1
+
+            print()
 
     print("=" * 60)
     print(f"\033[1;33m🏁 Conversion Complete!\033[0m")
@@ -4,10 +4,10 @@ import shutil
 import subprocess
 import sys
 import webbrowser
-from PIL import Image
 from pathlib import Path
 from collections import defaultdict
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 import djjtb.utils as djj
 
 os.system('clear')
@@ -77,48 +77,51 @@ def get_aspect_category(width, height):
         return "Unsorted_Portrait", "_USP"
 
 def get_video_resolution(file_path):
-    try:
-        result = subprocess.run([
-            "ffprobe", "-v", "error", "-select_streams", "v:0",
-            "-show_entries", "stream=width,height",
-            "-of", "csv=s=x:p=0", str(file_path)
-        ], capture_output=True, text=True, timeout=2)
-
-        output = result.stdout.strip()
-        if not output:
-            print(f"⚠️ ffprobe gave empty output: {file_path}")
-            return None, None
-
-        # Clean up output like "2560x1118x" or "2560x1118x\n"
-        cleaned = output.strip().rstrip("x").strip()
-
-        parts = cleaned.split("x")
-        if len(parts) == 2:
-            try:
-                width = int(parts[0])
-                height = int(parts[1])
-                return width, height
-            except ValueError:
-                print(f"❌ Failed to parse resolution: {output} for {file_path}")
-                return None, None
-        else:
-            print(f"❌ Unexpected ffprobe format: {output} for {file_path}")
-            return None, None
-
-    except subprocess.TimeoutExpired:
-        print(f"⏱️ ffprobe timeout: {file_path}")
+    info = djj.probe_media(file_path, timeout=2)
+    if not info:
+        print(f"❌ ffprobe failed or timed out: {file_path}")
         return None, None
-    except Exception as e:
-        print(f"❌ ffprobe error on {file_path}: {e}")
+    if not info['width'] or not info['height']:
+        print(f"⚠️ ffprobe found no video size: {file_path}")
         return None, None
-        
+    return info['width'], info['height']
+
 def get_image_resolution(file_path):
     try:
-        with Image.open(file_path) as img:
-            return img.width, img.height
+        return djj.get_image_size(file_path)
     except Exception:
         return None, None
 
+# Concurrent resolution reads for process_media's up-front resolve pass.
+RESOLVE_WORKERS = 16
+
+def resolve_resolutions(files_to_process):
+    """
+    Read (width, height) for every file before sorting starts, instead of
+    one blocking probe per file inside the sort loop. Videos go through
+    djj.probe_media_many (cache hits never spawn ffprobe; misses run
+    RESOLVE_WORKERS at a time), images through a thread pool of PIL
+    header reads. Returns {file_path: (width, height)}, (None, None) when
+    unreadable.
+    """
+    videos = [f for f in files_to_process if f.suffix.lower() in VIDEO_EXTS]
+    images = [f for f in files_to_process if f.suffix.lower() in IMAGE_EXTS]
+    resolutions = {}
+
+    if videos:
+        print(f"\033[93m🔍 Reading {len(videos)} video resolution(s)...\033[0m")
+        infos = djj.probe_media_many(videos, workers=RESOLVE_WORKERS, timeout=2)
+        for path, info in infos.items():
+            resolutions[path] = (info['width'], info['height']) if info else (None, None)
+
+    if images:
+        print(f"\033[93m🔍 Reading {len(images)} image resolution(s)...\033[0m")
+        with ThreadPoolExecutor(max_workers=RESOLVE_WORKERS) as pool:
+            for path, dims in zip(images, pool.map(get_image_resolution, images)):
+                resolutions[path] = dims
+
+    return resolutions
+
 def safe_rename_only(file_path, suffix):
     parent = file_path.parent
     base = file_path.stem
@@ -297,6 +300,9 @@ def process_media(files_to_process, root_folder, mode, move_files, move_only=Fal
     skipped = []
     tagged_count = 0
 
+    wanted_exts = {"images": IMAGE_EXTS, "videos": VIDEO_EXTS}.get(mode, IMAGE_EXTS | VIDEO_EXTS)
+    resolutions = resolve_resolutions([f for f in files_to_process if f.suffix.lower() in wanted_exts])
+
     total = len(files_to_process)
     for i, file_path in enumerate(files_to_process):
         percent = (i + 1) / total * 100
@@ -315,10 +321,7 @@ def process_media(files_to_process, root_folder, mode, move_files, move_only=Fal
             elif mode == "both" and ext not in IMAGE_EXTS and ext not in VIDEO_EXTS:
                 continue
 
-            if ext in IMAGE_EXTS:
-                width, height = get_image_resolution(file_path)
-            elif ext in VIDEO_EXTS:
-                width, height = get_video_resolution(file_path)
+            width, height = resolutions.get(file_path, (None, None))
 
             if not width or not height:
                 print(f"  ⚠️ Skipping (couldn't get resolution): {file_path.name}")
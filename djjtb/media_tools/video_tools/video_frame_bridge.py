@@ -2,11 +2,11 @@ import os
 import sys
 import subprocess
 import pathlib
-import json
 import logging
 import shlex
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import djjtb.utils as djj
 
 os.system('clear')
@@ -14,6 +14,17 @@ os.system('clear')
 IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp')
 LOG_DIR = Path("~/Documents/Scripts/DJJTB/djjtb/logs").expanduser()
 LOG_DIR.mkdir(parents=True, exist_ok=True)
+PROBE_WORKERS = 8
+# Each extraction is one ffmpeg process that already decodes multithreaded,
+# so only a few run side by side.
+EXTRACT_WORKERS = max(1, min(4, (os.cpu_count() or 2) // 2))
+# Sparse sampling seeks instead of decoding the whole file. One accurate seek
+# decodes roughly a GOP, so seeking wins once there are fewer than
+# nb_frames / SEEK_COST_FRAMES samples.
+SEEK_COST_FRAMES = 250
+SEEK_BATCH = 16    # seek points opened by one ffmpeg process
+SEEK_WORKERS = 2   # seek processes per video
+SAMPLING_MODES = ('auto', 'decode', 'seek')
 
 
 def get_op_logger(op_name):
@@ -47,27 +58,23 @@ def prompt_integer(prompt, min_value=1):
 
 # ── Video info ────────────────────────────────────────────────────────────────
 
-def get_video_info(video_path):
-    """Returns (nb_frames, duration, frame_rate) for a video."""
-    try:
-        probe_cmd = [
-            "ffprobe", "-v", "error", "-select_streams", "v:0",
-            "-show_entries", "stream=nb_frames,duration,r_frame_rate", "-of", "json", str(video_path)
-        ]
-        probe_result = subprocess.run(probe_cmd, capture_output=True, text=True, check=True)
-        data = json.loads(probe_result.stdout)["streams"][0]
-        nb_frames = int(data["nb_frames"]) if "nb_frames" in data else None
-        duration = float(data["duration"]) if "duration" in data else None
-        frame_rate = eval(data["r_frame_rate"]) if '/' in data["r_frame_rate"] else float(data["r_frame_rate"])
-
-        if duration and frame_rate:
-            expected_frames = int(duration * frame_rate)
-            if not nb_frames or abs(nb_frames - expected_frames) > 0.1 * expected_frames:
-                nb_frames = expected_frames
-
-        return nb_frames or 0, duration or 0, frame_rate or 0
-    except Exception:
+def get_video_info(video_path, info=None):
+    """Returns (nb_frames, duration, frame_rate) for a video. `info` is an
+    already-fetched djj.probe_media result, if the caller has one."""
+    if info is None:
+        info = djj.probe_media(video_path)
+    if not info:
         return 0, 0, 0
+    nb_frames = info['nb_frames']
+    duration = info['stream_duration'] or info['duration']
+    frame_rate = info['fps']
+
+    if duration and frame_rate:
+        expected_frames = int(duration * frame_rate)
+        if not nb_frames or abs(nb_frames - expected_frames) > 0.1 * expected_frames:
+            nb_frames = expected_frames
+
+    return nb_frames or 0, duration or 0, frame_rate or 0
 
 
 def probe_all_videos(videos):
@@ -76,11 +83,10 @@ def probe_all_videos(videos):
     Shows a progress indicator while probing.
     """
     print("\033[93m🔍 Probing videos...\033[0m")
+    infos = djj.probe_media_many(videos, workers=PROBE_WORKERS)
     results = []
-    for i, v in enumerate(videos, 1):
-        sys.stdout.write(f"\r  {i}/{len(videos)}...")
-        sys.stdout.flush()
-        nb_frames, duration, fps = get_video_info(v)
+    for v in videos:
+        nb_frames, duration, fps = get_video_info(v, infos.get(v))
         results.append({
             'path': v,
             'name': v.name,
@@ -88,8 +94,6 @@ def probe_all_videos(videos):
             'duration': duration,
             'fps': fps,
         })
-    sys.stdout.write(f"\r{' ' * 30}\r")
-    sys.stdout.flush()
     return results
 
 
@@ -197,45 +201,77 @@ def make_video_output_dir(session_dir, video_stem):
     return out
 
 
-# ── Frame-accurate renaming ───────────────────────────────────────────────────
+# ── Frame-accurate naming ─────────────────────────────────────────────────────
 
-def rename_frames_interval(output_dir, video_stem, frame_interval, nb_frames):
+def frame_output_args(output_dir, video_stem):
     """
-    Rename sequentially-numbered ffmpeg output to actual frame numbers.
-    ffmpeg outputs F0001, F0002, F0003...
-    We rename to F0001, F0005, F0009... (for interval 4, 1-indexed actual frames)
+    ffmpeg output args that name every extracted image by its real 1-based
+    frame number (video_F0001.jpg, video_F0005.jpg...) as it is written.
+    setpts=N+1 (placed before the select) stamps each decoded frame with its
+    index and -frame_pts puts that number in the file name, so no rename
+    pass is needed afterwards.
     """
-    files = sorted([f for f in os.listdir(output_dir) if f.endswith('.jpg')])
-    for seq_idx, filename in enumerate(files):
-        actual_frame_1based = seq_idx * frame_interval + 1
-        new_name = f"{video_stem}_F{actual_frame_1based:04d}.jpg"
-        old_path = os.path.join(output_dir, filename)
-        new_path = os.path.join(output_dir, new_name)
-        if old_path != new_path:
-            os.rename(old_path, new_path)
+    pattern = f"{video_stem.replace('%', '%%')}_F%04d.jpg"
+    return ['-fps_mode', 'passthrough', '-frame_pts', '1', '-q:v', '2', str(Path(output_dir) / pattern)]
+
 
+def count_extracted(output_dir):
+    return sum(1 for f in os.listdir(output_dir) if f.endswith('.jpg'))
 
-def rename_frames_count(output_dir, video_stem, indices):
+
+# ── Seek-based sampling ───────────────────────────────────────────────────────
+
+def choose_sampling(sampling, nb_frames, sample_count, fps):
+    """Resolve 'auto' to 'seek' or 'decode'. Seeking needs a frame rate to map
+    frame numbers to timestamps; without one it always falls back to decode."""
+    if sampling not in SAMPLING_MODES:
+        raise ValueError(f"sampling must be one of {SAMPLING_MODES}, got {sampling!r}")
+    if not fps:
+        return 'decode'
+    if sampling == 'auto':
+        return 'seek' if sample_count * SEEK_COST_FRAMES < nb_frames else 'decode'
+    return sampling
+
+
+def build_seek_cmd(video_path, indices, fps, output_dir, video_stem):
     """
-    Rename sequentially-numbered ffmpeg output to actual frame numbers.
-    indices: list of 0-based frame indices that were extracted.
-    Display as 1-based.
+    One ffmpeg process grabbing one frame per index. Each index gets its own
+    input with an input-side -ss: ffmpeg jumps to the keyframe before it and
+    decodes only the rest of that GOP (accurate seek). The seek point is half a
+    frame early so float rounding can't skip past the wanted frame.
     """
-    files = sorted([f for f in os.listdir(output_dir) if f.endswith('.jpg')])
-    for seq_idx, filename in enumerate(files):
-        if seq_idx >= len(indices):
-            break
-        actual_frame_1based = indices[seq_idx] + 1
-        new_name = f"{video_stem}_F{actual_frame_1based:04d}.jpg"
-        old_path = os.path.join(output_dir, filename)
-        new_path = os.path.join(output_dir, new_name)
-        if old_path != new_path:
-            os.rename(old_path, new_path)
+    cmd = ['ffmpeg', '-y', '-v', 'error']
+    for idx in indices:
+        cmd.extend(['-ss', f'{max(0.0, (idx - 0.5) / fps):.6f}', '-i', str(video_path)])
+    for k, idx in enumerate(indices):
+        cmd.extend([
+            '-map', f'{k}:v:0', '-frames:v', '1', '-q:v', '2', '-update', '1',
+            str(Path(output_dir) / f"{video_stem}_F{idx + 1:04d}.jpg")
+        ])
+    return cmd
+
+
+def _run_checked(cmd):
+    return subprocess.run(cmd, check=True, capture_output=True, text=True)
+
+
+def extract_frames_by_seeking(video_path, indices, fps, output_dir, video_stem, workers=SEEK_WORKERS):
+    """
+    Extract the given 0-based frame indices with SEEK_BATCH seeks per ffmpeg
+    process, `workers` processes at a time. Raises CalledProcessError like the
+    full-decode path. Frame numbers come from fps, so on variable-frame-rate
+    files they are the nominal position rather than the decoded index.
+    """
+    batches = [indices[i:i + SEEK_BATCH] for i in range(0, len(indices), SEEK_BATCH)]
+    cmds = [build_seek_cmd(video_path, batch, fps, output_dir, video_stem) for batch in batches]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        list(pool.map(_run_checked, cmds))  # re-raises the first CalledProcessError
 
 
 # ── Extraction: interval-based ────────────────────────────────────────────────
 
-def extract_frames_interval_one(video_path, nb_frames, frame_interval, session_dir, allow_large=False, logger=None):
+def extract_frames_interval_one(video_path, nb_frames, frame_interval, session_dir, allow_large=False, logger=None,
+                                fps=None, sampling='auto'):
     """Pure single-video interval extraction, extracted 2026-07-28 from
     extract_frames_interval()'s inline loop body so djjtb-suite's backend can call the same
     code the CLI does (see djjtb-suite's CLAUDE.md 'Source of truth' section) -- same reasoning
@@ -243,11 +279,12 @@ def extract_frames_interval_one(video_path, nb_frames, frame_interval, session_d
 
     Does NOT prompt. If the estimated output would exceed 3000 images and `allow_large` is
     False, returns status "skipped_large" *without* running ffmpeg -- the CLI wrapper below
-    prompts interactively on that status and retries with allow_large=True if the user says
-    yes; djjtb-suite's backend treats it as a per-item skip (its "hard-skip with an optional
+    asks up front and passes allow_large=True if the user says yes; djjtb-suite's backend treats it as a per-item skip (its "hard-skip with an optional
     force checkbox" default, chosen deliberately over exposing the CLI's interactive prompt).
 
-    Returns a dict: {status: "success"|"skipped_large"|"error", output_dir, ...}.
+    `sampling` is 'auto', 'decode' or 'seek' (see choose_sampling); `fps` is needed to seek.
+
+    Returns a dict: {status: "success"|"skipped_large"|"error", output_dir, sampling, ...}.
     """
     video_name = video_path.stem
     output_dir = make_video_output_dir(session_dir, video_name)
@@ -262,24 +299,51 @@ def extract_frames_interval_one(video_path, nb_frames, frame_interval, session_d
     if total_images and total_images > 3000 and not allow_large:
         return {"status": "skipped_large", "output_dir": output_dir, "estimated_count": total_images}
 
+    indices = list(range(0, nb_frames, frame_interval)) if nb_frames else []
+    mode = choose_sampling(sampling, nb_frames, len(indices), fps) if indices else 'decode'
+
     cmd = [
         'ffmpeg', '-i', str(video_path),
-        '-vf', f'select=not(mod(n\\,{frame_interval}))',
-        '-vsync', '0', '-q:v', '2',
-        f'{output_dir}/{video_name}_tmp%04d.jpg'
+        '-vf', f'setpts=N+1,select=not(mod(n\\,{frame_interval}))',
+        *frame_output_args(output_dir, video_name)
     ]
 
     try:
-        subprocess.run(cmd, check=True, capture_output=True, text=True)
-        rename_frames_interval(output_dir, video_name, frame_interval, nb_frames)
-        extracted = len([f for f in os.listdir(output_dir) if f.endswith('.jpg')])
+        if mode == 'seek':
+            extract_frames_by_seeking(video_path, indices, fps, output_dir, video_name)
+        else:
+            subprocess.run(cmd, check=True, capture_output=True, text=True)
+        extracted = count_extracted(output_dir)
         if logger:
-            logger.info(f"Extracted {extracted} frames for {video_name} to {output_dir}")
-        return {"status": "success", "output_dir": output_dir, "extracted_count": extracted}
+            logger.info(f"Extracted {extracted} frames for {video_name} to {output_dir} ({mode})")
+        return {"status": "success", "output_dir": output_dir, "extracted_count": extracted, "sampling": mode}
     except subprocess.CalledProcessError as e:
         if logger:
             logger.error(f"Error processing {video_name}: {e.stderr}")
-        return {"status": "error", "output_dir": output_dir, "error": e.stderr}
+        return {"status": "error", "output_dir": output_dir, "error": e.stderr, "sampling": mode}
+
+
+def run_extractions(jobs, total):
+    """
+    Run extraction jobs on EXTRACT_WORKERS threads (each one waits on its own
+    ffmpeg process). jobs: [(video_name, fn, args, kwargs)]. Progress counts
+    finished videos; errors are printed as they come in.
+    """
+    if not jobs:
+        return
+    done = 0
+    with ThreadPoolExecutor(max_workers=EXTRACT_WORKERS) as pool:
+        futures = {pool.submit(fn, *args, **kwargs): video_name for video_name, fn, args, kwargs in jobs}
+        for future in as_completed(futures):
+            done += 1
+            result = future.result()
+            if result["status"] == "error":
+                sys.stdout.write(f"\r{' ' * 60}\r")
+                sys.stdout.flush()
+                print(f"\033[93mError processing {futures[future]}: {result['error']}\033[0m")
+            progress = (done / total) * 100
+            sys.stdout.write(f"\r\033[93mExtracting \033[0m{done}/{total} ({progress:.0f}%)...")
+            sys.stdout.flush()
 
 
 def extract_frames_interval(probe_results, frame_interval, logger):
@@ -287,55 +351,50 @@ def extract_frames_interval(probe_results, frame_interval, logger):
     Extract every Nth frame.
     Output: <video_parent>/Output/Frames_<interval>/<video_stem>/
     Files named by actual frame number: video_F0001.jpg, video_F0005.jpg...
+    Large-output confirmations are asked up front, then videos extract in parallel.
     """
     videos = [r['path'] for r in probe_results]
     session_name = f"Frames_{frame_interval}"
     session_map = resolve_session_dirs(videos, session_name)
     output_session_dirs = []
-    total = len(probe_results)
+    jobs = []
 
-    for i, r in enumerate(probe_results, 1):
+    for r in probe_results:
         video_path = r['path']
         video_name = video_path.stem
         nb_frames = r['nb_frames']
-        progress = (i / total) * 100
-        sys.stdout.write(f"\r\033[93mExtracting \033[0m{i}/{total} ({progress:.0f}%)...")
-        sys.stdout.flush()
-
         session_dir = session_map[video_path.parent]
+        output_session_dirs.append(session_dir)
 
-        result = extract_frames_interval_one(video_path, nb_frames, frame_interval, session_dir, allow_large=False, logger=logger)
-
-        if result["status"] == "skipped_large":
-            sys.stdout.write(f"\r{' ' * 60}\r")
-            sys.stdout.flush()
-            print(f"\n\033[93mWarning: ~{result['estimated_count']} images from {video_name}.\033[0m")
+        allow_large = False
+        estimated = int(nb_frames / frame_interval) if nb_frames else 0
+        if estimated > 3000:
+            print(f"\n\033[93mWarning: ~{estimated} images from {video_name}.\033[0m")
             proceed = djj.prompt_choice("\033[93mProceed?\033[0m\n1. Yes\n2. Skip", ['1', '2'], default='2')
-            if proceed == '1':
-                result = extract_frames_interval_one(video_path, nb_frames, frame_interval, session_dir, allow_large=True, logger=logger)
-            else:
+            if proceed != '1':
                 logger.info(f"Skipped {video_name} (user choice)")
-                output_session_dirs.append(session_dir)
                 continue
+            allow_large = True
 
-        if result["status"] == "error":
-            sys.stdout.write(f"\r{' ' * 60}\r")
-            sys.stdout.flush()
-            print(f"\033[93mError processing {video_name}: {result['error']}\033[0m")
-
-        output_session_dirs.append(session_dir)
+        jobs.append((video_name, extract_frames_interval_one,
+                     (video_path, nb_frames, frame_interval, session_dir),
+                     {'allow_large': allow_large, 'logger': logger, 'fps': r['fps']}))
 
+    run_extractions(jobs, len(jobs))
     return output_session_dirs
 
 
 # ── Extraction: target count — evenly spread ─────────────────────────────────
 
-def extract_frames_count_one(video_path, nb_frames, target_count, session_dir, logger=None):
+def extract_frames_count_one(video_path, nb_frames, target_count, session_dir, logger=None,
+                             fps=None, sampling='auto'):
     """Pure single-video target-count extraction, extracted 2026-07-28 -- same reasoning as
     extract_frames_interval_one() above. No interactive branch in this mode (unlike interval
     mode), so this one's a straight extraction, no allow_large equivalent needed.
 
-    Returns a dict: {status: "success"|"no_frame_count"|"error", output_dir, ...}.
+    `sampling` is 'auto', 'decode' or 'seek' (see choose_sampling); `fps` is needed to seek.
+
+    Returns a dict: {status: "success"|"no_frame_count"|"error", output_dir, sampling, ...}.
     """
     video_name = video_path.stem
     output_dir = make_video_output_dir(session_dir, video_name)
@@ -352,26 +411,30 @@ def extract_frames_count_one(video_path, nb_frames, target_count, session_dir, l
         step = (nb_frames - 1) / (actual_count - 1)
         indices = [round(step * j) for j in range(actual_count)]
 
+    mode = choose_sampling(sampling, nb_frames, len(indices), fps)
     select_expr = "+".join(f"eq(n\\,{idx})" for idx in indices)
 
     cmd = [
         'ffmpeg', '-i', str(video_path),
-        '-vf', f'select={select_expr}',
-        '-vsync', '0', '-q:v', '2',
-        f'{output_dir}/{video_name}_tmp%04d.jpg'
+        '-vf', f'setpts=N+1,select={select_expr}',
+        *frame_output_args(output_dir, video_name)
     ]
 
     try:
-        subprocess.run(cmd, check=True, capture_output=True, text=True)
-        rename_frames_count(output_dir, video_name, indices)
-        extracted = len([f for f in os.listdir(output_dir) if f.endswith('.jpg')])
+        if mode == 'seek':
+            extract_frames_by_seeking(video_path, indices, fps, output_dir, video_name)
+        else:
+            subprocess.run(cmd, check=True, capture_output=True, text=True)
+        extracted = count_extracted(output_dir)
         if logger:
-            logger.info(f"Extracted {extracted}/{actual_count} frames for {video_name} to {output_dir}")
-        return {"status": "success", "output_dir": output_dir, "extracted_count": extracted, "actual_count": actual_count}
+            logger.info(f"Extracted {extracted}/{actual_count} frames for {video_name} to {output_dir} ({mode})")
+        return {"status": "success", "output_dir": output_dir, "extracted_count": extracted,
+                "actual_count": actual_count, "sampling": mode}
     except subprocess.CalledProcessError as e:
         if logger:
             logger.error(f"Error processing {video_name}: {e.stderr}")
-        return {"status": "error", "output_dir": output_dir, "error": e.stderr, "actual_count": actual_count}
+        return {"status": "error", "output_dir": output_dir, "error": e.stderr,
+                "actual_count": actual_count, "sampling": mode}
 
 
 def extract_frames_count(probe_results, target_count, logger):
@@ -384,39 +447,29 @@ def extract_frames_count(probe_results, target_count, logger):
     session_name = f"Frames_{target_count}x"
     session_map = resolve_session_dirs(videos, session_name)
     output_session_dirs = []
-    total = len(probe_results)
+    jobs = []
 
-    for i, r in enumerate(probe_results, 1):
+    for r in probe_results:
         video_path = r['path']
         video_name = video_path.stem
         nb_frames = r['nb_frames']
-        progress = (i / total) * 100
-        sys.stdout.write(f"\r\033[93mExtracting \033[0m{i}/{total} ({progress:.0f}%)...")
-        sys.stdout.flush()
-
         session_dir = session_map[video_path.parent]
 
         if nb_frames == 0:
-            sys.stdout.write(f"\r{' ' * 60}\r")
             print(f"\033[93m❌ Could not get frame count for {video_name}, skipping.\033[0m")
             logger.error(f"Could not get frame count for {video_name}")
             continue
 
         actual_count = min(target_count, nb_frames)
         if actual_count < target_count:
-            sys.stdout.write(f"\r{' ' * 60}\r")
             print(f"\033[93m⚠️  {video_name}: only {nb_frames} frames, extracting {actual_count}.\033[0m")
-            sys.stdout.flush()
-
-        result = extract_frames_count_one(video_path, nb_frames, target_count, session_dir, logger=logger)
-
-        if result["status"] == "error":
-            sys.stdout.write(f"\r{' ' * 60}\r")
-            sys.stdout.flush()
-            print(f"\033[93mError processing {video_name}: {result['error']}\033[0m")
 
+        jobs.append((video_name, extract_frames_count_one,
+                     (video_path, nb_frames, target_count, session_dir),
+                     {'logger': logger, 'fps': r['fps']}))
         output_session_dirs.append(session_dir)
 
+    run_extractions(jobs, len(jobs))
     return output_session_dirs
 
 
@@ -553,35 +606,17 @@ def collect_subfolders_with_images(parent_path):
 
 
 def get_image_dimensions(image_path):
-    """Get width x height from first valid image using ffprobe."""
+    """Get width x height of an image from its header."""
     try:
-        cmd = [
-            "ffprobe", "-v", "error",
-            "-select_streams", "v:0",
-            "-show_entries", "stream=width,height",
-            "-of", "csv=s=x:p=0",
-            image_path
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        w, h = map(int, result.stdout.strip().split('x'))
-        return w, h
+        return djj.get_image_size(image_path)
     except Exception:
         return None
 
 
 def get_audio_duration(path):
-    """Get duration of an audio/video file in seconds using ffprobe."""
-    try:
-        cmd = [
-            "ffprobe", "-v", "error",
-            "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            path
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        return float(result.stdout.strip())
-    except Exception:
-        return None
+    """Get duration of an audio/video file in seconds (cached ffprobe)."""
+    info = djj.probe_media(path)
+    return info['duration'] if info else None
 
 
 def compile_images_to_video(images, fps, audio_mode, audio_ref_path, output_file):
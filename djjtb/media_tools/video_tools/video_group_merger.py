@@ -8,6 +8,17 @@ import djjtb.utils as djj
 
 os.system('clear')
 
+# ─── Encoding Config ──────────────────────────────────────────────────────────
+VIDEO_ENCODE_ARGS = ["-c:v", "h264_videotoolbox", "-b:v", "8M"]
+AUDIO_ENCODE_ARGS = ["-c:a", "aac", "-b:a", "128k"]
+OUTPUT_FPS = 30
+BG_BLUR_SIGMA = 8
+BG_OPACITY = 0.7
+
+# Groups up to this many clips are normalized + concatenated in one filtergraph
+# (one encode per group); bigger ones normalize clip by clip, then stream-copy concat
+FUSED_MAX_INPUTS = 16
+
 # ─── Helpers ─────────────────────────────────────────────────────────────────
 
 def clean_path(path_str):
@@ -54,21 +65,11 @@ def get_user_group_count():
 # ─── Video Info ───────────────────────────────────────────────────────────────
 
 def get_video_info(video_path):
-    cmd = [
-        "ffprobe", "-v", "quiet", "-select_streams", "v:0",
-        "-show_entries", "stream=codec_name,width,height,r_frame_rate",
-        "-of", "csv=p=0", video_path
-    ]
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        parts = result.stdout.strip().split(',')
-        codec = parts[0] if len(parts) > 0 else "unknown"
-        width = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 0
-        height = int(parts[2]) if len(parts) > 2 and parts[2].isdigit() else 0
-        fps = parts[3] if len(parts) > 3 else "30/1"
-        return codec, width, height, fps
-    except Exception:
+    info = djj.probe_media(video_path)
+    if not info:
         return "unknown", 0, 0, "30/1"
+    return (info['codec'] or "unknown", info['width'] or 0, info['height'] or 0,
+            info['r_frame_rate'] or "30/1")
 
 # ─── Sizing ───────────────────────────────────────────────────────────────────
 
@@ -146,89 +147,139 @@ def will_need_padding_after_crop(crop_aspect, width, height, target_width, targe
     target_ratio = target_width / target_height
     return abs(crop_ratio - target_ratio) > 0.05
 
-def create_background_video(video_path, output_path, target_width, target_height, opacity=0.7, blur_radius=8):
-    temp_bg_video = os.path.join(os.path.dirname(output_path), f"temp_bg_{os.path.basename(output_path)}")
-    bg_cmd = [
-        "ffmpeg", "-y", "-i", video_path,
-        "-vf", f"scale={target_width}:{target_height}:force_original_aspect_ratio=increase,"
-               f"crop={target_width}:{target_height},"
-               f"gblur=sigma={blur_radius},"
-               f"eq=brightness=-{1-opacity}",
-        "-c:v", "h264_videotoolbox", "-b:v", "8M", "-pix_fmt", "yuv420p",
-        "-an", temp_bg_video
-    ]
-    result = subprocess.run(bg_cmd, capture_output=True, text=True)
-    return temp_bg_video if result.returncode == 0 else None
-
-def _bg_overlay_cmd(bg_video, video, target_width, target_height, temp_output):
-    """Composite the (scaled) source video over its blurred background."""
-    return [
-        "ffmpeg", "-y", "-i", bg_video, "-i", video,
-        "-filter_complex",
-        f"[1:v]scale='if(gt(iw/ih,{target_width}/{target_height}),{target_width},-2)':'if(gt(iw/ih,{target_width}/{target_height}),-2,{target_height})'[scaled];"
-        f"[0:v][scaled]overlay=(W-w)/2:(H-h)/2[outv]",
-        "-map", "[outv]", "-map", "1:a?",
-        "-c:v", "h264_videotoolbox", "-b:v", "8M",
-        "-c:a", "aac", "-b:a", "128k", "-r", "30", "-pix_fmt", "yuv420p",
-        temp_output
-    ]
-
-def _crop_scale_cmd(video, crop_filter, target_width, target_height, temp_output):
-    return [
-        "ffmpeg", "-y", "-i", video,
-        "-vf", f"{crop_filter},scale={target_width}:{target_height}",
-        "-c:v", "h264_videotoolbox", "-b:v", "8M",
-        "-c:a", "aac", "-b:a", "128k", "-r", "30", "-pix_fmt", "yuv420p",
-        temp_output
-    ]
-
-def _scale_pad_cmd(video, target_width, target_height, temp_output):
-    return [
-        "ffmpeg", "-y", "-i", video,
-        "-vf", f"scale='if(gt(iw/ih,{target_width}/{target_height}),{target_width},-2)':'if(gt(iw/ih,{target_width}/{target_height}),-2,{target_height})',"
-               f"pad={target_width}:{target_height}:({target_width}-iw)/2:({target_height}-ih)/2:color=black",
-        "-c:v", "h264_videotoolbox", "-b:v", "8M",
-        "-c:a", "aac", "-b:a", "128k", "-r", "30", "-pix_fmt", "yuv420p",
-        temp_output
-    ]
+def _fit_scale(target_width, target_height):
+    """Scale to fit inside the target box, keeping aspect (even dims)."""
+    return (f"scale='if(gt(iw/ih,{target_width}/{target_height}),{target_width},-2)'"
+            f":'if(gt(iw/ih,{target_width}/{target_height}),-2,{target_height})'")
 
-def process_video_for_sizing(video, sizing_method, crop_aspect, target_width, target_height, temp_output, output_dir):
-    """Re-encode a single video to match target dimensions/method."""
+def build_clip_filter(video, index, sizing_method, crop_aspect, target_width, target_height, out_label):
+    """
+    filter_complex chain taking input [index:v] to [out_label] at the target
+    size, OUTPUT_FPS and yuv420p. Blur backgrounds are composited in the same
+    graph: split -> (scale/crop/gblur/eq) + (fit scale) -> overlay.
+    """
     _, curr_width, curr_height, _ = get_video_info(video)
-    bg_video = None
+    tail = f"fps={OUTPUT_FPS},format=yuv420p,setsar=1"
 
+    use_blur = sizing_method.endswith('_blur')
     if sizing_method == 'crop':
-        needs_padding = will_need_padding_after_crop(crop_aspect, curr_width, curr_height, target_width, target_height)
-        if needs_padding:
-            bg_video = create_background_video(video, temp_output, target_width, target_height)
-        if bg_video:
-            cmd = _bg_overlay_cmd(bg_video, video, target_width, target_height, temp_output)
-        else:
+        use_blur = will_need_padding_after_crop(crop_aspect, curr_width, curr_height, target_width, target_height)
+        if not use_blur:
             crop_filter, _, _ = build_crop_filter(crop_aspect, curr_width, curr_height)
-            cmd = _crop_scale_cmd(video, crop_filter, target_width, target_height, temp_output)
+            return f"[{index}:v]{crop_filter},scale={target_width}:{target_height},{tail}[{out_label}]"
+
+    if use_blur:
+        brightness = round(-(1 - BG_OPACITY), 3)
+        return (
+            f"[{index}:v]split[bgsrc{index}][fgsrc{index}];"
+            f"[bgsrc{index}]scale={target_width}:{target_height}:force_original_aspect_ratio=increase,"
+            f"crop={target_width}:{target_height},gblur=sigma={BG_BLUR_SIGMA},eq=brightness={brightness}[bg{index}];"
+            f"[fgsrc{index}]{_fit_scale(target_width, target_height)}[fg{index}];"
+            f"[bg{index}][fg{index}]overlay=(W-w)/2:(H-h)/2,{tail}[{out_label}]"
+        )
 
-    elif sizing_method.endswith('_blur'):
-        bg_video = create_background_video(video, temp_output, target_width, target_height)
-        if bg_video:
-            cmd = _bg_overlay_cmd(bg_video, video, target_width, target_height, temp_output)
-        else:
-            cmd = _scale_pad_cmd(video, target_width, target_height, temp_output)
-    else:  # _pad
-        cmd = _scale_pad_cmd(video, target_width, target_height, temp_output)
+    return (f"[{index}:v]{_fit_scale(target_width, target_height)},"
+            f"pad={target_width}:{target_height}:({target_width}-iw)/2:({target_height}-ih)/2:color=black,"
+            f"{tail}[{out_label}]")
 
+def process_video_for_sizing(video, sizing_method, crop_aspect, target_width, target_height, temp_output, output_dir):
+    """Re-encode a single video to match target dimensions/method (one decode, one encode)."""
+    cmd = [
+        "ffmpeg", "-y", "-i", video,
+        "-filter_complex", build_clip_filter(video, 0, sizing_method, crop_aspect, target_width, target_height, "outv"),
+        "-map", "[outv]", "-map", "0:a?",
+        *VIDEO_ENCODE_ARGS, *AUDIO_ENCODE_ARGS, "-r", str(OUTPUT_FPS), "-pix_fmt", "yuv420p",
+        temp_output
+    ]
     result = subprocess.run(cmd, capture_output=True, text=True)
+    return result.returncode == 0, result.stderr
 
-    if bg_video and os.path.exists(bg_video):
-        os.remove(bg_video)
+def build_fused_merge_cmd(videos, output_file, sizing_method, crop_aspect, target_width, target_height):
+    """
+    One ffmpeg call for a whole group: every clip is normalized inside one
+    filter_complex and fed straight into concat, so the group is encoded once.
+    Clips without audio get a silent track of their own length when any clip has audio.
+    """
+    infos = [djj.probe_media(v) or {} for v in videos]
+    any_audio = any(info.get('has_audio') for info in infos)
+
+    graph = []
+    concat_inputs = []
+    for i, (video, info) in enumerate(zip(videos, infos)):
+        graph.append(build_clip_filter(video, i, sizing_method, crop_aspect, target_width, target_height, f"v{i}"))
+        concat_inputs.append(f"[v{i}]")
+        if any_audio:
+            if info.get('has_audio'):
+                graph.append(f"[{i}:a]aresample=48000,aformat=channel_layouts=stereo,asetpts=PTS-STARTPTS[a{i}]")
+            else:
+                duration = info.get('duration') or 0.1
+                graph.append(f"anullsrc=r=48000:cl=stereo,atrim=duration={duration}[a{i}]")
+            concat_inputs.append(f"[a{i}]")
 
-    return result.returncode == 0, result.stderr
+    graph.append(f"{''.join(concat_inputs)}concat=n={len(videos)}:v=1:a={1 if any_audio else 0}"
+                 f"[outv]{'[outa]' if any_audio else ''}")
+
+    cmd = ["ffmpeg", "-y"]
+    for video in videos:
+        cmd += ["-i", video]
+    cmd += ["-filter_complex", ";".join(graph), "-map", "[outv]"]
+    if any_audio:
+        cmd += ["-map", "[outa]", *AUDIO_ENCODE_ARGS]
+    cmd += [*VIDEO_ENCODE_ARGS, "-r", str(OUTPUT_FPS), "-pix_fmt", "yuv420p", output_file]
+    return cmd
 
 
 # ─── Core Merge ───────────────────────────────────────────────────────────────
 
-def merge_videos_to_file(videos, output_file, sizing_method, crop_aspect, target_width, target_height, use_reencode=True, label=""):
+def _normalize_clips(videos, temp_outputs, sizing_method, crop_aspect, target_width, target_height,
+                     output_dir, label, scheduler, show_progress):
+    """
+    Run process_video_for_sizing for every clip, concurrently on the scheduler
+    when one is given. Returns (failed_video_or_None, err); stops at the first
+    failure in clip order, like the serial loop.
+    """
+    def progress(done, video):
+        if show_progress:
+            sys.stdout.write(f"\r\033[93m  {label}Processing {done}/{len(videos)}: {os.path.basename(video)}\033[0m  ")
+            sys.stdout.flush()
+
+    if scheduler is None:
+        for i, (video, temp_out) in enumerate(zip(videos, temp_outputs)):
+            progress(i + 1, video)
+            ok, err = process_video_for_sizing(video, sizing_method, crop_aspect,
+                                               target_width, target_height, temp_out, output_dir)
+            if not ok:
+                return video, err
+        return None, ""
+
+    futures = [
+        scheduler.submit(VIDEO_ENCODE_ARGS[1], process_video_for_sizing, video, sizing_method, crop_aspect,
+                         target_width, target_height, temp_out, output_dir)
+        for video, temp_out in zip(videos, temp_outputs)
+    ]
+    failure = None
+    for i, (video, future) in enumerate(zip(videos, futures)):
+        ok, err = future.result()
+        progress(i + 1, video)
+        if not ok and failure is None:
+            failure = (video, err)
+            for pending in futures[i + 1:]:
+                pending.cancel()
+    # Let anything already running finish before the caller deletes temp files
+    for future in futures:
+        if not future.cancelled():
+            try:
+                future.result()
+            except Exception:
+                pass
+    return failure if failure else (None, "")
+
+def merge_videos_to_file(videos, output_file, sizing_method, crop_aspect, target_width, target_height, use_reencode=True, label="",
+                         scheduler=None, show_progress=True):
     """
     Merge a list of videos into a single output file.
+    With a scheduler (djj.EncodeScheduler), clip normalization runs concurrently
+    and the concat starts as soon as every segment is ready.
     Returns (success: bool, error: str)
     """
     output_dir = os.path.dirname(output_file)
@@ -236,26 +287,37 @@ def merge_videos_to_file(videos, output_file, sizing_method, crop_aspect, target
     temp_videos = []
     concat_file = None
 
+    if sizing_method != 'simple' and len(videos) <= FUSED_MAX_INPUTS:
+        if show_progress:
+            sys.stdout.write(f"\r\033[93m  {label}Encoding {len(videos)} clips in one pass\033[0m  ")
+            sys.stdout.flush()
+        cmd = build_fused_merge_cmd(videos, output_file, sizing_method, crop_aspect, target_width, target_height)
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if show_progress:
+            print()
+        if result.returncode == 0:
+            return True, ""
+        # Fall through to clip-by-clip normalization (e.g. a clip the fused graph can't take)
+
     try:
         with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
             concat_file = f.name
             needs_processing = sizing_method != 'simple'
 
             if needs_processing:
-                for i, video in enumerate(videos):
-                    sys.stdout.write(f"\r\033[93m  {label}Processing {i+1}/{len(videos)}: {os.path.basename(video)}\033[0m  ")
-                    sys.stdout.flush()
-                    temp_out = os.path.join(output_dir, f"_temp_{i}_{os.path.basename(output_file)}")
-                    temp_videos.append(temp_out)
-                    ok, err = process_video_for_sizing(
-                        video, sizing_method, crop_aspect,
-                        target_width, target_height, temp_out, output_dir
-                    )
-                    if not ok:
-                        print(f"\n\033[91m❌ Failed to process: {os.path.basename(video)}\033[0m")
-                        return False, err
+                temp_videos = [os.path.join(output_dir, f"_temp_{i}_{os.path.basename(output_file)}")
+                               for i in range(len(videos))]
+                failed_video, err = _normalize_clips(
+                    videos, temp_videos, sizing_method, crop_aspect,
+                    target_width, target_height, output_dir, label, scheduler, show_progress
+                )
+                if failed_video:
+                    print(f"\n\033[91m❌ Failed to process: {os.path.basename(failed_video)}\033[0m")
+                    return False, err
+                for temp_out in temp_videos:
                     f.write(f"file '{temp_out}'\n")
-                print()
+                if show_progress:
+                    print()
             else:
                 for video in videos:
                     escaped = video.replace("'", "'\\''")
@@ -264,8 +326,7 @@ def merge_videos_to_file(videos, output_file, sizing_method, crop_aspect, target
         if use_reencode:
             cmd = [
                 "ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", concat_file,
-                "-c:v", "h264_videotoolbox", "-b:v", "8M",
-                "-c:a", "aac", "-b:a", "128k", "-r", "30", "-pix_fmt", "yuv420p",
+                *VIDEO_ENCODE_ARGS, *AUDIO_ENCODE_ARGS, "-r", str(OUTPUT_FPS), "-pix_fmt", "yuv420p",
                 output_file
             ]
         else:
@@ -286,6 +347,33 @@ def merge_videos_to_file(videos, output_file, sizing_method, crop_aspect, target
             os.remove(concat_file)
 
 
+def run_merges_in_order(jobs, scheduler, on_start=None):
+    """
+    Run merge_videos_to_file for every job (a dict of its keyword arguments)
+    and yield (ok, err) in job order. Groups that fit one fused filtergraph are
+    whole encode jobs on the scheduler and run side by side; bigger groups run
+    from this thread with their clips spread over the scheduler instead.
+    on_start(index) is called just before each job's result is awaited, so
+    headers still print ahead of that job's own progress line.
+    """
+    queued = []
+    for job in jobs:
+        if job['sizing_method'] != 'simple' and len(job['videos']) <= FUSED_MAX_INPUTS:
+            queued.append(scheduler.submit(VIDEO_ENCODE_ARGS[1], merge_videos_to_file, show_progress=False, **job))
+        else:
+            queued.append(job)
+    for i, item in enumerate(queued):
+        if on_start:
+            on_start(i)
+        try:
+            if isinstance(item, dict):
+                yield merge_videos_to_file(scheduler=scheduler, **item)
+            else:
+                yield item.result()
+        except Exception as e:
+            yield False, str(e)
+
+
 # ─── Simple Merge Modes ───────────────────────────────────────────────────────
 
 def simple_merge_single(videos, output_dir, sizing_method, crop_aspect, target_width, target_height):
@@ -296,7 +384,9 @@ def simple_merge_single(videos, output_dir, sizing_method, crop_aspect, target_w
     print(f"\n\033[1;93mMerging {len(videos)} videos into one...\033[0m")
     print("-------------")
 
-    ok, err = merge_videos_to_file(videos, output_file, sizing_method, crop_aspect, target_width, target_height)
+    with djj.EncodeScheduler() as scheduler:
+        ok, err = merge_videos_to_file(videos, output_file, sizing_method, crop_aspect, target_width, target_height,
+                                       scheduler=scheduler)
     if ok:
         print(f"\033[92m✅ Created: {os.path.basename(output_file)}\033[0m")
         return 1, 0
@@ -320,28 +410,32 @@ def simple_merge_per_folder(subfolder_groups, output_dir, sizing_method, crop_as
     print(f"\n\033[1;93mMerging {len(subfolder_groups)} folder(s) → one video each...\033[0m")
     print("-------------")
 
-    for idx, (subfolder_path, videos) in enumerate(subfolder_groups.items(), 1):
+    jobs = []
+    for subfolder_path, videos in subfolder_groups.items():
         sf_name = os.path.basename(subfolder_path)
-        print(f"\n\033[93m[{idx}/{len(subfolder_groups)}] {sf_name}\033[0m  ({len(videos)} videos)")
-
         if per_folder_sizing:
             _, target_width, target_height, _ = get_video_info(videos[0])
-
-        output_file = os.path.join(output_dir, f"{sf_name}_merged.mp4")
-
-        ok, err = merge_videos_to_file(
-            videos, output_file, sizing_method, crop_aspect,
-            target_width, target_height, label=f"{sf_name} "
-        )
-        if ok:
-            print(f"   \033[92m✅ {os.path.basename(output_file)}\033[0m")
-            success_count += 1
-        else:
-            print(f"   \033[91m❌ Failed\033[0m")
-            if err:
-                for line in [l for l in err.strip().split('\n') if l.strip()][-2:]:
-                    print(f"      \033[93m{line}\033[0m")
-            error_count += 1
+        jobs.append(dict(
+            videos=videos, output_file=os.path.join(output_dir, f"{sf_name}_merged.mp4"),
+            sizing_method=sizing_method, crop_aspect=crop_aspect,
+            target_width=target_width, target_height=target_height, label=f"{sf_name} "
+        ))
+
+    def announce(i):
+        job = jobs[i]
+        print(f"\n\033[93m[{i + 1}/{len(subfolder_groups)}] {job['label'].strip()}\033[0m  ({len(job['videos'])} videos)")
+
+    with djj.EncodeScheduler() as scheduler:
+        for job, (ok, err) in zip(jobs, run_merges_in_order(jobs, scheduler, on_start=announce)):
+            if ok:
+                print(f"   \033[92m✅ {os.path.basename(job['output_file'])}\033[0m")
+                success_count += 1
+            else:
+                print(f"   \033[91m❌ Failed\033[0m")
+                if err:
+                    for line in [l for l in err.strip().split('\n') if l.strip()][-2:]:
+                        print(f"      \033[93m{line}\033[0m")
+                error_count += 1
 
     return success_count, error_count
 
@@ -379,30 +473,35 @@ def group_merge_videos(groups, output_dir, use_reencode, sizing_method, crop_asp
     success_count = 0
     error_count = 0
 
-    for g, group_videos in enumerate(groups, 1):
-        if not group_videos:
-            continue
+    numbered = [(g, group_videos) for g, group_videos in enumerate(groups, 1) if group_videos]
+    jobs = []
+    for g, group_videos in numbered:
         base_name = os.path.splitext(os.path.basename(group_videos[0]))[0]
-        output_file = os.path.join(output_dir, f"{label_prefix}{base_name}_group_{g:03d}.mp4")
-
+        jobs.append(dict(
+            videos=group_videos,
+            output_file=os.path.join(output_dir, f"{label_prefix}{base_name}_group_{g:03d}.mp4"),
+            sizing_method=sizing_method, crop_aspect=crop_aspect,
+            target_width=target_width, target_height=target_height, use_reencode=use_reencode
+        ))
+
+    def announce(i):
+        g, group_videos = numbered[i]
         preview = ' + '.join(os.path.basename(v) for v in group_videos[:2])
         if len(group_videos) > 2:
             preview += '...'
         print(f"\033[93m  Group {g}/{total_groups}:\033[0m ({len(group_videos)} videos) {preview}")
 
-        ok, err = merge_videos_to_file(
-            group_videos, output_file, sizing_method, crop_aspect,
-            target_width, target_height, use_reencode=use_reencode
-        )
-        if ok:
-            print(f"   \033[92m✅ {os.path.basename(output_file)}\033[0m")
-            success_count += 1
-        else:
-            print(f"   \033[91m❌ Failed\033[0m")
-            if err:
-                for line in [l for l in err.strip().split('\n') if l.strip()][-2:]:
-                    print(f"      \033[93m{line}\033[0m")
-            error_count += 1
+    with djj.EncodeScheduler() as scheduler:
+        for job, (ok, err) in zip(jobs, run_merges_in_order(jobs, scheduler, on_start=announce)):
+            if ok:
+                print(f"   \033[92m✅ {os.path.basename(job['output_file'])}\033[0m")
+                success_count += 1
+            else:
+                print(f"   \033[91m❌ Failed\033[0m")
+                if err:
+                    for line in [l for l in err.strip().split('\n') if l.strip()][-2:]:
+                        print(f"      \033[93m{line}\033[0m")
+                error_count += 1
 
     return success_count, error_count
 
@@ -180,24 +180,29 @@ def run_reencode(videos):
     successful = 0
     logger = get_op_logger("reencode")
 
-    for i, video_path in enumerate(videos, 1):
-        progress = (i / total) * 100
-        sys.stdout.write(f"\033[93m\rProcessing \033[0m{i}/{total} ({progress:.1f}%)...")
-        sys.stdout.flush()
+    # Jobs run side by side in the scheduler's encoder slots; results are
+    # still collected (and reported) in input order.
+    with djj.EncodeScheduler() as scheduler:
+        futures = [scheduler.submit(codec, reencode_one, video_path, codec, crf, suffix, tag, audio_choice, logger)
+                   for video_path in videos]
+        for i, (video_path, future) in enumerate(zip(videos, futures), 1):
+            progress = (i / total) * 100
+            sys.stdout.write(f"\033[93m\rProcessing \033[0m{i}/{total} ({progress:.1f}%)...")
+            sys.stdout.flush()
 
-        try:
-            out_dir, output = reencode_one(video_path, codec, crf, suffix, tag, audio_choice, logger)
-            successful += 1
-        except subprocess.CalledProcessError as e:
-            out_dir = video_path.parent / "Output" / "Reencoded"
-            logger.error(f"Error re-encoding {video_path.name}: {e.stderr}")
-            print(f"\n\033[93mError re-encoding {video_path.name}: {e.stderr}\033[0m")
+            try:
+                out_dir, output = future.result()
+                successful += 1
+            except subprocess.CalledProcessError as e:
+                out_dir = video_path.parent / "Output" / "Reencoded"
+                logger.error(f"Error re-encoding {video_path.name}: {e.stderr}")
+                print(f"\n\033[93mError re-encoding {video_path.name}: {e.stderr}\033[0m")
 
-        if out_dir not in output_base_dirs:
-            output_base_dirs.append(out_dir)
+            if out_dir not in output_base_dirs:
+                output_base_dirs.append(out_dir)
 
-        sys.stdout.write("\r" + " " * 60 + "\r")
-        sys.stdout.flush()
+            sys.stdout.write("\r" + " " * 60 + "\r")
+            sys.stdout.flush()
 
     summary = f"Re-encoded {successful} of {total} videos successfully"
     logger.info(summary)
@@ -355,19 +360,10 @@ def get_cropdetect_crop(video_path):
 
 
 def get_video_resolution(video_path):
-    cmd = [
-        "ffprobe", "-v", "error",
-        "-select_streams", "v:0",
-        "-show_entries", "stream=width,height",
-        "-of", "csv=p=0",
-        str(video_path)
-    ]
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        w, h = map(int, result.stdout.strip().split(","))
-        return w, h
-    except Exception:
+    info = djj.probe_media(video_path)
+    if not info or not info['width'] or not info['height']:
         return None, None
+    return info['width'], info['height']
 
 
 def build_crop_filter(mode, width, height):
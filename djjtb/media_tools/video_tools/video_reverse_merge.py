@@ -10,6 +10,8 @@ VIDEO_BITRATE = '15000k'             # Used with h264_videotoolbox only
 VIDEO_CRF = '18'                     # Used with libx264 only
 VIDEO_PRESET = 'fast'                # Used with libx264 only
 
+TRIM_START_FRAMES = 3                # Dropped from the head of the merged clip
+
 def is_video_file(filename):
     return filename.lower().endswith(djj.VIDEO_EXTENSIONS)
 
@@ -20,34 +22,14 @@ def run_ffmpeg(cmd):
         raise RuntimeError(f"FFmpeg failed for command: {' '.join(cmd)}")
 
 def get_video_fps(video_path):
-    """Get fps from video file via ffprobe."""
-    try:
-        result = subprocess.run(
-            ["ffprobe", "-v", "error", "-select_streams", "v:0",
-             "-show_entries", "stream=r_frame_rate",
-             "-of", "default=noprint_wrappers=1:nokey=1",
-             str(video_path)],
-            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
-        )
-        fps_raw = result.stdout.strip()
-        if '/' in fps_raw:
-            num, den = fps_raw.split('/')
-            return round(int(num) / int(den), 3)
-        return float(fps_raw)
-    except Exception:
-        return 30
+    """Get fps from video file via the cached ffprobe layer."""
+    info = djj.probe_media(video_path)
+    return info['fps'] if info and info['fps'] else 30
 
 def get_duration(video_path):
-    """Get video duration in seconds via ffprobe."""
-    try:
-        result = subprocess.run(
-            ["ffprobe", "-v", "error", "-show_entries", "format=duration",
-             "-of", "default=noprint_wrappers=1:nokey=1", str(video_path)],
-            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
-        )
-        return float(result.stdout.strip())
-    except Exception:
-        return 0.0
+    """Get video duration in seconds via the cached ffprobe layer."""
+    info = djj.probe_media(video_path)
+    return info['duration'] if info and info['duration'] else 0.0
 
 def encoder_flags(encoder):
     """Return quality flags for the chosen encoder."""
@@ -73,7 +55,91 @@ def get_atempo_chain(speed):
     return ",".join(filters)
 
 
-def reverse_and_merge(video_path, index, total, speed_factor, input_base, encoder, audio_choice):
+def merged_duration(source_duration, fps, speed_factor):
+    """Expected length of original + (speed-adjusted) reverse, minus the trimmed head frames."""
+    reversed_duration = source_duration / speed_factor if speed_factor else source_duration
+    return round(source_duration + reversed_duration - round(TRIM_START_FRAMES / fps, 6), 6)
+
+
+def build_single_pass_cmd(video_path, output_file, fps, clean_duration, speed_factor,
+                          encoder, audio_choice, has_audio):
+    """
+    One ffmpeg call: split the decoded input, reverse one branch, concat
+    original + reversed and drop the head frames, all inside filter_complex.
+    Mirrors the four-step path filter for filter.
+    """
+    reverse_chain = "reverse,select='gt(n,0)',setpts=PTS-STARTPTS"
+    if speed_factor and speed_factor != 1.0:
+        reverse_chain += f",setpts={1/speed_factor}*PTS,fps={fps}"
+
+    keep_audio = audio_choice == '1' and has_audio
+    graph = [f"[0:v]fps={fps},setpts=PTS-STARTPTS,split[fwd][rev_in]",
+             f"[rev_in]{reverse_chain}[rev]"]
+    if keep_audio:
+        areverse_chain = "areverse"
+        atempo_chain = get_atempo_chain(speed_factor) if speed_factor else ""
+        if atempo_chain:
+            areverse_chain += f",{atempo_chain}"
+        graph += ["[0:a]asetpts=PTS-STARTPTS,asplit[afwd][arev_in]",
+                  f"[arev_in]{areverse_chain}[arev]",
+                  "[fwd][afwd][rev][arev]concat=n=2:v=1:a=1[vcat][acat]",
+                  f"[acat]aselect=gte(n\\,{TRIM_START_FRAMES}),asetpts=PTS-STARTPTS[aout]"]
+    else:
+        graph.append("[fwd][rev]concat=n=2:v=1:a=0[vcat]")
+    graph.append(f"[vcat]select=gte(n\\,{TRIM_START_FRAMES}),setpts=PTS-STARTPTS[vout]")
+
+    cmd = ['ffmpeg', '-y', '-i', str(video_path)]
+    if audio_choice == '3':
+        cmd += ['-f', 'lavfi', '-i', 'anullsrc=channel_layout=stereo:sample_rate=48000']
+    cmd += ['-filter_complex', ";".join(graph), '-map', '[vout]']
+    if keep_audio:
+        cmd += ['-map', '[aout]', '-c:a', 'aac']
+    elif audio_choice == '3':
+        cmd += ['-map', '1:a:0', '-c:a', 'aac', '-shortest']
+    else:
+        cmd += ['-an']
+    cmd += ['-t', str(clean_duration), '-c:v', encoder, *encoder_flags(encoder),
+            '-r', str(fps), str(output_file)]
+    return cmd
+
+
+def reverse_and_merge_single_pass(video_path, speed_factor, encoder, audio_choice):
+    """Single decode + single encode, no intermediate files. Returns the merged file."""
+    folder, filename = os.path.split(video_path)
+    name, ext = os.path.splitext(filename)
+    info = djj.probe_media(video_path) or {}
+    fps = info.get('fps') or 30
+    source_duration = info.get('duration') or 0.0
+
+    merged_dir = Path(folder) / "Output" / "Merge"
+    merged_dir.mkdir(parents=True, exist_ok=True)
+    merged_file = merged_dir / f"{name}_merged{ext.lower()}"
+
+    run_ffmpeg(build_single_pass_cmd(
+        video_path, merged_file, fps, merged_duration(source_duration, fps, speed_factor),
+        speed_factor, encoder, audio_choice, info.get('has_audio', False)
+    ))
+    if not merged_file.exists() or merged_file.stat().st_size == 0:
+        raise RuntimeError(f"Failed to create merged file: {merged_file}")
+    return merged_file
+
+
+def reverse_and_merge(video_path, index, total, speed_factor, input_base, encoder, audio_choice,
+                      single_pass=True):
+    """Single-pass filtergraph by default; the four-step path is the fallback."""
+    if single_pass:
+        try:
+            reverse_and_merge_single_pass(video_path, speed_factor, encoder, audio_choice)
+            return
+        except RuntimeError as e:
+            # Own line: the caller's progress line is \r-rewritten
+            print(f"\n\033[93m⚠️  Single-pass failed for\033[0m {os.path.basename(video_path)}"
+                  f"\033[93m, falling back to four-step:\033[0m {e}")
+    reverse_and_merge_four_step(video_path, index, total, speed_factor, input_base, encoder, audio_choice)
+
+
+def reverse_and_merge_four_step(video_path, index, total, speed_factor, input_base, encoder, audio_choice):
+    """Reverse, normalize, concat and trim as four separate encodes via Output/Reversed."""
     folder, filename = os.path.split(video_path)
     name, ext = os.path.splitext(filename)
     ext = ext.lower()
@@ -152,8 +218,8 @@ def reverse_and_merge(video_path, index, total, speed_factor, input_base, encode
         raise RuntimeError(f"Failed to create merged file: {merged_file}")
 
     # Step 4: Trim 3 frames from start, clip tail to exact expected duration
-    trim_start_frames = 3
-    clean_duration = round((source_duration * 2) - round(trim_start_frames / fps, 6), 6)
+    trim_start_frames = TRIM_START_FRAMES
+    clean_duration = merged_duration(source_duration, fps, speed_factor)
     trimmed_file = merged_dir / f"{name}_merged_trim{ext}"
 
     trim_vf = f'select=gte(n\\,{trim_start_frames}),setpts=PTS-STARTPTS'
@@ -273,6 +339,13 @@ def main():
 
         speed_factor = ask_speed_factor()
         print()
+
+        single_pass = djj.prompt_choice(
+            "\033[93mPipeline:\033[0m\n1. Single pass  (one encode, no temp files)\n2. Four-step    (legacy, slower)\n",
+            ['1', '2'],
+            default='1'
+        ) == '1'
+        print()
         print("-------------")
 
         total = len(videos)
@@ -287,7 +360,8 @@ def main():
             sys.stdout.write(f"\r\033[93mProcessing video\033[0m {idx}\033[93m/\033[0m{total}: {display_name}")
             sys.stdout.flush()
             try:
-                reverse_and_merge(vid_path, idx, total, speed_factor, input_path, encoder, audio_choice)
+                reverse_and_merge(vid_path, idx, total, speed_factor, input_path, encoder, audio_choice,
+                                  single_pass=single_pass)
                 successful += 1
             except Exception as e:
                 failed.append((os.path.basename(vid_path), str(e)))
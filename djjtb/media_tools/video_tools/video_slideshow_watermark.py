@@ -44,24 +44,9 @@ def get_video_info(video_path):
         return None, None, None, None
 
 def get_image_dimensions(image_path):
-    """Get image dimensions using ffprobe."""
+    """Get image dimensions from the image header."""
     try:
-        result = subprocess.run(
-            [
-                "ffprobe", "-v", "error",
-                "-select_streams", "v:0",
-                "-show_entries", "stream=width,height",
-                "-of", "default=noprint_wrappers=1:nokey=1",
-                image_path
-            ],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-        output = result.stdout.strip().split('\n')
-        width = int(float(output[0]))
-        height = int(float(output[1]))
-        return width, height
+        return djj.get_image_size(image_path)
     except Exception as e:
         print(f"⚠️ Could not get image dimensions for {image_path}: {e}")
         return 1920, 1080  # fallback
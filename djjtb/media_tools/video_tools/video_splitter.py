@@ -1,35 +1,33 @@
 import os
 import subprocess
 import sys
+import bisect
+import json
+import sqlite3
 import pathlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import djjtb.utils as djj
 from scenedetect import open_video, SceneManager
 from scenedetect.detectors import AdaptiveDetector
 
-os.system('clear')
+# ── Scene Detection Config ────────────────────────────────────────────────────
+SCENE_DETECT_WIDTH = 320        # Frames are downscaled to roughly this width before analysis
+SCENE_FRAME_SKIP = 1            # Analyze every (N+1)th frame; 0 = every frame
+SCENE_WORKERS = max(1, min(4, (os.cpu_count() or 2) // 2))
+SCENE_CACHE_PATH = pathlib.Path("~/Library/Caches/DJJTB/scene_cache.sqlite").expanduser()
 
 def clean_path(path_str):
     """Clean input path by removing quotes and extra spaces."""
     return path_str.strip().strip('\'"')
 
 def get_video_duration(video_path):
-    """Get the duration of a video file using ffprobe."""
-    ffprobe_cmd = [
-        "ffprobe", "-v", "error", "-show_entries", "format=duration",
-        "-of", "default=noprint_wrappers=1:nokey=1", str(video_path)
-    ]
-    try:
-        ffprobe_output = subprocess.run(ffprobe_cmd, capture_output=True, text=True, check=True)
-        duration_str = ffprobe_output.stdout.strip()
-        if not duration_str:
-            raise ValueError("ffprobe returned an empty duration. Ensure the video file is valid.")
-        return float(duration_str)
-    except subprocess.CalledProcessError as e:
-        print(f"\033[93mError running ffprobe:\033[0m {e}", file=sys.stderr)
-        raise
-    except ValueError as e:
-        print(f"\033[93mError parsing video duration:\033[0m {e}", file=sys.stderr)
-        raise
+    """Get the duration of a video file via the cached ffprobe layer."""
+    info = djj.probe_media(video_path)
+    if not info or not info['duration']:
+        print(f"\033[93mError parsing video duration:\033[0m ffprobe returned no duration for {video_path}", file=sys.stderr)
+        raise ValueError("ffprobe returned an empty duration. Ensure the video file is valid.")
+    return info['duration']
 
 
 def get_video_input():
@@ -93,8 +91,8 @@ def build_split_cmd(video_path, start_time, remaining_time, output_file, audio_c
         return [
             "ffmpeg", "-y", "-ss", str(start_time), "-i", str(video_path),
             "-f", "lavfi", "-i", "anullsrc=channel_layout=stereo:sample_rate=48000",
-            "-t", str(remaining_time), "-c:v", "libx264", "-c:a", "aac", "-shortest",
-            str(output_file)
+            "-t", str(remaining_time), "-map", "0:v:0", "-map", "1:a:0", "-c:v", "libx264",
+            "-c:a", "aac", "-shortest", str(output_file)
         ]
     audio_options = djj.get_audio_options(audio_choice)
     return [
@@ -102,34 +100,378 @@ def build_split_cmd(video_path, start_time, remaining_time, output_file, audio_c
         "-t", str(remaining_time), "-c:v", "libx264"
     ] + audio_options + [str(output_file)]
 
-def detect_scenes(video_path, min_scene_duration):
+
+# ─── Split Engine ────────────────────────────────────────────────────────────
+# 'exact' : frame-exact cuts (the default). Only the slivers between a cut and
+#           the nearest keyframe inside the clip are re-encoded, with the
+#           source's codec, profile, level and pix_fmt; the whole GOPs between
+#           them are stream-copied. Every piece carries its own SPS/PPS in-band
+#           (repeat-headers on the slivers, mp4toannexb on the copied GOPs), and
+#           the joined MP4 is tagged avc3/hev1 so decoders use them instead of
+#           the first piece's avcC/hvcC. Cuts are frame indices in the probed
+#           packet timestamps, so VFR sources cut where they should. Clips with
+#           no whole GOP or open GOPs at the edges, sources that can't be
+#           matched, and any failed step get one full libx264 re-encode instead
+#           (build_split_cmd).
+# 'fast'  : cut points snap to the nearest keyframe and every clip comes out of
+#           one stream-copy ffmpeg run through the segment muxer (no re-encode).
+
+CUT_MODES = {'1': 'exact', '2': 'fast'}
+
+# Cut times this close to a keyframe count as on it (well under one frame)
+KEYFRAME_TOLERANCE = 0.002
+
+# ffprobe profile name -> encoder profile for re-encoded slivers
+X264_PROFILES = {
+    'Constrained Baseline': 'baseline', 'Baseline': 'baseline', 'Main': 'main', 'High': 'high',
+    'High 10': 'high10', 'High 4:2:2': 'high422', 'High 4:4:4 Predictive': 'high444',
+}
+X265_PROFILES = {'Main': 'main', 'Main 10': 'main10', 'Main 12': 'main12'}
+
+
+def get_frame_times(video_path, start_time=0.0):
     """
-    Detect scenes via PySceneDetect (AdaptiveDetector), then merge any
-    scene shorter than min_scene_duration into its neighbor -- otherwise
-    fast-cut montage footage (e.g. GRWM-style outfit-change clips) explodes
-    into dozens of sub-second fragments instead of a few usable scenes.
-    Returns a list of (start_seconds, end_seconds) tuples.
+    [(pts_seconds, is_keyframe, dts_seconds)] for every frame of the first
+    video stream in presentation order, from one packet-index probe (no
+    decode). Times are shifted by start_time so they line up with ffmpeg's -ss.
+    """
+    result = subprocess.run([
+        "ffprobe", "-v", "error", "-select_streams", "v:0",
+        "-show_entries", "packet=pts_time,dts_time,flags", "-of", "csv=p=0", str(video_path)
+    ], capture_output=True, text=True, check=True)
+    frames = []
+    for line in result.stdout.splitlines():
+        pts_time, dts_time, flags = (line.split(',') + ['', ''])[:3]
+        # 'D' packets are dropped by the container's edit list and never shown
+        if pts_time not in ('', 'N/A') and 'D' not in flags:
+            pts = float(pts_time) - start_time
+            dts = float(dts_time) - start_time if dts_time not in ('', 'N/A') else pts
+            frames.append((pts, 'K' in flags, dts))
+    return sorted(frames)
+
+
+def get_keyframe_times(video_path):
+    """Keyframe timestamps of the first video stream, from one packet-index probe (no decode)."""
+    return [t for t, is_key, _ in get_frame_times(video_path) if is_key]
+
+
+def get_cut_stream_info(video_path):
+    """codec_name/profile/level/pix_fmt of the first video stream, plus the file's start_time."""
+    result = subprocess.run([
+        "ffprobe", "-v", "error", "-select_streams", "v:0",
+        "-show_entries", "stream=codec_name,profile,level,pix_fmt:format=start_time",
+        "-of", "json", str(video_path)
+    ], capture_output=True, text=True, check=True)
+    data = json.loads(result.stdout)
+    streams = data.get('streams') or [{}]
+    info = dict(streams[0])
+    info['start_time'] = float(data.get('format', {}).get('start_time') or 0)
+    return info
+
+
+def sliver_encoder_args(info):
+    """
+    (sliver encoder args, body copy args, MP4 tag) that re-encode slivers as
+    the same codec, profile, level and pix_fmt as the source and keep SPS/PPS
+    in-band in every piece, or None if the source can't be matched.
+    """
+    codec, profile, level, pix_fmt = (info.get(k) for k in ('codec_name', 'profile', 'level', 'pix_fmt'))
+    if not pix_fmt or not level or level <= 0:
+        return None
+    if codec == 'h264' and profile in X264_PROFILES:
+        return (["-c:v", "libx264", "-profile:v", X264_PROFILES[profile], "-level:v", f"{level / 10:.1f}",
+                 "-x264-params", "repeat-headers=1", "-pix_fmt", pix_fmt],
+                ["-c:v", "copy", "-bsf:v", "h264_mp4toannexb"], "avc3")
+    if codec == 'hevc' and profile in X265_PROFILES:
+        # ffprobe reports HEVC level_idc, which is 30x the level number
+        return (["-c:v", "libx265", "-profile:v", X265_PROFILES[profile],
+                 "-x265-params", f"level-idc={level / 30:.1f}:repeat-headers=1:log-level=error",
+                 "-pix_fmt", pix_fmt],
+                ["-c:v", "copy", "-bsf:v", "hevc_mp4toannexb"], "hev1")
+    return None
+
+
+def snap_to_keyframe(t, keyframes):
+    """Nearest keyframe time to t."""
+    i = bisect.bisect_left(keyframes, t)
+    candidates = keyframes[max(0, i - 1):i + 1]
+    return min(candidates, key=lambda k: abs(k - t)) if candidates else t
+
+
+def split_stream_copy(video_path, clips, audio_choice, keyframes, duration):
+    """
+    Write every clip with one ffmpeg segment-muxer run and -c copy, cutting
+    at the keyframe nearest each requested start. A clip whose start snaps
+    onto the previous clip's start has no keyframe of its own and is folded
+    into that clip. Returns [(clip_number, error_or_None)].
+    """
+    cuts, kept = [], [0]
+    for j, (start, _, _) in enumerate(clips[1:], 1):
+        snapped = snap_to_keyframe(start, keyframes)
+        if snapped > (cuts[-1] if cuts else 0) + KEYFRAME_TOLERANCE and snapped < duration - KEYFRAME_TOLERANCE:
+            cuts.append(snapped)
+            kept.append(j)
+
+    output_dir = pathlib.Path(clips[0][2]).parent
+    temp_pattern = output_dir / f".split_{os.getpid()}_%04d.mp4"
+    cmd = ["ffmpeg", "-y", "-i", str(video_path)]
+    if audio_choice == '3':
+        cmd += ["-f", "lavfi", "-i", "anullsrc=channel_layout=stereo:sample_rate=48000",
+                "-map", "0:v:0", "-map", "1:a:0", "-c:v", "copy", "-c:a", "aac", "-shortest"]
+    elif audio_choice == '1':
+        cmd += ["-map", "0:v:0", "-map", "0:a?", "-c", "copy"]
+    else:
+        cmd += ["-map", "0:v:0", "-c", "copy", "-an"]
+    cmd += ["-f", "segment", "-reset_timestamps", "1"]
+    if cuts:
+        # Slightly early so float rounding can't push a cut past its keyframe to the next one
+        cmd += ["-segment_times", ",".join(f"{max(0.0, c - KEYFRAME_TOLERANCE / 2):.6f}" for c in cuts)]
+    cmd.append(str(temp_pattern))
+
+    try:
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    except subprocess.CalledProcessError as e:
+        for k in range(len(cuts) + 1):
+            pathlib.Path(str(temp_pattern) % k).unlink(missing_ok=True)
+        return [(j + 1, str(e)) for j in range(len(clips))]
+
+    results = []
+    kept_set = set(kept)
+    for k, j in enumerate(kept):
+        segment = pathlib.Path(str(temp_pattern) % k)
+        if segment.exists():
+            segment.replace(clips[j][2])
+            results.append((j + 1, None))
+        else:
+            results.append((j + 1, "Segment muxer produced no file"))
+    for j in range(len(clips)):
+        if j not in kept_set:
+            results.append((j + 1, "No keyframe near cut; merged into previous clip"))
+    return sorted(results)
+
+
+def _run_quiet(cmd):
+    subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+
+
+def split_clip_exact(video_path, start, clip_duration, output_file, audio_choice, frames, info):
+    """
+    Frame-exact clip from slivers: re-encode [first frame, first keyframe) and
+    [last keyframe, last frame], stream-copy the GOPs in between, then join the
+    pieces into the MP4 with -c copy and cut the audio once alongside.
+    frames is get_frame_times() output; the clip is frames a..b-1, where a and
+    b are the first frames at or after start and start + clip_duration.
+    Returns False without writing anything if the clip has no whole GOP, the
+    GOPs at its edges are open, or the source can't be matched (the caller
+    re-encodes it whole).
+    """
+    encoder = sliver_encoder_args(info)
+    if encoder is None:
+        return False
+    sliver_args, body_args, tag = encoder
+    a = bisect.bisect_left(frames, (start - KEYFRAME_TOLERANCE,))
+    b = bisect.bisect_left(frames, (start + clip_duration - KEYFRAME_TOLERANCE,))
+    # Keyframe b (the next clip's first frame) still closes the last copied GOP
+    keys = [i for i in range(a, min(b + 1, len(frames))) if frames[i][1]]
+    if len(keys) < 2:
+        return False
+    h, t = keys[0], keys[-1]
+    # Closed GOPs only: every frame shown before a cut keyframe must also be
+    # decoded before it, or the copy would carry (or lose) its leading B-frames
+    if any(f[2] >= frames[h][2] for f in frames[a:h]) or any(f[2] >= frames[t][2] for f in frames[h:t]):
+        return False
+
+    # Encoded slivers seek a hair early so decoding keeps frame `first`, and a
+    # frame count stops them on their last frame; they keep the source's
+    # timestamps and time base, so VFR stays VFR. The copied body seeks to
+    # keyframe h's own probed timestamp, which the demuxer rounds to h's exact
+    # tick (anything later would shift h below zero and the MP4 muxer would
+    # edit it out), and -t stops it just before keyframe t's decode timestamp,
+    # since a stream copy ends on dts (-frames miscounts copied VFR packets).
+    encode_args = [*sliver_args, "-fps_mode", "passthrough", "-enc_time_base:v", "demux"]
+
+    def piece_cmd(first, end):
+        if first == h:
+            seek = frames[h][0]
+            limit = ["-t", f"{frames[t][2] - seek - KEYFRAME_TOLERANCE / 2:.6f}", *body_args]
+        else:
+            seek = frames[first][0] - KEYFRAME_TOLERANCE / 2
+            limit = ["-frames:v", str(end - first), *encode_args]
+        return ["ffmpeg", "-y", "-ss", f"{seek:.6f}", "-i", str(video_path), "-map", "0:v:0", *limit, "-an"]
+
+    output_file = pathlib.Path(output_file)
+    # Plain temp names: the concat list resolves them next to itself and needs no quoting
+    stem = output_file.parent / f".exact_{os.getpid()}"
+    temp_files = []
+    try:
+        concat_lines = []
+        for n, (first, end) in enumerate([(a, h), (h, t), (t, b)]):
+            if end <= first:
+                continue
+            piece = pathlib.Path(f"{stem}_{n}.mp4")
+            temp_files.append(piece)
+            _run_quiet(piece_cmd(first, end) + [str(piece)])
+            concat_lines.append(f"file '{piece.name}'\n")
+            if end < len(frames):
+                concat_lines.append(f"duration {frames[end][0] - frames[first][0]:.6f}\n")
+
+        concat_list = pathlib.Path(f"{stem}_concat.txt")
+        temp_files.append(concat_list)
+        concat_list.write_text("".join(concat_lines))
+
+        cmd = ["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", str(concat_list)]
+        if audio_choice == '3':
+            cmd += ["-f", "lavfi", "-i", "anullsrc=channel_layout=stereo:sample_rate=48000",
+                    "-map", "0:v:0", "-map", "1:a:0", "-c:a", "aac", "-shortest"]
+        elif audio_choice == '2':
+            cmd += ["-map", "0:v:0", "-an"]
+        else:
+            cmd += ["-ss", f"{frames[a][0]:.6f}"]
+            if b < len(frames):
+                cmd += ["-t", f"{frames[b][0] - frames[a][0]:.6f}"]
+            cmd += ["-i", str(video_path), "-map", "0:v:0", "-map", "1:a?", "-c:a", "aac"]
+        cmd += ["-c:v", "copy", "-tag:v", tag, "-movflags", "+faststart", str(output_file)]
+        _run_quiet(cmd)
+    finally:
+        for temp_file in temp_files:
+            temp_file.unlink(missing_ok=True)
+    return True
+
+
+def write_clips(video_path, clips, audio_choice, cut_mode, logger, on_clip=None):
+    """
+    Write clips [(start, duration, output_file)] of one video with the chosen
+    cut mode. on_clip(j) is called before clip j is written (exact mode)
+    or once before the single stream-copy run. Returns [(clip_number, error_or_None)].
+    """
+    if cut_mode == 'fast':
+        if on_clip:
+            on_clip(len(clips) - 1)
+        try:
+            keyframes = get_keyframe_times(video_path)
+            results = split_stream_copy(video_path, clips, audio_choice, keyframes, get_video_duration(video_path))
+        except (subprocess.CalledProcessError, ValueError) as e:
+            results = [(j + 1, str(e)) for j in range(len(clips))]
+        for clip_number, error in results:
+            if error:
+                logger.error(f"Error generating {clips[clip_number - 1][2]}: {error}")
+        return results
+
+    frames, info = [], {}
+    try:
+        info = get_cut_stream_info(video_path)
+        frames = get_frame_times(video_path, info['start_time'])
+    except (subprocess.CalledProcessError, ValueError) as e:
+        logger.error(f"Keyframe probe failed for {video_path}, re-encoding whole clips: {e}")
+
+    results = []
+    for j, (start_time, clip_duration, output_file) in enumerate(clips):
+        if on_clip:
+            on_clip(j)
+        try:
+            written = False
+            if frames:
+                try:
+                    written = split_clip_exact(video_path, start_time, clip_duration, output_file,
+                                               audio_choice, frames, info)
+                except subprocess.CalledProcessError as e:
+                    logger.error(f"Sliver cut failed for {output_file}, re-encoding whole clip: {e}")
+            if not written:
+                _run_quiet(build_split_cmd(video_path, start_time, clip_duration, output_file, audio_choice))
+            results.append((j + 1, None))
+        except subprocess.CalledProcessError as e:
+            results.append((j + 1, str(e)))
+            logger.error(f"Error generating {output_file}: {e}")
+    return results
+
+def _scene_params():
+    """Detection settings that change the raw boundaries, part of the cache key."""
+    return f"adaptive:w{SCENE_DETECT_WIDTH}:skip{SCENE_FRAME_SKIP}"
+
+
+def _open_scene_cache():
+    SCENE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(SCENE_CACHE_PATH), timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS scenes ("
+        "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, params TEXT, scenes TEXT)"
+    )
+    return conn
+
+
+def load_cached_scenes(video_path):
+    """Raw (unmerged) scene list for video_path if cached for this file version + settings, else None."""
+    key = str(pathlib.Path(video_path).resolve())
+    try:
+        st = os.stat(key)
+        conn = _open_scene_cache()
+        try:
+            row = conn.execute("SELECT size, mtime_ns, params, scenes FROM scenes WHERE path = ?", (key,)).fetchone()
+        finally:
+            conn.close()
+    except (OSError, sqlite3.Error):
+        return None
+    if row and (row[0], row[1], row[2]) == (st.st_size, st.st_mtime_ns, _scene_params()):
+        return [tuple(scene) for scene in json.loads(row[3])]
+    return None
+
+
+def save_cached_scenes(video_path, scenes):
+    key = str(pathlib.Path(video_path).resolve())
+    try:
+        st = os.stat(key)
+        conn = _open_scene_cache()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO scenes VALUES (?, ?, ?, ?, ?)",
+                         (key, st.st_size, st.st_mtime_ns, _scene_params(), json.dumps(scenes)))
+        conn.close()
+    except (OSError, sqlite3.Error):
+        pass
+
+
+def detect_raw_scenes(video_path):
+    """
+    Run AdaptiveDetector on downscaled frames (SCENE_DETECT_WIDTH), skipping
+    SCENE_FRAME_SKIP frames between samples. Returns [(start_s, end_s)].
     """
     video = open_video(str(video_path))
     scene_manager = SceneManager()
+    width = video.frame_size[0] if video.frame_size else 0
+    scene_manager.auto_downscale = False
+    scene_manager.downscale = max(1, width // SCENE_DETECT_WIDTH)
     scene_manager.add_detector(AdaptiveDetector())
-    scene_manager.detect_scenes(video=video)
-    scenes = scene_manager.get_scene_list()
+    scene_manager.detect_scenes(video=video, frame_skip=SCENE_FRAME_SKIP)
+    return [(start.get_seconds(), end.get_seconds()) for start, end in scene_manager.get_scene_list()]
+
 
+def get_raw_scenes(video_path):
+    """Cached raw scene list, detecting (and caching) on a miss."""
+    scenes = load_cached_scenes(video_path)
+    if scenes is None:
+        scenes = detect_raw_scenes(video_path)
+        save_cached_scenes(video_path, scenes)
+    return scenes
+
+
+def merge_short_scenes(scenes, min_scene_duration):
+    """
+    Merge any scene shorter than min_scene_duration into its neighbor --
+    otherwise fast-cut montage footage (e.g. GRWM-style outfit-change clips)
+    explodes into dozens of sub-second fragments instead of a few usable scenes.
+    """
     if not scenes:
         return []
 
     merged = []
-    group_start = scenes[0][0]
-    group_end = scenes[0][1]
+    group_start, group_end = scenes[0]
     for start, end in scenes[1:]:
-        if group_end.get_seconds() - group_start.get_seconds() < min_scene_duration:
+        if group_end - group_start < min_scene_duration:
             group_end = end
         else:
-            merged.append((group_start.get_seconds(), group_end.get_seconds()))
-            group_start = start
-            group_end = end
-    merged.append((group_start.get_seconds(), group_end.get_seconds()))
+            merged.append((group_start, group_end))
+            group_start, group_end = start, end
+    merged.append((group_start, group_end))
 
     if len(merged) > 1:
         last_start, last_end = merged[-1]
@@ -140,7 +482,60 @@ def detect_scenes(video_path, min_scene_duration):
 
     return merged
 
-def split_video_by_scenes(videos, min_scene_duration, audio_choice):
+
+def detect_scenes(video_path, min_scene_duration):
+    """
+    Detect scenes via PySceneDetect (AdaptiveDetector) and merge short ones
+    (see merge_short_scenes). Raw boundaries are cached by file size + mtime,
+    so a different min_scene_duration re-merges without decoding again.
+    Returns a list of (start_seconds, end_seconds) tuples.
+    """
+    return merge_short_scenes(get_raw_scenes(video_path), min_scene_duration)
+
+
+def _safe_raw_scenes(video_path):
+    try:
+        return get_raw_scenes(video_path), None
+    except Exception as e:
+        return None, str(e)
+
+
+def detect_scenes_many(videos, on_done=None):
+    """
+    Raw scene lists for many videos: cache hits are answered immediately,
+    misses are decoded in SCENE_WORKERS parallel processes.
+    Returns {video_path: (scenes_or_None, error_or_None)}; on_done(count) after each video.
+    """
+    results = {}
+    misses = []
+    for video_path in videos:
+        cached = load_cached_scenes(video_path)
+        if cached is not None:
+            results[video_path] = (cached, None)
+        else:
+            misses.append(video_path)
+    if on_done:
+        on_done(len(results))
+
+    if SCENE_WORKERS <= 1 or len(misses) < 2:
+        for video_path in misses:
+            results[video_path] = _safe_raw_scenes(video_path)
+            if on_done:
+                on_done(len(results))
+        return results
+
+    # spawn, not fork: forking after OpenCV/numpy have started threads can hang
+    # on macOS. Children re-import this module, so keep its top level side-effect free.
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=min(SCENE_WORKERS, len(misses)), mp_context=ctx) as pool:
+        futures = {pool.submit(_safe_raw_scenes, v): v for v in misses}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+            if on_done:
+                on_done(len(results))
+    return results
+
+def split_video_by_scenes(videos, min_scene_duration, audio_choice, cut_mode='exact'):
     """Split videos at auto-detected scene boundaries."""
     if not videos:
         return [], [], None
@@ -153,6 +548,9 @@ def split_video_by_scenes(videos, min_scene_duration, audio_choice):
     output_dirs = set()
     total_videos = len(videos)
 
+    raw_scenes = detect_scenes_many(videos, on_done=lambda done: print(
+        f"\r\033[93mAnalyzing\033[0m {done}\033[93m/\033[0m{total_videos} \033[93mvideos...\033[0m", end='', flush=True))
+
     for i, video_path in enumerate(videos, 1):
         video_path_obj = pathlib.Path(video_path)
         logger = None
@@ -163,8 +561,10 @@ def split_video_by_scenes(videos, min_scene_duration, audio_choice):
             logger = djj.setup_logging(str(output_dir), "video_split")
             output_dirs.add(str(output_dir))
 
-            print(f"\r\033[93mAnalyzing\033[0m {i}\033[93m/\033[0m{total_videos}: {video_path_obj.name}...", end='', flush=True)
-            scenes = detect_scenes(video_path, min_scene_duration)
+            scenes, error = raw_scenes[video_path]
+            if error:
+                raise RuntimeError(f"Scene detection failed: {error}")
+            scenes = merge_short_scenes(scenes, min_scene_duration)
 
             if not scenes:
                 logger.error(f"No scenes detected for {video_path_obj.name}")
@@ -173,22 +573,19 @@ def split_video_by_scenes(videos, min_scene_duration, audio_choice):
                 continue
 
             num_scenes = len(scenes)
-            for j, (start_time, end_time) in enumerate(scenes):
-                clip_duration = end_time - start_time
-                output_file = output_dir / f"{video_name}-scene{j+1:04d}.mp4"
+            clips = [(start_time, end_time - start_time, output_dir / f"{video_name}-scene{j+1:04d}.mp4")
+                     for j, (start_time, end_time) in enumerate(scenes)]
 
+            def show_progress(j):
                 progress = ((i - 1 + (j + 1) / num_scenes) / total_videos) * 100
                 status_line = f"\033[93mSplitting\033[0m {i}\033[93m/\033[0m{total_videos} \033[93mvideos\033[0m, \033[93mscenes\033[0m {j+1}\033[93m/\033[0m{num_scenes} ({progress:.1f}%)"
                 print(f"\r\033[93m{status_line}\033[0m", end='', flush=True)
 
-                try:
-                    ffmpeg_cmd = build_split_cmd(video_path, start_time, clip_duration, output_file, audio_choice)
-                    result = subprocess.run(ffmpeg_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
-                    successful.append((video_path_obj.name, j+1))
-                except subprocess.CalledProcessError as e:
-                    failed.append((video_path_obj.name, j+1, str(e)))
-                    logger.error(f"Error generating {output_file}: {e}")
-                    print(f"\r{status_line}... (failed)    ", end='', flush=True)
+            for clip_number, error in write_clips(video_path, clips, audio_choice, cut_mode, logger, show_progress):
+                if error:
+                    failed.append((video_path_obj.name, clip_number, error))
+                else:
+                    successful.append((video_path_obj.name, clip_number))
 
         except Exception as e:
             failed.append((video_path_obj.name, None, str(e)))
@@ -200,7 +597,7 @@ def split_video_by_scenes(videos, min_scene_duration, audio_choice):
 
     return successful, failed, output_dirs
 
-def split_video_by_duration(videos, clip_duration, audio_choice):
+def split_video_by_duration(videos, clip_duration, audio_choice, cut_mode='exact'):
     """Split videos into clips of specified duration, with output in each video's parent folder."""
     if not videos:
         return [], [], None
@@ -235,23 +632,20 @@ def split_video_by_duration(videos, clip_duration, audio_choice):
             if duration % clip_duration > 0:
                 num_clips += 1
             
-            for j in range(num_clips):
-                start_time = j * clip_duration
-                remaining_time = min(clip_duration, duration - start_time)
-                output_file = output_dir / f"{video_name}_{clip_duration}s-{j+1:04d}.mp4"
+            clips = [(j * clip_duration, min(clip_duration, duration - j * clip_duration),
+                      output_dir / f"{video_name}_{clip_duration}s-{j+1:04d}.mp4")
+                     for j in range(num_clips)]
 
+            def show_progress(j):
                 progress = ((i - 1 + (j + 1) / num_clips) / total_videos) * 100
                 status_line = f"\033[93mProcessing\033[0m {i}\033[93m/\033[0m{total_videos} \033[93mvideos\033[0m, \033[93mclips\033[0m {j+1}\033[93m/\033[0m{num_clips} ({progress:.1f}%)"
                 print(f"\r\033[93m{status_line}\033[0m", end='', flush=True)
-                
-                try:
-                    ffmpeg_cmd = build_split_cmd(video_path, start_time, remaining_time, output_file, audio_choice)
-                    result = subprocess.run(ffmpeg_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
-                    successful.append((video_path_obj.name, j+1))
-                except subprocess.CalledProcessError as e:
-                    failed.append((video_path_obj.name, j+1, str(e)))
-                    logger.error(f"Error generating {output_file}: {e}")
-                    print(f"\r{status_line}... (failed)    ", end='', flush=True)
+
+            for clip_number, error in write_clips(video_path, clips, audio_choice, cut_mode, logger, show_progress):
+                if error:
+                    failed.append((video_path_obj.name, clip_number, error))
+                else:
+                    successful.append((video_path_obj.name, clip_number))
             
         except Exception as e:
             failed.append((video_path_obj.name, None, str(e)))
@@ -261,7 +655,7 @@ def split_video_by_duration(videos, clip_duration, audio_choice):
     
     return successful, failed, output_dirs
 
-def split_video_by_portions(videos, num_portions, audio_choice):
+def split_video_by_portions(videos, num_portions, audio_choice, cut_mode='exact'):
     """Split videos into equal portions."""
     if not videos:
         return [], [], None
@@ -293,25 +687,21 @@ def split_video_by_portions(videos, num_portions, audio_choice):
             
             clip_duration = duration / num_portions
             
-            for j in range(num_portions):
-                start_time = j * clip_duration
-                remaining_time = duration - start_time if j == num_portions - 1 else clip_duration
-            
-                output_file = output_dir / f"{video_name}-part{j+1:02d}.mp4"
-            
+            clips = [(j * clip_duration,
+                      duration - j * clip_duration if j == num_portions - 1 else clip_duration,
+                      output_dir / f"{video_name}-part{j+1:02d}.mp4")
+                     for j in range(num_portions)]
+
+            def show_progress(j):
                 part_num = j + 1
                 percent = int((part_num / num_portions) * 100)
-            
                 print(f"\r\033[93mSplitting Videos\033[0m {i}\033[93m/\033[0m{len(videos)} , \033[93mParts\033[0m {part_num}\033[93m/\033[0m{num_portions} ({percent}%)...", end='', flush=True)
-                try:
-                    ffmpeg_cmd = build_split_cmd(video_path, start_time, remaining_time, output_file, audio_choice)
-                    result = subprocess.run(ffmpeg_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
-                    successful.append((video_path_obj.name, j+1))
-                except subprocess.CalledProcessError as e:
-                    failed.append((video_path_obj.name, j+1, str(e)))
-                    logger.error(f"Error generating {output_file}: {e}")
-                    progress = ((i - 1 + (j + 1) / num_portions) / len(videos)) * 100
-                    print(f"\r\033[93mProcessing\033[0m {i}\033[93m/\033[0m{len(videos)} \033[93mvideos,\033[0m \033[93mpart\033[0m {j+1}\033[93m/\033[0m{num_portions} ({progress:.1f}%)... (failed)    ", end='', flush=True)
+
+            for clip_number, error in write_clips(video_path, clips, audio_choice, cut_mode, logger, show_progress):
+                if error:
+                    failed.append((video_path_obj.name, clip_number, error))
+                else:
+                    successful.append((video_path_obj.name, clip_number))
         except Exception as e:
             failed.append((video_path_obj.name, None, str(e)))
             if logger:
@@ -363,14 +753,21 @@ if __name__ == "__main__":
         audio_choice = djj.prompt_choice("\033[93mAudio handling?\033[0m\n1. Keep Original Audio\n2. Strip Audio\n3. Add Silent Audio Track)\n", ['1', '2', '3'], default='1')
         print()
 
+        cut_mode = CUT_MODES[djj.prompt_choice(
+            "\033[93mCut mode?\033[0m\n1. Frame-exact (re-encode cut edges only)\n2. Fast (stream copy, keyframe cuts)\n",
+            ['1', '2'],
+            default='1'
+        )]
+        print()
+
         print("\033[93m-------------\033[0m")
 
         if split_method == '1':
-            successful, failed, output_dirs = split_video_by_duration(videos, clip_duration, audio_choice)
+            successful, failed, output_dirs = split_video_by_duration(videos, clip_duration, audio_choice, cut_mode)
         elif split_method == '2':
-            successful, failed, output_dirs = split_video_by_portions(videos, num_portions, audio_choice)
+            successful, failed, output_dirs = split_video_by_portions(videos, num_portions, audio_choice, cut_mode)
         else:
-            successful, failed, output_dirs = split_video_by_scenes(videos, min_scene_duration, audio_choice)
+            successful, failed, output_dirs = split_video_by_scenes(videos, min_scene_duration, audio_choice, cut_mode)
 
         print("\n" * 1)
         print("\033[93mSplitting Summary\033[0m")
@@ -7,10 +7,18 @@ Imported via djjtb.utils re-export so all existing djj.* calls work unchanged.
 
 import os
 import sys
+import json
+import struct
+import sqlite3
+import queue
+import time
+import threading
 import subprocess
 import logging
 import pathlib
-import pathlib
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
 
 # ─── FFmpeg Dimension Helpers ─────────────────────────────────────────────────
@@ -39,6 +47,176 @@ def get_gif_dimensions(gif_path: str) -> tuple[int, int]:
     return width, height
 
 
+# ─── FFprobe Metadata Cache ──────────────────────────────────────────────────
+
+# Shared across every tool. Rows are keyed by path and only trusted while the
+# file's size + mtime still match, so edited/replaced files re-probe.
+PROBE_CACHE_PATH = pathlib.Path("~/Library/Caches/DJJTB/media_probe.sqlite").expanduser()
+
+_probe_local = threading.local()
+
+
+def _probe_cache_conn():
+    """Per-thread (and per-process, after fork) connection to the probe cache."""
+    conn = getattr(_probe_local, 'conn', None)
+    if conn is None or getattr(_probe_local, 'pid', None) != os.getpid():
+        PROBE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(PROBE_CACHE_PATH), timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS probes ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, info TEXT)"
+        )
+        _probe_local.conn = conn
+        _probe_local.pid = os.getpid()
+    return conn
+
+
+def parse_frame_rate(rate, default=0.0):
+    """'30000/1001' -> 29.97, '25' -> 25.0; default on missing/0/garbage."""
+    try:
+        if '/' in str(rate):
+            num, den = str(rate).split('/')
+            return round(int(num) / int(den), 3) if int(den) else default
+        return float(rate) or default
+    except (TypeError, ValueError):
+        return default
+
+
+def summarize_ffprobe(data):
+    """
+    Flatten ffprobe -of json output (format + streams) into the fields the
+    tools actually use. First video stream wins; missing values are None.
+    """
+    def num(value, cast):
+        try:
+            return cast(value)
+        except (TypeError, ValueError):
+            return None
+
+    streams = data.get('streams', [])
+    video = next((s for s in streams if s.get('codec_type') == 'video'), {})
+    audio = next((s for s in streams if s.get('codec_type') == 'audio'), None)
+    return {
+        'width': num(video.get('width'), int),
+        'height': num(video.get('height'), int),
+        'codec': video.get('codec_name'),
+        'pix_fmt': video.get('pix_fmt'),
+        'r_frame_rate': video.get('r_frame_rate'),
+        'fps': parse_frame_rate(video.get('r_frame_rate')),
+        'nb_frames': num(video.get('nb_frames'), int),
+        'stream_duration': num(video.get('duration'), float),
+        'duration': num(data.get('format', {}).get('duration'), float),
+        'has_video': bool(video),
+        'has_audio': audio is not None,
+        'audio_codec': audio.get('codec_name') if audio else None,
+    }
+
+
+FFPROBE_ENTRIES = ("format=duration:stream=codec_type,codec_name,width,height,"
+                   "pix_fmt,r_frame_rate,nb_frames,duration")
+
+
+def _run_ffprobe(path, timeout=None):
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-show_entries", FFPROBE_ENTRIES,
+        "-of", "json", str(path)
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout, check=True)
+    return summarize_ffprobe(json.loads(result.stdout or '{}'))
+
+
+def _probe_cache_lookup(path):
+    """(cache_key, stat, cached_info_or_None); stat is None if the file is gone."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None, None, None
+    key = str(pathlib.Path(path).resolve())
+    try:
+        row = _probe_cache_conn().execute(
+            "SELECT size, mtime_ns, info FROM probes WHERE path = ?", (key,)
+        ).fetchone()
+    except sqlite3.Error as e:
+        logging.warning(f"Probe cache read failed: {e}")
+        row = None
+    if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+        return key, st, json.loads(row[2])
+    return key, st, None
+
+
+def probe_media(path, timeout=None, use_cache=True):
+    """
+    One ffprobe call for width/height/codec/fps/frames/duration/audio, served
+    from the on-disk cache when the file's size + mtime haven't changed.
+
+    Returns the summarize_ffprobe dict, or None if the file can't be probed
+    (missing, not media, ffprobe error/timeout). Failures are never cached.
+    """
+    if use_cache:
+        key, st, info = _probe_cache_lookup(path)
+        if st is None:
+            return None
+        if info is not None:
+            return info
+    elif not os.path.exists(path):
+        return None
+
+    try:
+        info = _run_ffprobe(path, timeout=timeout)
+    except (subprocess.SubprocessError, OSError, ValueError):
+        return None
+
+    if use_cache:
+        try:
+            conn = _probe_cache_conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO probes (path, size, mtime_ns, info) VALUES (?, ?, ?, ?)",
+                (key, st.st_size, st.st_mtime_ns, json.dumps(info))
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            logging.warning(f"Probe cache write failed: {e}")
+    return info
+
+
+def probe_media_many(paths, workers=8, timeout=None, show_progress=True):
+    """
+    probe_media for a whole batch. Cache hits are answered in one pass
+    without spawning anything; only misses run ffprobe, `workers` at a
+    time on a thread pool (each call just waits on its subprocess).
+    Returns {path: info_or_None} keyed by the paths as given.
+    """
+    from concurrent.futures import as_completed
+
+    paths = list(paths)
+    results = {}
+    misses = []
+    for path in paths:
+        _, st, info = _probe_cache_lookup(path)
+        if info is not None:
+            results[path] = info
+        elif st is None:
+            results[path] = None
+        else:
+            misses.append(path)
+
+    if misses:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {pool.submit(probe_media, p, timeout): p for p in misses}
+            for i, future in enumerate(as_completed(futures), 1):
+                results[futures[future]] = future.result()
+                if show_progress:
+                    sys.stdout.write(f"\r\033[93mProbing\033[0m {i}/{len(misses)}...")
+                    sys.stdout.flush()
+        if show_progress:
+            sys.stdout.write("\r" + " " * 40 + "\r")
+            sys.stdout.flush()
+
+    return results
+
+
 # ─── Audio Options ────────────────────────────────────────────────────────────
 
 def get_audio_options(audio_choice):
@@ -53,12 +231,332 @@ def get_audio_options(audio_choice):
         return ["-c:a", "aac"]
 
 
+# ─── Encode Job Scheduler ─────────────────────────────────────────────────────
+# Runs ffmpeg jobs concurrently with separate limits for hardware encoder
+# sessions (VideoToolbox allows only a few at once) and software encoders
+# (libx264/libx265 are already multithreaded, so a couple of jobs saturate
+# the cores). Jobs are plain callables; they run on threads because the real
+# work happens in the ffmpeg subprocess.
+
+HW_ENCODE_SLOTS = 2
+SW_ENCODE_SLOTS = max(1, (os.cpu_count() or 2) // 4)
+_HW_ENCODER_MARKERS = ('_videotoolbox', '_nvenc', '_qsv', '_vaapi', '_amf')
+
+
+def is_hw_encoder(encoder):
+    return bool(encoder) and any(marker in encoder for marker in _HW_ENCODER_MARKERS)
+
+
+class EncodeScheduler:
+    """
+    with EncodeScheduler() as sched:
+        fut = sched.submit('h264_videotoolbox', fn, *args)
+    submit() routes the job to the hardware or software pool by encoder name
+    and returns a concurrent.futures.Future. Stream-copy / no-encode jobs
+    (encoder None or 'copy') share the software pool.
+    """
+
+    def __init__(self, hw_slots=HW_ENCODE_SLOTS, sw_slots=SW_ENCODE_SLOTS):
+        self.hw_pool = ThreadPoolExecutor(max_workers=max(1, hw_slots), thread_name_prefix='enc-hw')
+        self.sw_pool = ThreadPoolExecutor(max_workers=max(1, sw_slots), thread_name_prefix='enc-sw')
+
+    def submit(self, encoder, fn, *args, **kwargs):
+        pool = self.hw_pool if is_hw_encoder(encoder) else self.sw_pool
+        return pool.submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait=True):
+        self.hw_pool.shutdown(wait=wait)
+        self.sw_pool.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        return False
+
+
+# ─── Staged Folder Batches ────────────────────────────────────────────────────
+# Model runners (ncnn-vulkan binaries, GFPGAN/CodeFormer inference scripts) pay
+# their model load once per invocation, and their folder mode processes every
+# image in one invocation. StagedBatch lets a file list drawn from any number
+# of folders use that folder mode: the files are hardlinked (symlinked across
+# volumes, copied as a last resort) into one temp folder under index-prefixed
+# names, so same-named files from different folders cannot collide, and the
+# runner's outputs are moved back next to each source afterwards.
+
+def link_or_copy(src, dst):
+    """Hardlink src to dst, falling back to a symlink, then a copy. Returns the method used."""
+    try:
+        os.link(src, dst)
+        return 'hardlink'
+    except OSError:
+        pass
+    try:
+        os.symlink(os.path.abspath(src), dst)
+        return 'symlink'
+    except OSError:
+        shutil.copy2(src, dst)
+        return 'copy'
+
+
+class StagedBatch:
+    """
+    with StagedBatch(files) as stage:
+        run_tool(stage.input_dir, stage.output_dir)
+        results = stage.distribute(lambda src: Path(src).parent / "Output" / "Tool", suffix="_T")
+    Staged name for files[i] is "{i:0Nd}_{name}"; any output (in any subfolder
+    of output_dir) whose name starts with that prefix belongs to files[i].
+    distribute() moves each one to dest_for(source) / <same subfolder> with
+    the prefix stripped and, if given, suffix appended to the stem when the
+    tool did not already add it. Returns {source: [moved paths]}; sources
+    with no outputs get an empty list. The temp folder is removed on exit.
+    """
+
+    def __init__(self, files):
+        self.files = [str(f) for f in files]
+        self.root = None
+        self.input_dir = None
+        self.output_dir = None
+        self._prefix_to_source = {}
+
+    def __enter__(self):
+        self.root = pathlib.Path(tempfile.mkdtemp(prefix='djj_stage_'))
+        self.input_dir = self.root / 'in'
+        self.output_dir = self.root / 'out'
+        self.input_dir.mkdir()
+        self.output_dir.mkdir()
+        width = len(str(max(len(self.files) - 1, 0)))
+        for i, src in enumerate(self.files):
+            prefix = f"{i:0{width}d}"
+            link_or_copy(src, self.input_dir / f"{prefix}_{os.path.basename(src)}")
+            self._prefix_to_source[prefix] = src
+        return self
+
+    def distribute(self, dest_for, suffix=None):
+        results = {src: [] for src in self.files}
+        for path in sorted(self.output_dir.rglob('*')):
+            if not path.is_file():
+                continue
+            prefix, sep, name = path.name.partition('_')
+            source = self._prefix_to_source.get(prefix) if sep else None
+            if source is None:
+                continue
+            stem, ext = os.path.splitext(name)
+            if suffix and not stem.endswith(suffix):
+                name = f"{stem}{suffix}{ext}"
+            dest_dir = pathlib.Path(dest_for(source)) / path.parent.relative_to(self.output_dir)
+            dest_dir.mkdir(parents=True, exist_ok=True)
+            dest = dest_dir / name
+            shutil.move(str(path), str(dest))
+            results[source].append(dest)
+        return results
+
+    def __exit__(self, *exc):
+        shutil.rmtree(self.root, ignore_errors=True)
+        return False
+
+
+# ─── JSON-Lines Subprocess Workers ────────────────────────────────────────────
+# Model runners that live in their own venv (upscalers, ThinkSound) keep one
+# interpreter alive across a batch instead of paying imports + model load per
+# file. The child reads one JSON job per stdin line and answers each with one
+# "<tag> {json}" line on stdout; everything else it prints is kept as log text
+# for error messages. Its first reply, sent once it is warmed up, is the ready
+# line.
+
+def stream_lines(process):
+    """Queue fed with process.stdout lines by a daemon thread, then None at EOF."""
+    lines = queue.Queue()
+
+    def pump():
+        for line in process.stdout:
+            lines.put(line)
+        lines.put(None)  # EOF — process exited
+
+    threading.Thread(target=pump, daemon=True).start()
+    return lines
+
+
+class JsonLineWorker:
+    """
+    with JsonLineWorker([python, "-c", SCRIPT], "@@TAG", env={...}) as worker:
+        reply, error = worker.request({...}, timeout=600)
+    The process starts on first request(), is killed and restarted on the
+    next one after a crash or timeout, and exits when close() shuts its stdin.
+    self.ready holds the child's ready reply once started.
+    """
+
+    def __init__(self, cmd, reply_tag, env=None, cwd=None, startup_timeout=300, log_chars=2000,
+                 name="Worker"):
+        self.cmd = list(cmd)
+        self.name = name
+        self.reply_prefix = reply_tag + " "
+        self.env = dict(env or {})
+        self.cwd = cwd
+        self.startup_timeout = startup_timeout
+        self.log_chars = log_chars
+        self.process = None
+        self.ready = None
+        self._lines = None
+        self._log = []
+
+    def _wait_reply(self, timeout):
+        """Next tagged reply as a dict; other output is kept as log text.
+        Returns None on EOF, raises queue.Empty on timeout."""
+        deadline = time.time() + timeout
+        while True:
+            line = self._lines.get(timeout=max(0.0, deadline - time.time()))
+            if line is None:
+                return None
+            if line.startswith(self.reply_prefix):
+                return json.loads(line[len(self.reply_prefix):])
+            self._log.append(line)
+
+    def log_tail(self, default):
+        return "".join(self._log).strip()[-self.log_chars:] or default
+
+    def start(self):
+        """Launch the process and wait for its ready line. Returns (success, error_text)."""
+        env = os.environ.copy()
+        env.update(self.env)
+        self._log = []
+        self.process = subprocess.Popen(self.cmd, cwd=self.cwd, env=env,
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.STDOUT, text=True, bufsize=1)
+        self._lines = stream_lines(self.process)
+        try:
+            self.ready = self._wait_reply(self.startup_timeout)
+        except queue.Empty:
+            self.ready = None
+        if not self.ready:
+            err = self.log_tail(f"{self.name} failed to start")
+            self.close(kill=True)
+            return False, err
+        return True, None
+
+    def request(self, job, timeout, timeout_error="Timeout"):
+        """
+        Send one job and wait for its reply. Returns (reply, None), or
+        (None, error_text) if the worker could not start, timed out or died —
+        the process is killed then, so the next request starts a fresh one.
+        """
+        if self.process is None or self.process.poll() is not None:
+            ok, err = self.start()
+            if not ok:
+                return None, err
+        self._log = []
+        try:
+            self.process.stdin.write(json.dumps(job) + "\n")
+            self.process.stdin.flush()
+            reply = self._wait_reply(timeout)
+        except queue.Empty:
+            self.close(kill=True)
+            return None, timeout_error
+        except OSError as e:  # BrokenPipeError: worker already gone
+            reply = None
+            self._log.append(str(e))
+        if reply is None:
+            err = self.log_tail(f"{self.name} exited")
+            self.close(kill=True)
+            return None, err
+        return reply, None
+
+    def close(self, kill=False):
+        process, self.process = self.process, None
+        if process is None:
+            return
+        try:
+            if kill:
+                process.kill()
+            else:
+                process.stdin.close()
+            process.wait(timeout=30)
+        except Exception:
+            process.kill()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
 # ─── Dissolve Slideshow ───────────────────────────────────────────────────────
+# Consecutive slides are joined with xfade, so only two slides are ever blended
+# at a time. Long shows are rendered SLIDESHOW_CHUNK_SLIDES at a time and the
+# chunks stream-copied together, which keeps the number of open inputs (and
+# memory) flat no matter how many images there are. Neighbouring chunks share
+# their boundary slide: one chunk ends as that slide finishes fading in, the
+# next starts on it fully visible, so no dissolve is lost at a seam.
+
+SLIDESHOW_CHUNK_SLIDES = 24
+SLIDESHOW_FPS = 30
+SLIDESHOW_ENCODE_ARGS = ["-c:v", "libx264", "-crf", "18", "-preset", "veryfast"]
+
+
+def _slide_input_filter(index, canvas_width, canvas_height):
+    return (f"[{index}:v]scale={canvas_width}:{canvas_height}:force_original_aspect_ratio=decrease,"
+            f"pad={canvas_width}:{canvas_height}:(ow-iw)/2:(oh-ih)/2,setsar=1,"
+            f"fps={SLIDESHOW_FPS},format=yuv420p[s{index}]")
+
+
+def build_xfade_slideshow_cmd(images, durations, output_file, transition_duration, canvas_width, canvas_height):
+    """
+    ffmpeg command for one xfade chain. durations[i] is how long images[i] is on
+    screen, including the dissolves at either end.
+    """
+    cmd = ["ffmpeg", "-y"]
+    for img_path, seconds in zip(images, durations):
+        cmd.extend(["-loop", "1", "-framerate", str(SLIDESHOW_FPS), "-t", f"{seconds:.6f}", "-i", img_path])
+
+    filter_parts = [_slide_input_filter(i, canvas_width, canvas_height) for i in range(len(images))]
+    current = "s0"
+    offset = 0.0
+    for i in range(1, len(images)):
+        offset += durations[i - 1] - transition_duration
+        filter_parts.append(
+            f"[{current}][s{i}]xfade=transition=fade:duration={transition_duration}:offset={offset:.6f}[x{i}]"
+        )
+        current = f"x{i}"
+
+    cmd.extend([
+        "-filter_complex", ";".join(filter_parts),
+        "-map", f"[{current}]",
+        *SLIDESHOW_ENCODE_ARGS,
+        "-pix_fmt", "yuv420p", "-r", str(SLIDESHOW_FPS), "-fps_mode", "cfr",
+        output_file
+    ])
+    return cmd
+
+
+def plan_slideshow_chunks(num_images, duration_per_slide, transition_duration, chunk_slides=SLIDESHOW_CHUNK_SLIDES):
+    """
+    Split a show into overlapping slide ranges. Returns [(start, end, durations)]
+    with end inclusive; a boundary slide appears in both neighbouring chunks,
+    cut into its fade-in (transition_duration) and the remainder.
+    """
+    chunk_slides = max(2, chunk_slides)
+    chunks = []
+    start = 0
+    while True:
+        end = min(start + chunk_slides - 1, num_images - 1)
+        durations = [float(duration_per_slide)] * (end - start + 1)
+        if start > 0:
+            durations[0] = duration_per_slide - transition_duration
+        if end < num_images - 1:
+            durations[-1] = transition_duration
+        chunks.append((start, end, durations))
+        if end >= num_images - 1:
+            return chunks
+        start = end
+
 
 def create_dissolve_slideshow(images, output_file, duration_per_slide=4, transition_duration=1.0,
-                              canvas_width=1920, canvas_height=1080):
+                              canvas_width=1920, canvas_height=1080, chunk_slides=SLIDESHOW_CHUNK_SLIDES):
     """
-    Create a slideshow with dissolve transitions using proven ffmpeg logic.
+    Create a slideshow with dissolve transitions between consecutive images.
 
     Args:
         images: List of image file paths
@@ -67,6 +565,7 @@ def create_dissolve_slideshow(images, output_file, duration_per_slide=4, transit
         transition_duration: Duration of dissolve transition (seconds)
         canvas_width: Output video width
         canvas_height: Output video height
+        chunk_slides: Max slides rendered by one ffmpeg process
 
     Returns:
         tuple: (success: bool, message: str)
@@ -74,51 +573,44 @@ def create_dissolve_slideshow(images, output_file, duration_per_slide=4, transit
     if not images:
         return False, "No images provided"
 
+    # A slide has to fit its fade-in and fade-out
+    transition_duration = min(transition_duration, duration_per_slide / 2)
+
     if len(images) == 1:
         cmd = [
             "ffmpeg", "-y",
             "-loop", "1", "-t", str(duration_per_slide), "-i", images[0],
             "-vf", f"scale={canvas_width}:{canvas_height}:force_original_aspect_ratio=decrease,pad={canvas_width}:{canvas_height}:(ow-iw)/2:(oh-ih)/2",
-            "-c:v", "libx264", "-crf", "18", "-preset", "veryfast",
-            "-r", "30", "-fps_mode", "cfr",
+            *SLIDESHOW_ENCODE_ARGS,
+            "-r", str(SLIDESHOW_FPS), "-fps_mode", "cfr",
             output_file
         ]
+        chunk_cmds = [cmd]
     else:
-        cmd = ["ffmpeg", "-y"]
-        for img_path in images:
-            cmd.extend(["-loop", "1", "-t", str(duration_per_slide), "-i", img_path])
-
-        filter_parts = []
-        overlay_chain = []
-
-        for i in range(len(images)):
-            scale_filter = f"[{i}:v]scale={canvas_width}:{canvas_height}:force_original_aspect_ratio=decrease,pad={canvas_width}:{canvas_height}:(ow-iw)/2:(oh-ih)/2,format=yuva420p"
-            if i == 0:
-                fade_filter = f"{scale_filter},fade=t=out:st={duration_per_slide-transition_duration}:d={transition_duration}:alpha=1,setpts=PTS-STARTPTS[va{i}]"
-            else:
-                offset_time = i * (duration_per_slide - transition_duration)
-                fade_filter = f"{scale_filter},fade=t=in:st=0:d={transition_duration}:alpha=1,setpts=PTS-STARTPTS+{offset_time}/TB[va{i}]"
-            filter_parts.append(fade_filter)
-            overlay_chain.append(f"va{i}")
-
-        current_base = overlay_chain[0]
-        for i in range(1, len(overlay_chain)):
-            overlay_filter = f"[{current_base}][{overlay_chain[i]}]overlay[ov{i}]"
-            current_base = f"ov{i}"
-            filter_parts.append(overlay_filter)
-
-        final_duration = len(images) * duration_per_slide - (len(images) - 1) * transition_duration
-        filter_parts.append(f"[{current_base}]trim=duration={final_duration}")
-
-        cmd.extend([
-            "-filter_complex", ";".join(filter_parts),
-            "-c:v", "libx264", "-crf", "18", "-preset", "veryfast",
-            "-r", "30", "-t", str(final_duration), "-fps_mode", "cfr",
-            output_file
-        ])
+        chunks = plan_slideshow_chunks(len(images), duration_per_slide, transition_duration, chunk_slides)
+        if len(chunks) == 1:
+            chunk_files = [output_file]
+        else:
+            temp_dir = tempfile.mkdtemp(prefix=".slideshow_", dir=os.path.dirname(os.path.abspath(output_file)))
+            chunk_files = [os.path.join(temp_dir, f"chunk_{i:04d}.mp4") for i in range(len(chunks))]
+        chunk_cmds = [
+            build_xfade_slideshow_cmd(images[start:end + 1], durations, chunk_file,
+                                      transition_duration, canvas_width, canvas_height)
+            for (start, end, durations), chunk_file in zip(chunks, chunk_files)
+        ]
 
     try:
-        subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        for cmd in chunk_cmds:
+            subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if len(chunk_cmds) > 1:
+            concat_list = os.path.join(temp_dir, "chunks.txt")
+            with open(concat_list, "w") as f:
+                for chunk_file in chunk_files:
+                    f.write(f"file '{chunk_file}'\n")
+            subprocess.run([
+                "ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", concat_list,
+                "-c", "copy", "-movflags", "+faststart", output_file
+            ], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
         return True, f"Successfully created slideshow: {output_file}"
     except subprocess.CalledProcessError as e:
         error_msg = f"FFmpeg error: {e.stderr}"
@@ -128,6 +620,9 @@ def create_dissolve_slideshow(images, output_file, duration_per_slide=4, transit
         error_msg = f"Unexpected error: {str(e)}"
         logging.error(error_msg)
         return False, error_msg
+    finally:
+        if len(chunk_cmds) > 1:
+            shutil.rmtree(temp_dir, ignore_errors=True)
 
 
 def calculate_slideshow_duration(num_images, duration_per_slide, transition_duration=1.0):
@@ -215,6 +710,124 @@ def check_xmp_files_in_folder(folder_path, extensions=('.jpg', '.jpeg', '.png',
     }
 
 
+# ─── Header-Only Image Size ──────────────────────────────────────────────────
+
+# JPEG start-of-frame markers (baseline, progressive, lossless, arithmetic).
+# Every other marker carries a length and gets skipped without reading it.
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+                     0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def _jpeg_size(f):
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        while byte and byte != b'\xff':
+            byte = f.read(1)
+        while byte == b'\xff':
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:  # no length field
+            continue
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        (length,) = struct.unpack('>H', length_bytes)
+        if marker in _JPEG_SOF_MARKERS:
+            data = f.read(5)
+            if len(data) < 5:
+                return None
+            height, width = struct.unpack('>HH', data[1:5])
+            return width, height
+        if marker == 0xD9:
+            return None
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def _tiff_size(f, head):
+    endian = '<' if head[:2] == b'II' else '>'
+    f.seek(4)
+    (ifd_offset,) = struct.unpack(endian + 'I', f.read(4))
+    f.seek(ifd_offset)
+    (count,) = struct.unpack(endian + 'H', f.read(2))
+    width = height = None
+    for _ in range(count):
+        entry = f.read(12)
+        if len(entry) < 12:
+            break
+        tag, typ = struct.unpack(endian + 'HH', entry[:4])
+        if tag not in (256, 257):
+            continue
+        if typ == 3:  # SHORT
+            (value,) = struct.unpack(endian + 'H', entry[8:10])
+        elif typ == 4:  # LONG
+            (value,) = struct.unpack(endian + 'I', entry[8:12])
+        else:
+            return None
+        if tag == 256:
+            width = value
+        else:
+            height = value
+        if width and height:
+            return width, height
+    return None
+
+
+def _header_image_size(f):
+    """(width, height) parsed from the first bytes of `f`, or None if unknown."""
+    head = f.read(32)
+    if head.startswith(b'\x89PNG\r\n\x1a\n') and head[12:16] == b'IHDR':
+        return struct.unpack('>II', head[16:24])
+    if head[:2] == b'\xff\xd8':
+        return _jpeg_size(f)
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return struct.unpack('<HH', head[6:10])
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        chunk = head[12:16]
+        if chunk == b'VP8 ' and head[23:26] == b'\x9d\x01\x2a':
+            w, h = struct.unpack('<HH', head[26:30])
+            return w & 0x3FFF, h & 0x3FFF
+        if chunk == b'VP8L' and head[20] == 0x2F:
+            (bits,) = struct.unpack('<I', head[21:25])
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b'VP8X':
+            w = int.from_bytes(head[24:27], 'little') + 1
+            h = int.from_bytes(head[27:30], 'little') + 1
+            return w, h
+        return None
+    if head[:2] == b'BM':
+        (dib_size,) = struct.unpack('<I', head[14:18])
+        if dib_size == 12:  # OS/2 BITMAPCOREHEADER
+            return struct.unpack('<HH', head[18:22])
+        w, h = struct.unpack('<ii', head[18:26])
+        return w, abs(h)  # negative height = top-down rows
+    if head[:4] in (b'II*\x00', b'MM\x00*'):
+        return _tiff_size(f, head)
+    return None
+
+
+def get_image_size(image_path):
+    """
+    (width, height) of an image from its header bytes only — JPEG, PNG,
+    WebP, GIF, BMP and TIFF are parsed directly (same numbers PIL reports,
+    EXIF orientation not applied). Anything else, or a header that doesn't
+    parse, falls back to PIL. Raises like Image.open on unreadable files.
+    """
+    try:
+        with open(image_path, 'rb') as f:
+            size = _header_image_size(f)
+        if size and size[0] > 0 and size[1] > 0:
+            return int(size[0]), int(size[1])
+    except (OSError, struct.error, IndexError):
+        pass
+
+    from PIL import Image
+    with Image.open(image_path) as img:
+        return img.width, img.height
+
+
 # ─── Image Collection & Validation Helpers ───────────────────────────────────
 
 IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.webp', '.tiff')
@@ -479,13 +1092,12 @@ def build_groups_for_images(images, pairing_mode, group_size=None, match_type=No
 
 def get_max_dimensions(image_paths):
     """Get maximum dimensions from a list of images, ensuring even numbers."""
-    from PIL import Image
     max_width = 0
     max_height = 0
     for img_path in image_paths:
-        with Image.open(img_path) as img:
-            max_width = max(max_width, img.width)
-            max_height = max(max_height, img.height)
+        width, height = get_image_size(img_path)
+        max_width = max(max_width, width)
+        max_height = max(max_height, height)
     max_width = max_width if max_width % 2 == 0 else max_width + 1
     max_height = max_height if max_height % 2 == 0 else max_height + 1
     return max_width, max_height
@@ -801,35 +1413,17 @@ def join_image_video(image_path, video_path, output_path, position, audio_choice
         return n if n % 2 == 0 else n - 1
 
     # Get video info
-    try:
-        probe_v = subprocess.run([
-            "ffprobe", "-v", "error", "-select_streams", "v:0",
-            "-show_entries", "stream=width,height,r_frame_rate",
-            "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            str(video_path)
-        ], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        v_out = probe_v.stdout.strip().split('\n')
-        vid_w = int(float(v_out[0]))
-        vid_h = int(float(v_out[1]))
-        fps_raw = v_out[2]
-        fps = round(int(fps_raw.split('/')[0]) / int(fps_raw.split('/')[1]), 3) if '/' in fps_raw else float(fps_raw)
-        vid_dur = float(v_out[3])
-    except Exception as e:
-        print(f"  ❌ Could not read video info: {video_path} — {e}")
+    v_info = probe_media(video_path)
+    if not v_info or not v_info['width'] or not v_info['height'] or not v_info['fps'] or v_info['duration'] is None:
+        print(f"  ❌ Could not read video info: {video_path}")
         return False
+    vid_w, vid_h = v_info['width'], v_info['height']
+    fps = v_info['fps']
+    vid_dur = v_info['duration']
 
     # Get image dimensions
     try:
-        probe_i = subprocess.run([
-            "ffprobe", "-v", "error", "-select_streams", "v:0",
-            "-show_entries", "stream=width,height",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            str(image_path)
-        ], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        i_out = probe_i.stdout.strip().split('\n')
-        img_w = int(float(i_out[0]))
-        img_h = int(float(i_out[1]))
+        img_w, img_h = get_image_size(image_path)
     except Exception as e:
         print(f"  ❌ Could not read image dimensions: {image_path} — {e}")
         return False
@@ -1045,38 +1639,18 @@ def build_slideshow_and_join(video_path, slideshow_path, output_path, position,
     Returns:
         bool: True on success
     """
-    try:
-        probe_s = subprocess.run([
-            "ffprobe", "-v", "error", "-select_streams", "v:0",
-            "-show_entries", "stream=width,height,r_frame_rate",
-            "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            str(slideshow_path)
-        ], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        s_out = probe_s.stdout.strip().split('\n')
-        sl_w = int(float(s_out[0]))
-        sl_h = int(float(s_out[1]))
-    except Exception as e:
-        print(f"  ❌ Could not read slideshow info: {slideshow_path} — {e}")
+    s_info = probe_media(slideshow_path)
+    if not s_info or not s_info['width'] or not s_info['height']:
+        print(f"  ❌ Could not read slideshow info: {slideshow_path}")
         return False
+    sl_w, sl_h = s_info['width'], s_info['height']
 
-    try:
-        probe_v = subprocess.run([
-            "ffprobe", "-v", "error", "-select_streams", "v:0",
-            "-show_entries", "stream=width,height,r_frame_rate",
-            "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            str(video_path)
-        ], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        v_out = probe_v.stdout.strip().split('\n')
-        vid_w = int(float(v_out[0]))
-        vid_h = int(float(v_out[1]))
-        fps_raw = v_out[2]
-        fps = round(int(fps_raw.split('/')[0]) / int(fps_raw.split('/')[1]), 3) if '/' in fps_raw else float(fps_raw)
-        vid_dur = float(v_out[3])
-    except Exception as e:
-        print(f"  ❌ Could not read video info: {video_path} — {e}")
+    v_info = probe_media(video_path)
+    if not v_info or not v_info['width'] or not v_info['height'] or not v_info['fps']:
+        print(f"  ❌ Could not read video info: {video_path}")
         return False
+    vid_w, vid_h = v_info['width'], v_info['height']
+    fps = v_info['fps']
 
     sl_w_out, sl_h_out, vid_w_out, vid_h_out = get_join_dimensions(sl_w, sl_h, vid_w, vid_h, position)
 
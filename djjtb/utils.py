@@ -1257,6 +1257,22 @@ from djjtb.media_utils import (
     get_pad_filter,
     get_gif_dimensions,
     get_audio_options,
+    HW_ENCODE_SLOTS,
+    SW_ENCODE_SLOTS,
+    is_hw_encoder,
+    EncodeScheduler,
+    link_or_copy,
+    StagedBatch,
+    stream_lines,
+    JsonLineWorker,
+    PROBE_CACHE_PATH,
+    parse_frame_rate,
+    summarize_ffprobe,
+    probe_media,
+    probe_media_many,
+    SLIDESHOW_CHUNK_SLIDES,
+    build_xfade_slideshow_cmd,
+    plan_slideshow_chunks,
     create_dissolve_slideshow,
     calculate_slideshow_duration,
     has_xmp_file,
@@ -1272,6 +1288,7 @@ from djjtb.media_utils import (
     build_collage_and_join,
     create_collage,
     create_collage_from_groups,
+    get_image_size,
     IMAGE_EXTENSIONS,
     is_image_extension,
     is_valid_image_file,